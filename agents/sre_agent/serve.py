@@ -7,34 +7,55 @@ import uvicorn
 import time
 from datetime import datetime
 from fastapi import FastAPI
+from opentelemetry.trace import SpanKind
 from starlette.middleware.base import BaseHTTPMiddleware
 from google.adk.cli.fast_api import get_fast_api_app
 
 try:
-    from .utils import get_logger
+    from .tracing import configure_tracing, extract_context, tracer
+    from .utils import get_logger, new_request_id, reset_request_id, set_request_id
 except ImportError:
-    from utils import get_logger
+    from tracing import configure_tracing, extract_context, tracer
+    from utils import get_logger, new_request_id, reset_request_id, set_request_id
 
 # Configure logging using shared utility
 logger = get_logger(__name__)
 
 
 class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Add request/response logging for troubleshooting"""
+    """Add request/response logging for troubleshooting
+
+    The caller's X-Request-ID (the Slack bot sends one per Slack event) tags
+    every log line written while handling the request, so logs of both
+    services can be joined on it. The request runs in a server span that
+    continues the caller's trace, so ADK's agent and tool spans join it.
+    """
 
     async def dispatch(self, request, call_next):
         start_time = time.time()
-        logger.info(f"Request: {request.method} {request.url}")
+        request_id = request.headers.get("x-request-id") or new_request_id()
+        token = set_request_id(request_id)
+        logger.info("Request: %s %s", request.method, request.url)
 
         try:
-            response = await call_next(request)
+            with tracer.start_as_current_span(
+                f"{request.method} {request.url.path}",
+                context=extract_context(request.headers),
+                kind=SpanKind.SERVER,
+                attributes={"http.request_id": request_id},
+            ) as span:
+                response = await call_next(request)
+                span.set_attribute("http.status_code", response.status_code)
             duration_ms = (time.time() - start_time) * 1000
-            logger.info(f"Response: {response.status_code} in {duration_ms:.1f}ms")
+            logger.info("Response: %s in %.1fms", response.status_code, duration_ms)
+            response.headers["X-Request-ID"] = request_id
             return response
         except Exception as e:
             duration_ms = (time.time() - start_time) * 1000
             logger.error(f"Request failed after {duration_ms:.1f}ms: {e}")
             raise
+        finally:
+            reset_request_id(token)
 
 
 def get_session_service_uri():
@@ -65,6 +86,9 @@ def create_app() -> FastAPI:
         session_service_uri=session_uri,
     )
 
+    # Export ADK's spans and trace AWS calls when TRACING_EXPORTER is set
+    configure_tracing()
+
     # Add request logging middleware
     app.add_middleware(RequestLoggingMiddleware)
 
@@ -0,0 +1,164 @@
+"""
+OpenTelemetry tracing for the SRE agent API.
+
+ADK already records spans for each invocation, agent run (including
+sub-agent transfers), LLM call and tool call on the tracer provider it
+installs. This module adds an exporter to that provider, a server span per
+HTTP request that continues the caller's trace from its traceparent header,
+and a client span for every AWS API call made through botocore.
+
+Tracing is off unless TRACING_EXPORTER is set.
+"""
+
+import functools
+import os
+from typing import Mapping, Optional
+
+from opentelemetry import propagate, trace
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+)
+from opentelemetry.trace import SpanKind
+
+try:
+    from .utils import get_logger
+except ImportError:
+    from utils import get_logger
+
+logger = get_logger(__name__)
+
+TRACING_EXPORTER = os.getenv(
+    "TRACING_EXPORTER", "none"
+).lower()  # none, file (JSON lines) or otlp (collector at OTEL_EXPORTER_OTLP_ENDPOINT)
+TRACING_FILE = os.getenv(
+    "TRACING_FILE", "traces.jsonl"
+)  # Span output file for TRACING_EXPORTER=file
+TRACING_SERVICE_NAME = os.getenv(
+    "TRACING_SERVICE_NAME", "sre-bot-api"
+)  # service.name of the spans
+
+# ADK creates its tracer provider without a resource, so the service name
+# has to come from the environment before the app is created
+os.environ.setdefault("OTEL_SERVICE_NAME", TRACING_SERVICE_NAME)
+
+tracer = trace.get_tracer("sre_agent")
+
+_original_make_api_call = None
+
+
+def build_exporter(kind: str, path: str = TRACING_FILE) -> Optional[SpanExporter]:
+    """
+    Create the span exporter selected by TRACING_EXPORTER.
+
+    Args:
+        kind: none, file or otlp
+        path: Output file for the file exporter
+
+    Returns:
+        The exporter, or None if tracing is disabled or unavailable
+    """
+    if kind == "file":
+        # One span per line, appended so restarts keep earlier traces
+        return ConsoleSpanExporter(
+            out=open(path, "a", encoding="utf-8"),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    if kind == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                OTLPSpanExporter,
+            )
+        except ImportError:
+            logger.error(
+                "TRACING_EXPORTER=otlp requires opentelemetry-exporter-otlp-proto-http"
+            )
+            return None
+        return OTLPSpanExporter()
+    if kind not in ("", "none"):
+        logger.warning(f"Unknown TRACING_EXPORTER '{kind}', tracing disabled")
+    return None
+
+
+def configure_tracing(exporter: Optional[SpanExporter] = None) -> bool:
+    """
+    Export spans from the global tracer provider and trace AWS API calls.
+
+    Call after the ADK app is created, so spans go to ADK's provider.
+
+    Args:
+        exporter: Exporter to use instead of the one from TRACING_EXPORTER
+
+    Returns:
+        bool: True if tracing was enabled
+    """
+    exporter = exporter or build_exporter(TRACING_EXPORTER)
+    if exporter is None:
+        return False
+    provider = trace.get_tracer_provider()
+    if not isinstance(provider, TracerProvider):
+        provider = TracerProvider()
+        trace.set_tracer_provider(provider)
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    instrument_botocore()
+    logger.info(f"Tracing enabled with {type(exporter).__name__}")
+    return True
+
+
+def extract_context(headers: Mapping[str, str]) -> Context:
+    """Get the caller's trace context from incoming request headers"""
+    return propagate.extract(headers)
+
+
+def instrument_botocore(tracer_provider: Optional[TracerProvider] = None) -> None:
+    """
+    Record a client span for every AWS API call made through botocore.
+
+    Args:
+        tracer_provider: Provider to record spans on (defaults to the global one)
+    """
+    global _original_make_api_call
+    if _original_make_api_call is not None:
+        return
+
+    from botocore.client import BaseClient
+
+    aws_tracer = trace.get_tracer("sre_agent.aws", tracer_provider=tracer_provider)
+    original = BaseClient._make_api_call
+
+    @functools.wraps(original)
+    def _make_api_call(self, operation_name, api_params):
+        service = self.meta.service_model.service_name
+        with aws_tracer.start_as_current_span(
+            f"aws {service}.{operation_name}",
+            kind=SpanKind.CLIENT,
+            attributes={
+                "rpc.system": "aws-api",
+                "rpc.service": service,
+                "rpc.method": operation_name,
+                "cloud.region": self.meta.region_name or "",
+            },
+        ) as span:
+            result = original(self, operation_name, api_params)
+            request_id = result.get("ResponseMetadata", {}).get("RequestId")
+            if request_id:
+                span.set_attribute("aws.request_id", request_id)
+            return result
+
+    BaseClient._make_api_call = _make_api_call
+    _original_make_api_call = original
+
+
+def uninstrument_botocore() -> None:
+    """Stop recording spans for AWS API calls"""
+    global _original_make_api_call
+    if _original_make_api_call is None:
+        return
+
+    from botocore.client import BaseClient
+
+    BaseClient._make_api_call = _original_make_api_call
+    _original_make_api_call = None
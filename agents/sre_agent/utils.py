@@ -1,11 +1,207 @@
 """
 Shared utility functions for the SRE agent and sub-agents.
+
+The structured logging section (request IDs, JSON and text formatters,
+sampling and the queued writer) is mirrored in slack_bot/utils.py, because each
+image is built from its own directory. Change both copies together;
+tests/test_slack_logging.py fails when they differ.
 """
 
-import os
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
-from typing import Optional
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+
+# --- Structured logging (mirrored in the other image's utils.py) ---
+
+LOG_FORMAT = os.getenv(
+    "LOG_FORMAT", ""
+)  # "json" for structured logs, otherwise a logging format string for text logs
+LOG_ASYNC = (
+    os.getenv("LOG_ASYNC", "true").lower() == "true"
+)  # Write log records from a background thread instead of the caller
+LOG_SAMPLE_RATES = os.getenv(
+    "LOG_SAMPLE_RATES", ""
+)  # e.g. "main=10,modules.worker_pool=5": keep 1 in N INFO/DEBUG records per call site
+
+# Correlates log lines (and downstream API calls) with the request being handled
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "request_id", default=None
+)
+
+# Attributes every LogRecord has; anything else was passed via extra=
+_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {
+    "message",
+    "asctime",
+    "request_id",
+}
+
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def new_request_id() -> str:
+    """Generate a short random request ID"""
+    return uuid.uuid4().hex[:16]
+
+
+def set_request_id(request_id: Optional[str]) -> contextvars.Token:
+    """
+    Set the request ID for log records emitted in the current context.
+
+    Tasks created afterwards inherit it, so it follows the request into
+    background work.
+
+    Args:
+        request_id: Request ID, or None to clear it
+
+    Returns:
+        contextvars.Token: Token to restore the previous value with reset_request_id
+    """
+    return request_id_var.set(request_id)
+
+
+def reset_request_id(token: contextvars.Token) -> None:
+    """Restore the request ID that was set before set_request_id"""
+    request_id_var.reset(token)
+
+
+def get_request_id() -> Optional[str]:
+    """Get the request ID of the current context, if any"""
+    return request_id_var.get()
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps records with the current request ID."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps one in every N records below WARNING from each call site.
+
+    Counting per call site rather than per message text means sampling also
+    works for messages with interpolated values. Warnings and errors are
+    never dropped.
+    """
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = every
+        self._counts: Dict[tuple, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.every <= 1:
+            return True
+        site = (record.pathname, record.lineno)
+        count = self._counts.get(site, 0)
+        self._counts[site] = count + 1
+        return count % self.every == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Plain text format, with the request ID appended when one is set."""
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        text = super().formatMessage(record)
+        request_id = getattr(record, "request_id", None)
+        return f"{text} [request_id={request_id}]" if request_id else text
+
+
+def parse_sample_rates(spec: str) -> Dict[str, int]:
+    """
+    Parse LOG_SAMPLE_RATES into {logger name: N}.
+
+    Args:
+        spec: Comma-separated name=N pairs
+
+    Returns:
+        Dict[str, int]: Sampling rate per logger name prefix
+    """
+    rates = {}
+    for item in spec.split(","):
+        name, _, every = item.strip().partition("=")
+        if name and every.strip().isdigit():
+            rates[name.strip()] = int(every)
+    return rates
+
+
+def _sample_rate(name: str, rates: Dict[str, int]) -> int:
+    """Get the sampling rate of the most specific matching logger prefix"""
+    best, rate = -1, 1
+    for prefix, every in rates.items():
+        if (name == prefix or name.startswith(prefix + ".")) and len(prefix) > best:
+            best, rate = len(prefix), every
+    return rate
+
+
+def _output_handler() -> logging.Handler:
+    """
+    Get a handler for a logger's records.
+
+    With LOG_ASYNC the handler only formats the record and puts it on a
+    queue; one background thread writes all queued records to stdout, so
+    a slow stdout never blocks the event loop.
+    """
+    global _queue_listener
+    if not LOG_ASYNC:
+        return logging.StreamHandler(sys.stdout)
+
+    if _queue_listener is None:
+        writer = logging.StreamHandler(sys.stdout)
+        writer.setFormatter(logging.Formatter("%(message)s"))
+        _queue_listener = logging.handlers.QueueListener(_log_queue, writer)
+        _queue_listener.start()
+        # Flush queued records on interpreter exit
+        atexit.register(stop_log_listener)
+    return logging.handlers.QueueHandler(_log_queue)
+
+
+def stop_log_listener() -> None:
+    """Write out queued log records and stop the background writer thread"""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+# --- End of structured logging ---
 
 
 class ModelConfigurationError(Exception):
@@ -66,11 +262,17 @@ def setup_logger(
 
     logger.setLevel(log_level)
 
-    # Create console handler
-    handler = logging.StreamHandler(sys.stdout)
+    # Create console handler (queued to a background writer with LOG_ASYNC)
+    handler = _output_handler()
     handler.setLevel(log_level)
+    handler.addFilter(RequestIdFilter())
+    sample_rate = _sample_rate(name, parse_sample_rates(LOG_SAMPLE_RATES))
+    if sample_rate > 1:
+        handler.addFilter(SamplingFilter(sample_rate))
 
     # Build format string
+    if format_string is None and LOG_FORMAT.lower() != "json":
+        format_string = LOG_FORMAT or None
     if format_string is None:
         format_parts = []
 
@@ -87,7 +289,10 @@ def setup_logger(
         format_string = " - ".join(format_parts)
 
     # Create formatter and add to handler
-    formatter = logging.Formatter(format_string)
+    if LOG_FORMAT.lower() == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = TextFormatter(format_string)
     handler.setFormatter(formatter)
 
     # Add handler to logger
@@ -0,0 +1,59 @@
+"""
+Micro-benchmark for SessionManager lookup latency.
+
+Populates the manager with an increasing number of live thread sessions and
+measures the mean and p99 cost of get_session() for an existing thread
+against the in-memory store. With
+expiry-ordered eviction the latency should stay flat as the session count
+grows, instead of growing linearly with a full scan per lookup.
+
+Usage:
+    python benchmarks/bench_session_manager.py
+"""
+
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+from modules.sessions import SessionManager  # noqa: E402
+
+SESSION_COUNTS = [1_000, 10_000, 50_000, 100_000]
+LOOKUPS = 5_000
+
+
+async def bench(session_count: int) -> tuple[float, float]:
+    manager = SessionManager(timeout_minutes=60)
+    for i in range(session_count):
+        await manager.get_session("C123", f"U{i % 500}", f"{1700000000 + i}.000100")
+
+    timings = []
+    for i in range(LOOKUPS):
+        thread_ts = f"{1700000000 + (i * 7919) % session_count}.000100"
+        start = time.perf_counter()
+        await manager.get_session("C123", "U1", thread_ts)
+        timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    mean_us = statistics.fmean(timings) * 1e6
+    p99_us = timings[int(len(timings) * 0.99)] * 1e6
+    return mean_us, p99_us
+
+
+def main():
+    # Session reuse is logged at INFO; keep it out of the measurement
+    logging.getLogger("modules.sessions").setLevel(logging.WARNING)
+
+    print(f"{'sessions':>10} {'mean (us)':>12} {'p99 (us)':>12}")
+    for count in SESSION_COUNTS:
+        mean_us, p99_us = asyncio.run(bench(count))
+        print(f"{count:>10} {mean_us:>12.2f} {p99_us:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
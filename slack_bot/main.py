@@ -1,19 +1,74 @@
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict
 import aiohttp
 import asyncio
-from datetime import datetime, timedelta
+import contextlib
+import functools
+import logging
+from datetime import datetime
 import os
 import time
 
 from fastapi import FastAPI
-from fastapi import Request
+from fastapi import Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from opentelemetry import trace
 from slack_bolt.adapter.fastapi.async_handler import AsyncSlackRequestHandler
 from slack_bolt.async_app import AsyncApp
+from slack_bolt.response import BoltResponse
 from slack_sdk.web.async_client import AsyncWebClient
 
-from modules.health import healthcheck
-
-from utils import get_logger
+from modules.adk_response import extract_response_text
+from modules.adaptive_ack import ADAPTIVE_ACK_ENABLED, AdaptiveAck
+from modules.answer_cache import answer_cache
+from modules.answer_delivery import deliver_answer
+from modules.api_client import api_client, known_api_sessions
+from modules.circuit_breaker import CircuitOpenError
+from modules.debounce import thread_debouncer
+from modules.event_dedup import event_deduplicator
+from modules.event_filter import DROP_REASONS, event_prefilter
+from modules.health import ApiProbe, healthcheck, liveness_check, readiness_check
+from modules.metrics import (
+    ACTIVE_SESSIONS,
+    API_REQUEST_LATENCY,
+    ERRORS,
+    MENTION_TO_ANSWER,
+    SLACK_API_LATENCY,
+    stats_collector,
+)
+from modules.pending_work import pending_work
+from modules.rate_limit import SCOPES as RATE_LIMIT_SCOPES, rate_limiter
+from modules.sessions import (
+    SESSION_TIMEOUT_MINUTES,
+    ConversationSession,
+    session_manager,
+)
+from modules.session_locks import SessionBusyError, session_locks
+from modules.slack_dispatcher import slack_dispatcher
+from modules.socket_mode import SLACK_SOCKET_MODE, SocketModeRunner
+from modules.streaming import (
+    STREAMING_ENABLED,
+    SlackStreamUpdater,
+    StreamingAnswer,
+    iter_sse_events,
+)
+from modules.tracing import (
+    configure_tracing,
+    inject_trace_headers,
+    shutdown_tracing,
+    traced,
+    tracer,
+)
+from modules.thread_cache import THREAD_CONTEXT_MAX_REPLIES, thread_context_cache
+from modules.user_directory import USER_DIRECTORY_WARM, user_directory
+from modules.worker_pool import WORKER_DRAIN_TIMEOUT, JobFactory, worker_pool
+
+from utils import (
+    get_logger,
+    get_request_id,
+    new_request_id,
+    reset_request_id,
+    set_request_id,
+)
 
 # Configure logging using shared utility
 logger = get_logger(__name__)
@@ -21,9 +76,42 @@ logger = get_logger(__name__)
 # Configuration from environment variables
 API_BASE_URL = os.getenv("SRE_BOT_API_URL", "http://sre-bot-api:8000")
 API_TIMEOUT = int(os.getenv("API_TIMEOUT", "300"))  # Default 300 seconds
-SESSION_TIMEOUT_MINUTES = int(
-    os.getenv("SESSION_TIMEOUT_MINUTES", "1200")
-)  # Default 1200 minutes (20 hours)
+API_CONNECT_TIMEOUT = float(
+    os.getenv("API_CONNECT_TIMEOUT", "3")
+)  # Seconds to open a connection to sre-bot-api
+API_READ_TIMEOUT = float(
+    os.getenv("API_READ_TIMEOUT", "120")
+)  # Seconds without data from a streamed agent run before giving up
+
+CREATE_SESSION_TIMEOUT = aiohttp.ClientTimeout(
+    total=10, sock_connect=API_CONNECT_TIMEOUT
+)
+# /run only responds once the agent is done, so only the total bounds the read
+RUN_TIMEOUT = aiohttp.ClientTimeout(total=API_TIMEOUT, sock_connect=API_CONNECT_TIMEOUT)
+STREAM_TIMEOUT = aiohttp.ClientTimeout(
+    total=API_TIMEOUT, sock_connect=API_CONNECT_TIMEOUT, sock_read=API_READ_TIMEOUT
+)
+
+ACK_MESSAGE = "I'm processing your request, <@{user}>! One moment please..."
+# Answers that report a failure rather than answer the question
+FAILED_ANSWER_PREFIXES = (
+    "Error",
+    "Sorry",
+    "Got non-JSON response",
+    "I wasn't able to produce an answer",
+)
+INTERRUPTED_NOTE = "\n\n_(response interrupted)_"
+API_UNAVAILABLE_MESSAGE = (
+    "the SRE agent is unavailable right now. Please try again in about {seconds}s."
+)
+RATE_LIMIT_MESSAGES = {
+    "user": "Slow down a little, <@{user}>! You're sending requests faster than "
+    "I can take them. Please try again in {seconds}s.",
+    "channel": "Sorry <@{user}>, this channel is sending me a lot of requests "
+    "right now. Please try again in {seconds}s.",
+    "global": "Sorry <@{user}>, I'm getting a lot of requests right now. "
+    "Please try again in {seconds}s.",
+}
 
 # Whitelist configuration
 WHITELIST_ENABLED = os.getenv("WHITELIST_ENABLED", "false").lower() == "true"
@@ -31,12 +119,13 @@ WHITELIST_USERS = set(
     user.strip() for user in os.getenv("WHITELIST_USERS", "").split(",") if user.strip()
 )
 
-logger.info(f"API timeout configured: {API_TIMEOUT} seconds")
-logger.info(f"Session timeout configured: {SESSION_TIMEOUT_MINUTES} minutes")
-logger.info(f"Whitelist enabled: {WHITELIST_ENABLED}")
+logger.info("API timeout configured: %s seconds", API_TIMEOUT)
+logger.info("Session timeout configured: %s minutes", SESSION_TIMEOUT_MINUTES)
+logger.info("Streaming responses enabled: %s", STREAMING_ENABLED)
+logger.info("Whitelist enabled: %s", WHITELIST_ENABLED)
 if WHITELIST_ENABLED:
-    logger.info(f"Whitelisted users: {len(WHITELIST_USERS)} users")
-    logger.info(f"Whitelisted user IDs: {list(WHITELIST_USERS)}")
+    logger.info("Whitelisted users: %s users", len(WHITELIST_USERS))
+    logger.info("Whitelisted user IDs: %s", list(WHITELIST_USERS))
 else:
     logger.info("Whitelist disabled - all users allowed")
 
@@ -52,23 +141,27 @@ def is_user_whitelisted(user_id: str) -> bool:
         True if whitelisting is disabled OR user is in whitelist
         False if whitelisting is enabled AND user is not in whitelist
     """
-    logger.debug(f"Checking whitelist for user: {user_id}")
-    logger.debug(f"Whitelist enabled: {WHITELIST_ENABLED}")
-    logger.debug(f"Whitelist users: {WHITELIST_USERS}")
+    logger.debug("Checking whitelist for user: %s", user_id)
+    logger.debug("Whitelist enabled: %s", WHITELIST_ENABLED)
+    logger.debug("Whitelist users: %s", WHITELIST_USERS)
 
     if not WHITELIST_ENABLED:
-        logger.debug(f"Whitelist disabled, allowing user {user_id}")
+        logger.debug("Whitelist disabled, allowing user %s", user_id)
         return True
 
     is_whitelisted = user_id in WHITELIST_USERS
-    logger.debug(f"User {user_id} in whitelist: {is_whitelisted}")
+    logger.debug("User %s in whitelist: %s", user_id, is_whitelisted)
     return is_whitelisted
 
 
+configure_tracing()
+
 # Initialize the Slack app
 app = AsyncApp()
 fast_api = FastAPI()
 app_handler = AsyncSlackRequestHandler(app)
+# Socket Mode feeds the same app over WebSockets; /slack/events stays mounted
+socket_mode_runner = SocketModeRunner(app) if SLACK_SOCKET_MODE else None
 
 # Global variable to store bot user ID
 bot_user_id = None
@@ -82,137 +175,12 @@ async def initialize_bot_user_id():
         auth_response = await client.auth_test()
         if auth_response.get("ok"):
             bot_user_id = auth_response.get("user_id")
-            logger.info(f"Bot initialized with user ID: {bot_user_id}")
+            event_prefilter.set_bot_user_id(bot_user_id)
+            logger.info("Bot initialized with user ID: %s", bot_user_id)
         else:
-            logger.error(f"Failed to get bot user ID at startup: {auth_response}")
+            logger.error("Failed to get bot user ID at startup: %s", auth_response)
     except Exception as e:
-        logger.error(f"Error initializing bot user ID: {e}")
-
-
-# Session management
-class ConversationSession:
-    def __init__(self, channel: str, user: str, thread_ts: str | None = None):
-        self.channel = channel
-        self.user = user  # Original user who started the session
-        self.current_user = user  # Current user interacting (can change in threads)
-        self.thread_ts = thread_ts
-        # Use thread_ts in the session_id if available for continuity
-        thread_id = thread_ts if thread_ts else f"{datetime.now().timestamp()}"
-        self.session_id = f"s_{channel}_{thread_id}"
-        self.last_activity = datetime.now()
-        self.user_id = f"u_{user}"  # Unique user ID for the API
-
-    def update_activity(self):
-        self.last_activity = datetime.now()
-
-    def is_expired(
-        self, timeout_minutes: Optional[int] = None
-    ) -> bool:  # Configurable session timeout
-        if timeout_minutes is None:
-            timeout_minutes = SESSION_TIMEOUT_MINUTES
-        return datetime.now() - self.last_activity > timedelta(minutes=timeout_minutes)
-
-
-# Global session manager
-class SessionManager:
-    def __init__(self):
-        self.sessions: Dict[str, ConversationSession] = {}
-        self.cleanup_interval = (
-            SESSION_TIMEOUT_MINUTES * 60
-        )  # Convert minutes to seconds
-        # Map thread_ts to session_id for continuity
-        self.thread_session_map: Dict[str, str] = {}
-
-    def update_session_thread(self, session: ConversationSession, new_thread_ts: str):
-        """Update an existing session with a new thread_ts (for thread creation)"""
-        old_key = f"{session.channel}_{session.user}_{session.thread_ts if session.thread_ts else 'main'}"
-
-        # Update the session object
-        session.thread_ts = new_thread_ts
-
-        # Create new session ID with thread
-        thread_id = new_thread_ts
-        session.session_id = f"s_{session.channel}_{thread_id}"
-        session.update_activity()
-
-        # Create new key with thread
-        new_key = f"{session.channel}_{session.user}_{new_thread_ts}"
-
-        # Move session to new key
-        if old_key in self.sessions:
-            self.sessions[new_key] = self.sessions[old_key]
-            del self.sessions[old_key]
-            logger.info(f"Migrated session from {old_key} to {new_key}")
-
-        # Update thread mapping
-        thread_key = f"{session.channel}_{new_thread_ts}"
-        self.thread_session_map[thread_key] = new_key
-
-        return session
-
-    def get_session(
-        self, channel: str, user: str, thread_ts: str | None = None
-    ) -> ConversationSession:
-        # Clean up expired sessions
-        self._cleanup_expired_sessions()
-
-        # For threaded conversations, prioritize thread-based sessions
-        if thread_ts:
-            thread_key = f"{channel}_{thread_ts}"
-
-            # Check if we already have a session for this thread
-            if thread_key in self.thread_session_map:
-                existing_session_key = self.thread_session_map[thread_key]
-
-                # Check if the mapped session still exists and is not expired
-                if (
-                    existing_session_key in self.sessions
-                    and not self.sessions[existing_session_key].is_expired()
-                ):
-                    logger.info(
-                        f"Reusing existing thread session {existing_session_key} for thread {thread_ts} (current user: {user})"
-                    )
-                    session = self.sessions[existing_session_key]
-                    session.update_activity()
-                    # Update current user for this interaction
-                    session.current_user = user
-                    return session
-
-        # For non-threaded or new threads, use user-based session key
-        key = f"{channel}_{user}_{thread_ts if thread_ts else 'main'}"
-
-        # Create new session if doesn't exist or is expired
-        if key not in self.sessions or self.sessions[key].is_expired():
-            self.sessions[key] = ConversationSession(channel, user, thread_ts)
-
-            # If this is a threaded message, record the mapping from thread to session
-            if thread_ts:
-                thread_key = f"{channel}_{thread_ts}"
-                self.thread_session_map[thread_key] = key
-                logger.info(f"Created new session for thread {thread_ts}: {key}")
-        else:
-            self.sessions[key].update_activity()
-            logger.info(f"Using existing session: {key}")
-
-        return self.sessions[key]
-
-    def _cleanup_expired_sessions(self):
-        expired_keys = [k for k, v in self.sessions.items() if v.is_expired()]
-
-        for k in expired_keys:
-            # Also remove any thread mappings to this session
-            expired_session = self.sessions[k]
-            if expired_session.thread_ts:
-                thread_key = f"{expired_session.channel}_{expired_session.thread_ts}"
-                if thread_key in self.thread_session_map:
-                    del self.thread_session_map[thread_key]
-
-            # Remove the session
-            del self.sessions[k]
-            logger.info(f"Cleaned up expired session: {k}")
-
-
-session_manager = SessionManager()
+        logger.error("Error initializing bot user ID: %s", e)
 
 
 async def send_acknowledgment_message(
@@ -227,39 +195,39 @@ async def send_acknowledgment_message(
         user: User ID
         thread_ts: Thread timestamp (optional)
 
+    The message is queued on the outbound dispatcher rather than awaited, so
+    a rate-limited channel does not hold up the agent call, and it is dropped
+    if the answer is ready before it could be sent.
+
     Returns:
-        bool: True if message sent successfully, False otherwise
+        bool: True if the message was queued, False otherwise
     """
     try:
         location = f"thread {thread_ts}" if thread_ts else "channel"
-        logger.info(f"Sending acknowledgment message to {location} for user {user}")
+        logger.info("Queueing acknowledgment message to %s for user %s", location, user)
 
-        response = await client.chat_postMessage(
-            channel=channel,
-            thread_ts=thread_ts,
-            text=f"I'm processing your request, <@{user}>! One moment please...",
+        slack_dispatcher.post_ack(
+            client, channel, ACK_MESSAGE.format(user=user), thread_ts=thread_ts
         )
-
-        if response.get("ok"):
-            logger.info(f"✅ Successfully sent acknowledgment message to {location}")
-            return True
-        else:
-            logger.error(f"❌ Failed to send acknowledgment message: {response}")
-            return False
+        return True
 
     except Exception as ack_error:
         logger.error(
-            f"❌ Exception sending acknowledgment message: {ack_error}", exc_info=True
+            "❌ Exception queueing acknowledgment message: %s", ack_error, exc_info=True
         )
         return False
 
 
+@traced("slack.fetch_thread_context")
 async def fetch_parent_message_content(
     client: AsyncWebClient, channel: str, thread_ts: str
 ) -> Dict[str, Any]:
     """
     Fetch the parent message content and recent thread history for context.
 
+    Threads are fetched from Slack once and then served from the thread
+    cache, which is kept current with replies from incoming message events.
+
     Args:
         client: Slack AsyncWebClient instance
         channel: Channel ID
@@ -269,60 +237,66 @@ async def fetch_parent_message_content(
         Dict containing parent message and thread context
     """
     try:
-        logger.info(
-            f"Fetching parent message content for thread {thread_ts} in channel {channel}"
-        )
+        thread = thread_context_cache.get(channel, thread_ts)
+        if thread is not None:
+            logger.debug("Using cached thread content for thread %s", thread_ts)
+        else:
+            logger.info(
+                "Fetching parent message content for thread %s in channel %s",
+                thread_ts,
+                channel,
+            )
 
-        # Fetch conversation replies to get the thread content
-        # The first message in replies is always the parent message
-        response = await client.conversations_replies(
-            channel=channel,
-            ts=thread_ts,
-            limit=10,  # Get parent + last 9 messages for context
-        )
+            # Fetch conversation replies to get the thread content
+            # The first message in replies is always the parent message
+            with SLACK_API_LATENCY.labels(method="conversations_replies").time():
+                response = await client.conversations_replies(
+                    channel=channel,
+                    ts=thread_ts,
+                    limit=THREAD_CONTEXT_MAX_REPLIES
+                    + 1,  # Parent + replies for context
+                )
 
-        if not response.get("ok"):
-            error = response.get("error", "Unknown error")
-            logger.warning(f"Failed to fetch thread messages: {error}")
-            return {"error": f"Slack API error: {error}"}
+            if not response.get("ok"):
+                error = response.get("error", "Unknown error")
+                logger.warning("Failed to fetch thread messages: %s", error)
+                return {"error": f"Slack API error: {error}"}
 
-        messages = response.get("messages", [])
-        if not messages:
-            logger.warning("No messages found in thread response")
-            return {"error": "No messages found in thread"}
+            messages = response.get("messages", [])
+            if not messages:
+                logger.warning("No messages found in thread response")
+                return {"error": "No messages found in thread"}
 
-        parent_message = messages[0]  # First message is always the parent
+            parent_message = messages[0]  # First message is always the parent
 
-        # Validate parent message has required fields
-        if not parent_message.get("ts") == thread_ts:
-            logger.warning(
-                f"Parent message timestamp {parent_message.get('ts')} doesn't match thread_ts {thread_ts}"
+            # Validate parent message has required fields
+            if not parent_message.get("ts") == thread_ts:
+                logger.warning(
+                    "Parent message timestamp %s doesn't match thread_ts %s",
+                    parent_message.get("ts"),
+                    thread_ts,
+                )
+                return {"error": "Parent message timestamp mismatch"}
+
+            thread = thread_context_cache.put(
+                channel, thread_ts, parent_message, messages[1:]
             )
-            return {"error": "Parent message timestamp mismatch"}
+
+        parent_message = thread.parent
 
         # Extract parent message content
         parent_content = {
             "text": parent_message.get("text", ""),
             "user": parent_message.get("user"),
             "timestamp": parent_message.get("ts"),
-            "user_profile": {},
+            "user_profile": await user_directory.lookup(
+                client, parent_message.get("user")
+            ),
         }
 
-        # Get user info for the parent message author
-        try:
-            user_info = await client.users_info(user=parent_message.get("user"))
-            if user_info.get("ok"):
-                user_profile = user_info.get("user", {}).get("profile", {})
-                parent_content["user_profile"] = {
-                    "display_name": user_profile.get("display_name", ""),
-                    "real_name": user_profile.get("real_name", ""),
-                }
-        except Exception as e:
-            logger.warning(f"Could not fetch user info: {e}")
-
         # Collect recent thread context (excluding the parent message)
         thread_context = []
-        for msg in messages[1:]:  # Skip parent message
+        for msg in thread.replies:
             if not msg.get("bot_id"):  # Exclude bot messages for cleaner context
                 thread_context.append(
                     {
@@ -332,275 +306,501 @@ async def fetch_parent_message_content(
                     }
                 )
 
+        thread_length = 1 + len(thread.replies)
         result = {
             "parent_message": parent_content,
             "thread_context": thread_context,
-            "thread_length": len(messages),
+            "thread_length": thread_length,
             "channel": channel,
         }
 
-        logger.debug(f"Successfully fetched thread content: {len(messages)} messages")
+        logger.debug("Successfully fetched thread content: %s messages", thread_length)
         return result
 
     except Exception as e:
-        logger.error(f"Error fetching parent message content: {e}", exc_info=True)
+        ERRORS.labels(type="thread_fetch").inc()
+        logger.error("Error fetching parent message content: %s", e, exc_info=True)
         return {"error": f"Failed to fetch thread content: {str(e)}"}
 
 
+def api_headers() -> dict[str, str]:
+    """Headers for sre-bot-api requests, carrying the request ID and trace context"""
+    request_id = get_request_id()
+    headers = {"X-Request-ID": request_id} if request_id else {}
+    return inject_trace_headers(headers)
+
+
+@traced("api.create_session")
 async def create_api_session(
     session: ConversationSession, parent_thread_data: Dict[str, Any] = None
 ) -> bool:
     """Create a new session with the sre-bot-api, or handle case where session already exists"""
-    async with aiohttp.ClientSession() as client:
-        try:
-            # Use the format from the README examples
-            url = f"{API_BASE_URL}/apps/sre_agent/users/{session.user_id}/sessions/{session.session_id}"
-            # Enhanced payload with thread context and parent message data
-            payload = {
-                "state": {
-                    "channel": session.channel,
-                    "thread_ts": session.thread_ts,
-                    "slack_user": session.current_user,  # Use current user, not original
-                    "original_user": session.user,  # Keep track of who started the thread
-                    # Add parent thread context if available
-                    "thread_context": parent_thread_data if parent_thread_data else {},
-                    "has_thread_context": bool(parent_thread_data),
-                    # Add timestamp for context freshness
-                    "session_created_at": datetime.now().isoformat(),
-                }
+    try:
+        # Use the format from the README examples
+        url = f"{API_BASE_URL}/apps/sre_agent/users/{session.user_id}/sessions/{session.session_id}"
+        # Enhanced payload with thread context and parent message data
+        payload = {
+            "state": {
+                "channel": session.channel,
+                "thread_ts": session.thread_ts,
+                "slack_user": session.current_user,  # Use current user, not original
+                "original_user": session.user,  # Keep track of who started the thread
+                # Add parent thread context if available
+                "thread_context": parent_thread_data if parent_thread_data else {},
+                "has_thread_context": bool(parent_thread_data),
+                # Answer served from the answer cache before the session existed
+                "cached_exchange": session.cached_exchange or {},
+                # Add timestamp for context freshness
+                "session_created_at": datetime.now().isoformat(),
             }
-            logger.info(f"Creating API session at URL: {url}")
-            logger.debug(f"Session payload: {payload}")
+        }
+        logger.info("Creating API session at URL: %s", url)
+        logger.debug("Session payload: %s", payload)
 
-            # Add timeout to connection attempt
-            logger.info("Attempting connection to sre-bot-api...")
-            try:
-                async with client.post(url, json=payload, timeout=10) as response:
-                    response_text = await response.text()
+        # Add timeout to connection attempt
+        logger.info("Attempting connection to sre-bot-api...")
+        start_time = time.time()
+        try:
+            async with api_client.post(
+                url, json=payload, headers=api_headers(), timeout=CREATE_SESSION_TIMEOUT
+            ) as response:
+                response_text = await response.text()
+                API_REQUEST_LATENCY.labels(endpoint="create_session").observe(
+                    time.time() - start_time
+                )
+                logger.info(
+                    "API Response Status: %s, Body: %.200s",
+                    response.status,
+                    response_text,
+                )
+
+                # Consider both 200 OK and 400 with "Session already exists" as success
+                if response.status == 200:
+                    logger.info("Successfully created session %s", session.session_id)
+                    known_api_sessions.mark_known(session.user_id, session.session_id)
+                    return True
+                elif response.status == 400 and "already exists" in response_text:
                     logger.info(
-                        f"API Response Status: {response.status}, Body: {response_text[:200]}"
+                        "Session %s already exists, proceeding anyway",
+                        session.session_id,
                     )
-
-                    # Consider both 200 OK and 400 with "Session already exists" as success
-                    if response.status == 200:
-                        logger.info(
-                            f"Successfully created session {session.session_id}"
-                        )
-                        return True
-                    elif response.status == 400 and "already exists" in response_text:
-                        logger.info(
-                            f"Session {session.session_id} already exists, proceeding anyway"
-                        )
-                        return True
-                    else:
-                        logger.error(
-                            f"Failed to create session. Status: {response.status}, Response: {response_text}"
-                        )
-                        return False
-            except asyncio.TimeoutError:
-                logger.error("Connection timeout when trying to connect to sre-bot-api")
-                return False
-            except aiohttp.ClientConnectorError as conn_err:
-                logger.error(f"Connection error to sre-bot-api: {conn_err}")
-                return False
-
-        except Exception as e:
-            logger.error(f"Error creating API session: {e}", exc_info=True)
+                    known_api_sessions.mark_known(session.user_id, session.session_id)
+                    return True
+                else:
+                    ERRORS.labels(type=f"api_status_{response.status}").inc()
+                    logger.error(
+                        "Failed to create session. Status: %s, Response: %s",
+                        response.status,
+                        response_text,
+                    )
+                    return False
+        except CircuitOpenError as e:
+            logger.warning("Not creating session %s: %s", session.session_id, e)
+            return False
+        except asyncio.TimeoutError:
+            ERRORS.labels(type="api_timeout").inc()
+            logger.error("Connection timeout when trying to connect to sre-bot-api")
             return False
+        except aiohttp.ClientConnectorError as conn_err:
+            ERRORS.labels(type="api_connection").inc()
+            logger.error("Connection error to sre-bot-api: %s", conn_err)
+            return False
+
+    except Exception as e:
+        ERRORS.labels(type="api_session").inc()
+        logger.error("Error creating API session: %s", e, exc_info=True)
+        return False
 
 
-async def send_message_to_api(session: ConversationSession, message: str) -> str:
+async def ensure_api_session(
+    session: ConversationSession, parent_thread_data: Dict[str, Any] = None
+) -> bool:
+    """Make sure the sre-bot-api session exists, skipping the call for known sessions"""
+    if known_api_sessions.is_known(session.user_id, session.session_id):
+        logger.debug("Session %s already known to API", session.session_id)
+        return True
+    return await create_api_session(session, parent_thread_data)
+
+
+@traced("api.run")
+async def send_message_to_api(
+    session: ConversationSession,
+    message: str,
+    retry_missing_session: bool = True,
+    parent_thread_data: Dict[str, Any] = None,
+) -> str:
     """Send a message to the sre-bot-api and get the response"""
-    async with aiohttp.ClientSession() as client:
+    try:
+        # Use the /run endpoint which we know works from the logs
+        url = f"{API_BASE_URL}/run"
+        payload = {
+            "app_name": "sre_agent",
+            "user_id": session.user_id,
+            "session_id": session.session_id,
+            "new_message": {"role": "user", "parts": [{"text": message}]},
+        }
+
+        logger.info("Sending message to API at URL: %s", url)
+        logger.debug("Message payload: %s", payload)
+
+        # Track API call timing
+        start_time = time.time()
+        # Configurable timeout for the API to respond
+        async with api_client.post(
+            url, json=payload, headers=api_headers(), timeout=RUN_TIMEOUT
+        ) as response:
+            response_time_ms = (time.time() - start_time) * 1000
+            API_REQUEST_LATENCY.labels(endpoint="run").observe(response_time_ms / 1000)
+            if response.status == 200:
+                logger.info(
+                    "API call successful - Status: %s, Response time: %.2fms",
+                    response.status,
+                    response_time_ms,
+                )
+                # Try to parse as JSON
+                try:
+                    data = await response.json()
+                except Exception as json_err:
+                    # If it's not valid JSON, get it as text
+                    logger.error("Failed to parse JSON response: %s", json_err)
+                    data = await response.text()
+                    logger.debug("Response as text: %s", data)
+                    return f"Got non-JSON response: {data[:200]}..."
+
+                api_response = extract_response_text(data)
+                if api_response is None:
+                    logger.warning(
+                        "Could not extract answer text from %s response with %s items",
+                        type(data).__name__,
+                        len(data) if isinstance(data, (list, dict)) else 0,
+                    )
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Unrecognized API response: %.200s", data)
+                    return "Sorry, I couldn't find an answer in the agent's response."
+
+                logger.debug(
+                    "Extracted %s characters of answer text", len(api_response)
+                )
+                return api_response
+            elif response.status == 404 and retry_missing_session:
+                # The API lost the session (e.g. database reset); recreate and retry once
+                logger.warning(
+                    "Session %s not found by API, recreating it", session.session_id
+                )
+                known_api_sessions.invalidate(session.user_id, session.session_id)
+                # Drain the body so the connection goes back to the pool
+                await response.read()
+            else:
+                error_text = await response.text()
+                ERRORS.labels(type=f"api_status_{response.status}").inc()
+                logger.error(
+                    "API returned status %s: %.200s, Response time: %.2fms",
+                    response.status,
+                    error_text,
+                    response_time_ms,
+                )
+                return f"Error: API returned status {response.status}"
+
+        # Retry outside the first response, so it does not hold a pooled connection
+        if await create_api_session(session, parent_thread_data):
+            return await send_message_to_api(
+                session, message, retry_missing_session=False
+            )
+        return "Error: API returned status 404"
+    except CircuitOpenError as e:
+        logger.warning("Not sending message to API: %s", e)
+        return "Sorry, " + API_UNAVAILABLE_MESSAGE.format(
+            seconds=max(1, round(e.retry_after))
+        )
+    except Exception as e:
+        ERRORS.labels(type="api_request").inc()
+        logger.error("Error sending message to API: %s", e, exc_info=True)
+        return f"Error communicating with API: {str(e)}"
+
+
+@traced("api.run_sse")
+async def stream_message_to_api(
+    session: ConversationSession,
+    message: str,
+    updater: SlackStreamUpdater,
+    parent_thread_data: Dict[str, Any] = None,
+) -> str:
+    """
+    Send a message to the sre-bot-api SSE endpoint, relaying progress to Slack.
+
+    Events are folded into the answer as they arrive and pushed to the updater,
+    which coalesces them into chat.update calls. Falls back to the blocking
+    /run endpoint if the stream fails before the agent produced any event.
+
+    Args:
+        session: Conversation session to run the agent in
+        message: Message text to send
+        updater: Slack message updater that receives progress
+        parent_thread_data: Thread context, to recreate a session the API lost
+
+    Returns:
+        str: Final answer text
+    """
+    answer = StreamingAnswer()
+    try:
+        url = f"{API_BASE_URL}/run_sse"
+        payload = {
+            "app_name": "sre_agent",
+            "user_id": session.user_id,
+            "session_id": session.session_id,
+            "new_message": {"role": "user", "parts": [{"text": message}]},
+            "streaming": True,
+        }
+
+        logger.info("Streaming message to API at URL: %s", url)
+        start_time = time.time()
+        first_event_ms = None
+        stream_failed = False
+        async with api_client.post(
+            url, json=payload, headers=api_headers(), timeout=STREAM_TIMEOUT
+        ) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                logger.error(
+                    "Streaming API returned status %s: %.200s",
+                    response.status,
+                    error_text,
+                )
+                stream_failed = True
+            else:
+                async for event in iter_sse_events(response.content):
+                    if first_event_ms is None:
+                        first_event_ms = (time.time() - start_time) * 1000
+                        logger.info("First streamed event after %.2fms", first_event_ms)
+                    if answer.apply(event):
+                        if answer.error:
+                            break
+                        await updater.update(answer.render())
+
+        if stream_failed:
+            # Fall back only after leaving the first response, so its outcome
+            # is recorded and it no longer holds a half-open probe
+            return await send_message_to_api(
+                session, message, parent_thread_data=parent_thread_data
+            )
+
+        response_time_ms = (time.time() - start_time) * 1000
+        API_REQUEST_LATENCY.labels(endpoint="run_sse").observe(response_time_ms / 1000)
+        logger.info(
+            "Streaming API call finished - %d events, %d Slack updates, "
+            "Response time: %.2fms",
+            answer.event_count,
+            updater.update_count,
+            response_time_ms,
+        )
+
+        if answer.error:
+            ERRORS.labels(type="agent_run").inc()
+            logger.error("Agent run failed during streaming: %s", answer.error)
+            return f"Error: agent run failed: {answer.error}"
+        if not answer.text.strip():
+            logger.warning("Stream ended without answer text")
+            return "I wasn't able to produce an answer for that request."
+        return answer.text.strip()
+
+    except CircuitOpenError as e:
+        # The blocking endpoint would be rejected just the same
+        logger.warning("Not streaming message to API: %s", e)
+        return "Sorry, " + API_UNAVAILABLE_MESSAGE.format(
+            seconds=max(1, round(e.retry_after))
+        )
+    except Exception as e:
+        ERRORS.labels(type="api_stream").inc()
+        logger.error("Error streaming message to API: %s", e, exc_info=True)
+        if answer.text.strip():
+            return answer.text.strip() + INTERRUPTED_NOTE
+        if answer.event_count == 0:
+            # Nothing ran yet, so retrying on the blocking endpoint is safe
+            return await send_message_to_api(
+                session, message, parent_thread_data=parent_thread_data
+            )
+        return f"Error communicating with API: {str(e)}"
+
+
+async def answer_message(
+    session: ConversationSession,
+    client: AsyncWebClient,
+    channel: str,
+    user: str,
+    message: str,
+    original_message_ts: str | None = None,
+    updater: SlackStreamUpdater | None = None,
+    cacheable: bool = False,
+) -> str:
+    """
+    Gather thread context, ensure the API session and get the agent's answer.
+
+    With cacheable, the message opens a conversation rather than following up
+    on one, so repeats of it may be answered from the answer cache.
+    """
+    # Fetch parent thread content if this is an existing thread message (not one we just created)
+    parent_thread_data = None
+    # thread_just_created is True when we created a new thread in this request
+    # This happens when we had no thread_ts initially and original_message_ts was provided
+    thread_just_created = (
+        session.thread_ts == original_message_ts and original_message_ts is not None
+    )
+
+    # Checked before the circuit breaker, so cached answers are still served
+    # while sre-bot-api is down
+    if cacheable:
+        cached_answer = answer_cache.get(message)
+        if cached_answer is not None:
+            # The agent never saw this exchange; keep it for the session's next
+            # turn so follow-ups in the thread know what was answered
+            session.cached_exchange = {"question": message, "answer": cached_answer}
+            try:
+                await session_manager.save_session(session)
+            except Exception as save_error:
+                logger.error(
+                    "Failed to save cached exchange for session %s: %s",
+                    session.session_id,
+                    save_error,
+                )
+            return cached_answer
+
+    if api_client.breaker.is_rejecting():
+        # sre-bot-api is down; say so now instead of after a timeout
+        retry_after = max(1, round(api_client.breaker.retry_after()))
+        return f"Sorry <@{user}>, " + API_UNAVAILABLE_MESSAGE.format(
+            seconds=retry_after
+        )
+
+    if session.thread_ts and not thread_just_created:
+        logger.info(
+            "Bot mentioned in existing thread %s, fetching parent message content",
+            session.thread_ts,
+        )
         try:
-            # Use the /run endpoint which we know works from the logs
-            url = f"{API_BASE_URL}/run"
-            payload = {
-                "app_name": "sre_agent",
-                "user_id": session.user_id,
-                "session_id": session.session_id,
-                "new_message": {"role": "user", "parts": [{"text": message}]},
-            }
+            parent_thread_data = await fetch_parent_message_content(
+                client, channel, session.thread_ts
+            )
 
-            logger.info(f"Sending message to API at URL: {url}")
-            logger.debug(f"Message payload: {payload}")
+            if parent_thread_data.get("error"):
+                logger.warning(
+                    "Could not fetch parent thread data: %s",
+                    parent_thread_data["error"],
+                )
+                parent_thread_data = None
+            else:
+                logger.info(
+                    "Successfully fetched parent thread data with %s messages",
+                    parent_thread_data.get("thread_length", 0),
+                )
+        except Exception as thread_fetch_error:
+            logger.error(
+                "Exception while fetching thread content: %s",
+                thread_fetch_error,
+                exc_info=True,
+            )
+            parent_thread_data = None
+    elif thread_just_created:
+        logger.debug("Thread was just created by bot, skipping parent message fetch")
+    else:
+        logger.debug("Non-threaded message, skipping parent message fetch")
+
+    # Create API session if needed - consider session exists case as success
+    session_created = False
+    try:
+        # Skip the broken health check endpoint
+        session_created = await ensure_api_session(session, parent_thread_data)
+    except Exception as create_error:
+        logger.error("Failed to create session: %s", create_error, exc_info=True)
+
+    if not session_created:
+        error_message = (
+            "I couldn't establish a connection with the sre-bot-api service. This could be because:\n"
+            "1. The API service is not running\n"
+            "2. There's a network issue between services\n"
+            "3. The API endpoint is incorrect\n\n"
+            "Please check the logs for more details."
+        )
 
-            # Track API call timing
-            start_time = time.time()
-            # Configurable timeout for the API to respond
-            async with client.post(url, json=payload, timeout=API_TIMEOUT) as response:
-                response_time_ms = (time.time() - start_time) * 1000
-                if response.status == 200:
-                    logger.info(
-                        f"API call successful - Status: {response.status}, Response time: {response_time_ms:.2f}ms"
-                    )
-                    # Try to parse as JSON
-                    try:
-                        data = await response.json()
-                        logger.debug(
-                            f"API response type: {type(data)}, content sample: {str(data)[:200]}..."
-                        )
-                    except Exception as json_err:
-                        # If it's not valid JSON, get it as text
-                        logger.error(f"Failed to parse JSON response: {json_err}")
-                        data = await response.text()
-                        logger.debug(f"Response as text: {data}")
-                        return f"Got non-JSON response: {data[:200]}..."
-
-                    # Handle different response formats
-                    api_response = ""
-
-                    # Handling for Event/Content/Parts structure (common in ADK responses)
-                    if (
-                        isinstance(data, list)
-                        and len(data) > 0
-                        and isinstance(data[-1], dict)
-                    ):
-                        # Check for ADK event structure
-                        if "id" in data[-1] and "content" in data[-1]:
-                            logger.debug("Found ADK event structure in list response")
-                            event = data[-1]
-                            if (
-                                isinstance(event["content"], dict)
-                                and "parts" in event["content"]
-                            ):
-                                parts = event["content"]["parts"]
-                                if isinstance(parts, list) and len(parts) > 0:
-                                    part = parts[0]
-                                    if isinstance(part, dict) and "text" in part:
-                                        api_response = part["text"]
-                                        logger.debug(
-                                            f"Extracted text from event/content/parts: {api_response[:50]}..."
-                                        )
-                                        return api_response
-
-                    # Check for state_delta["kubernetes_agent_output"] - this appears in the logs
-                    if (
-                        isinstance(data, list)
-                        and len(data) > 0
-                        and isinstance(data[-1], dict)
-                    ):
-                        event = data[-1]
-                        if "actions" in event and isinstance(event["actions"], dict):
-                            actions = event["actions"]
-                            if "state_delta" in actions and isinstance(
-                                actions["state_delta"], dict
-                            ):
-                                state_delta = actions["state_delta"]
-                                if "kubernetes_agent_output" in state_delta:
-                                    api_response = state_delta[
-                                        "kubernetes_agent_output"
-                                    ]
-                                    if isinstance(api_response, str):
-                                        logger.debug(
-                                            f"Extracted text from state_delta: {api_response[:50]}..."
-                                        )
-                                        return api_response
-
-                    # Case 1: Response is a dictionary
-                    if isinstance(data, dict):
-                        logger.debug("Handling dictionary response")
-                        # Try common key names used in API responses
-                        for key in [
-                            "response",
-                            "text",
-                            "content",
-                            "message",
-                            "answer",
-                            "result",
-                            "output",
-                        ]:
-                            if key in data and data[key]:
-                                logger.debug(f"Found value in key: {key}")
-                                if isinstance(data[key], str):
-                                    api_response = data[key]
-                                    break
-                                elif (
-                                    isinstance(data[key], dict) and "text" in data[key]
-                                ):
-                                    api_response = data[key]["text"]
-                                    break
-                                elif (
-                                    isinstance(data[key], dict)
-                                    and "content" in data[key]
-                                ):
-                                    api_response = data[key]["content"]
-                                    break
-
-                        # Check for candidate objects with text
-                        if (
-                            not api_response
-                            and "candidates" in data
-                            and isinstance(data["candidates"], list)
-                            and data["candidates"]
-                        ):
-                            logger.debug("Looking in candidates list")
-                            candidate = data["candidates"][0]
-                            if isinstance(candidate, dict):
-                                if (
-                                    "content" in candidate
-                                    and isinstance(candidate["content"], dict)
-                                    and "parts" in candidate["content"]
-                                ):
-                                    parts = candidate["content"]["parts"]
-                                    if (
-                                        isinstance(parts, list)
-                                        and parts
-                                        and "text" in parts[0]
-                                    ):
-                                        api_response = parts[0]["text"]
-
-                        # Direct return if we found a response
-                        if api_response:
-                            return api_response
-
-                    # Case 2: Response is a list
-                    elif isinstance(data, list):
-                        logger.debug("Handling list response")
-                        if data:
-                            if isinstance(data[0], dict):
-                                # Try to extract text from the first item
-                                for key in ["text", "content", "message", "response"]:
-                                    if key in data[0]:
-                                        logger.debug(
-                                            f"Found value in list item key: {key}"
-                                        )
-                                        api_response = data[0][key]
-                                        break
-                            elif isinstance(data[0], str):
-                                api_response = data[0]
-
-                    # Case 3: Response is a string
-                    elif isinstance(data, str):
-                        logger.debug("Handling string response")
-                        api_response = data
-
-                    # If we still don't have a response, use string representation
-                    if not api_response:
-                        logger.warning(
-                            f"Could not extract structured response, using string representation: {str(data)[:200]}"
-                        )
-                        # Convert to string but don't call strip() on a dict
-                        api_response = str(data)
-                    elif isinstance(api_response, str):
-                        # Only strip if it's a string to avoid the error
-                        api_response = api_response.strip()
-                    else:
-                        # If api_response is not a string, convert it
-                        api_response = str(api_response)
-
-                    return api_response
-                else:
-                    error_text = await response.text()
-                    logger.error(
-                        f"API returned status {response.status}: {error_text[:200]}, Response time: {response_time_ms:.2f}ms"
-                    )
-                    return f"Error: API returned status {response.status}"
-        except Exception as e:
-            logger.error(f"Error sending message to API: {e}", exc_info=True)
-            return f"Error communicating with API: {str(e)}"
+        return f"Sorry <@{user}>, {error_message}"
 
+    # Send message to API and get response
+    # Include parent thread context in the message if available
+    enhanced_message = message
+    if parent_thread_data and not parent_thread_data.get("error"):
+        parent_msg = parent_thread_data.get("parent_message", {})
+        parent_text = parent_msg.get("text", "").strip()
 
+        if parent_text:
+            # Get author name with fallback options
+            author_name = "Unknown"
+            user_profile = parent_msg.get("user_profile", {})
+            if user_profile.get("display_name"):
+                author_name = user_profile["display_name"]
+            elif user_profile.get("real_name"):
+                author_name = user_profile["real_name"]
+            elif parent_msg.get("user"):
+                author_name = f"User {parent_msg['user']}"
+
+            thread_length = parent_thread_data.get("thread_length", 1)
+
+            enhanced_message = f"""User message: {message}
+
+Thread Context:
+- Original message: "{parent_text}"
+- Original author: {author_name}
+- Thread length: {thread_length} messages
+- Context: This message is part of an ongoing thread discussion
+
+Please consider this thread context when responding to provide relevant and coherent assistance."""
+
+            logger.debug("Enhanced message with thread context from %s", author_name)
+        else:
+            logger.debug(
+                "Parent message has no text content, using original message only"
+            )
+    else:
+        logger.debug("No thread context available, using original message only")
+
+    cached_exchange = session.cached_exchange
+    if cached_exchange:
+        # An earlier question in this thread was answered from the answer cache
+        enhanced_message = f"""Earlier in this thread you were asked: "{cached_exchange["question"]}"
+You answered: "{cached_exchange["answer"]}"
+
+{enhanced_message}"""
+
+    if updater is not None:
+        # Progressively edit a single message as the agent works
+        answer = await stream_message_to_api(
+            session, enhanced_message, updater, parent_thread_data
+        )
+    else:
+        answer = await send_message_to_api(
+            session, enhanced_message, parent_thread_data=parent_thread_data
+        )
+
+    if cached_exchange and not answer.startswith(FAILED_ANSWER_PREFIXES):
+        # The agent has now seen the exchange as part of this turn
+        session.cached_exchange = None
+        try:
+            await session_manager.save_session(session)
+        except Exception as save_error:
+            logger.error(
+                "Failed to clear cached exchange for session %s: %s",
+                session.session_id,
+                save_error,
+            )
+
+    if (
+        cacheable
+        and not answer.startswith(FAILED_ANSWER_PREFIXES)
+        and not answer.endswith(INTERRUPTED_NOTE)
+    ):
+        answer_cache.put(message, answer)
+    return answer
+
+
+@traced("slack.process_message")
 async def process_message_with_api(
     client: AsyncWebClient,
     channel: str,
@@ -608,188 +808,326 @@ async def process_message_with_api(
     user: str,
     message: str,
     original_message_ts: str | None = None,
+    received_at: float | None = None,
+    cacheable: bool = False,
 ):
     """Process the message using the API and send response"""
     try:
-        # Send acknowledgment message immediately for ANY threaded message
-        if thread_ts:
-            logger.info(
-                "🔄 Detected threaded message - sending immediate acknowledgment"
-            )
+        # Replies go to the existing thread, or start one under the original message
+        reply_thread_ts = thread_ts or original_message_ts
+
+        if not ADAPTIVE_ACK_ENABLED:
+            # Send acknowledgment message immediately
             ack_sent = await send_acknowledgment_message(
-                client, channel, user, thread_ts
+                client, channel, user, reply_thread_ts
             )
-            logger.info(f"🔄 Immediate acknowledgment sent: {ack_sent}")
+            logger.info("🔄 Immediate acknowledgment queued: %s", ack_sent)
 
         # Handle thread creation for direct mentions
         if not thread_ts and original_message_ts:
             logger.info(
-                f"Processing direct mention from user {user} in channel {channel} - will create thread under original message"
+                "Processing direct mention from user %s in channel %s - "
+                "will create thread under original message",
+                user,
+                channel,
             )
 
-            # Create thread by replying to the original message
-            thread_ts = original_message_ts
-            ack_sent = await send_acknowledgment_message(
-                client, channel, user, thread_ts
+            # Our first reply creates the thread under the original message
+            session = await session_manager.get_session(channel, user, None)
+            session = await session_manager.update_session_thread(
+                session, original_message_ts
             )
 
-            if ack_sent:
-                logger.info(
-                    f"Created thread under message {thread_ts} for user {user} in channel {channel}"
-                )
-
-                # Get session and update it with the new thread
-                session = session_manager.get_session(channel, user, None)
-                session = session_manager.update_session_thread(session, thread_ts)
-
-                logger.info(
-                    f"Thread created and session migrated: {session.session_id}"
-                )
-            else:
-                logger.error("Failed to send acknowledgment message for new thread")
-                # Fall back to no thread but still create session
-                session = session_manager.get_session(channel, user, None)
+            logger.info("Thread created and session migrated: %s", session.session_id)
         elif not thread_ts and not original_message_ts:
             logger.warning(
-                f"Cannot create thread - no original message timestamp provided for user {user} in channel {channel}"
+                "Cannot create thread - no original message timestamp provided for user %s in channel %s",
+                user,
+                channel,
             )
             # Fall back to no thread
-            session = session_manager.get_session(channel, user, None)
-
-            # Send acknowledgment message for non-threaded responses
-            await send_acknowledgment_message(client, channel, user)
+            session = await session_manager.get_session(channel, user, None)
         else:
             logger.info(
-                f"Processing threaded message from user {user} in thread {thread_ts}"
+                "Processing threaded message from user %s in thread %s",
+                user,
+                thread_ts,
             )
 
             # Get or create session for existing thread
             # This will reuse existing session if thread already has one, or create new one
-            session = session_manager.get_session(channel, user, thread_ts)
-
-        # Fetch parent thread content if this is an existing thread message (not one we just created)
-        parent_thread_data = None
-        # thread_just_created is True when we created a new thread in this request
-        # This happens when we had no thread_ts initially and original_message_ts was provided
-        thread_just_created = (
-            session.thread_ts == original_message_ts and original_message_ts is not None
-        )
-
-        if session.thread_ts and not thread_just_created:
-            logger.info(
-                f"Bot mentioned in existing thread {session.thread_ts}, fetching parent message content"
-            )
-            try:
-                parent_thread_data = await fetch_parent_message_content(
-                    client, channel, session.thread_ts
+            session = await session_manager.get_session(channel, user, thread_ts)
+
+        updater = None
+        if STREAMING_ENABLED:
+            updater = SlackStreamUpdater(client, channel, session.thread_ts)
+        # Turns of one thread run in order, one at a time, including delivery
+        async with contextlib.AsyncExitStack() as turn:
+
+            async def answer() -> str:
+                await turn.enter_async_context(session_locks.hold(session.session_id))
+                return await answer_message(
+                    session,
+                    client,
+                    channel,
+                    user,
+                    message,
+                    original_message_ts,
+                    updater,
+                    cacheable=cacheable,
                 )
 
-                if parent_thread_data.get("error"):
-                    logger.warning(
-                        f"Could not fetch parent thread data: {parent_thread_data['error']}"
-                    )
-                    parent_thread_data = None
-                else:
-                    logger.info(
-                        f"Successfully fetched parent thread data with {parent_thread_data.get('thread_length', 0)} messages"
-                    )
-            except Exception as thread_fetch_error:
-                logger.error(
-                    f"Exception while fetching thread content: {thread_fetch_error}",
-                    exc_info=True,
+            if ADAPTIVE_ACK_ENABLED:
+                # Acknowledge only if the answer is slow, then edit the ack into it.
+                # The deadline covers waiting for earlier turns of the thread too.
+                ack = AdaptiveAck(
+                    client,
+                    channel,
+                    session.thread_ts,
+                    ACK_MESSAGE.format(user=user),
+                    updater=updater,
+                )
+                response = await ack.run(answer())
+                await deliver_answer(
+                    client, channel, response, session.thread_ts, updater=ack
+                )
+            else:
+                response = await answer()
+                # Send response back to Slack (use the session's thread_ts which may have been updated)
+                await deliver_answer(
+                    client, channel, response, session.thread_ts, updater=updater
                 )
-                parent_thread_data = None
-        elif thread_just_created:
-            logger.debug(
-                "Thread was just created by bot, skipping parent message fetch"
-            )
-        else:
-            logger.debug("Non-threaded message, skipping parent message fetch")
 
-        # Create API session if needed - consider session exists case as success
-        session_created = False
-        try:
-            # Skip the broken health check endpoint
-            session_created = await create_api_session(session, parent_thread_data)
-        except Exception as create_error:
-            logger.error(f"Failed to create session: {create_error}", exc_info=True)
-
-        if not session_created:
-            error_message = (
-                "I couldn't establish a connection with the sre-bot-api service. This could be because:\n"
-                "1. The API service is not running\n"
-                "2. There's a network issue between services\n"
-                "3. The API endpoint is incorrect\n\n"
-                "Please check the logs for more details."
-            )
+        if received_at is not None:
+            MENTION_TO_ANSWER.observe(time.monotonic() - received_at)
+
+    except SessionBusyError as e:
+        logger.warning("Not answering message from user %s: %s", user, e)
+        await slack_dispatcher.post_message(
+            client,
+            channel,
+            f"<@{user}>, I'm still working on earlier messages in this thread. "
+            "Please wait for those answers before asking more.",
+            thread_ts=session.thread_ts,
+        )
+    except Exception as e:
+        ERRORS.labels(type="processing").inc()
+        logger.error("Error processing message: %s", e)
+        await slack_dispatcher.post_message(
+            client,
+            channel,
+            f"Sorry <@{user}>, something went wrong while processing your request.",
+            thread_ts=session.thread_ts if "session" in locals() else thread_ts,
+        )
 
-            await client.chat_postMessage(
-                channel=channel,
-                text=f"Sorry <@{user}>, {error_message}",
-                thread_ts=thread_ts,
-            )
-            return
-
-        # Send message to API and get response
-        # Include parent thread context in the message if available
-        enhanced_message = message
-        if parent_thread_data and not parent_thread_data.get("error"):
-            parent_msg = parent_thread_data.get("parent_message", {})
-            parent_text = parent_msg.get("text", "").strip()
-
-            if parent_text:
-                # Get author name with fallback options
-                author_name = "Unknown"
-                user_profile = parent_msg.get("user_profile", {})
-                if user_profile.get("display_name"):
-                    author_name = user_profile["display_name"]
-                elif user_profile.get("real_name"):
-                    author_name = user_profile["real_name"]
-                elif parent_msg.get("user"):
-                    author_name = f"User {parent_msg['user']}"
-
-                thread_length = parent_thread_data.get("thread_length", 1)
-
-                enhanced_message = f"""User message: {message}
 
-Thread Context:
-- Original message: "{parent_text}"
-- Original author: {author_name}
-- Thread length: {thread_length} messages
-- Context: This message is part of an ongoing thread discussion
+async def enqueue_message_processing(
+    client: AsyncWebClient,
+    channel: str,
+    thread_ts: str | None,
+    user: str,
+    message: str,
+    original_message_ts: str | None = None,
+    debounce: bool = False,
+    cacheable: bool = False,
+):
+    """
+    Queue a message for background processing, telling the user if the bot is at capacity.
 
-Please consider this thread context when responding to provide relevant and coherent assistance."""
+    With debounce, the message is a thread reply and is held briefly so that
+    messages the user sends right after it go to the agent as one turn.
+    With cacheable, the message is a top-level mention whose answer may be
+    served from, and stored in, the answer cache.
+    """
+    limited = rate_limiter.acquire(user, channel)
+    if limited is not None:
+        scope, retry_after, notify = limited
+        if notify:
+            # Told once per window, so a flood does not also flood the channel
+            await slack_dispatcher.post_message(
+                client,
+                channel,
+                RATE_LIMIT_MESSAGES[scope].format(
+                    user=user, seconds=max(1, round(retry_after))
+                ),
+                thread_ts=thread_ts or original_message_ts,
+            )
+        return
 
-                logger.debug(f"Enhanced message with thread context from {author_name}")
-            else:
-                logger.debug(
-                    "Parent message has no text content, using original message only"
-                )
-        else:
-            logger.debug("No thread context available, using original message only")
+    if debounce and thread_ts and thread_debouncer.enabled:
+        thread_debouncer.add(
+            (channel, thread_ts, user),
+            message,
+            functools.partial(dispatch_thread_turn, client, channel, thread_ts, user),
+        )
+        return
+
+    work = {
+        "channel": channel,
+        "thread_ts": thread_ts,
+        "user": user,
+        "message": message,
+        "original_message_ts": original_message_ts,
+        "cacheable": cacheable,
+        "request_id": get_request_id(),
+    }
+    await queue_message_processing(client, work, received_at=time.monotonic())
 
-        response = await send_message_to_api(session, enhanced_message)
 
-        # Send response back to Slack (use the session's thread_ts which may have been updated)
-        await client.chat_postMessage(
-            channel=channel, text=response, thread_ts=session.thread_ts
+async def dispatch_thread_turn(
+    client: AsyncWebClient,
+    channel: str,
+    thread_ts: str,
+    user: str,
+    message: str,
+    received_at: float,
+    wrap: Callable[[JobFactory], JobFactory],
+) -> Dict[str, Any] | None:
+    """Queue thread messages merged by the debouncer as one agent turn, returning its work"""
+    work = {
+        "channel": channel,
+        "thread_ts": thread_ts,
+        "user": user,
+        "message": message,
+        "original_message_ts": None,
+        "request_id": get_request_id(),
+    }
+    if await queue_message_processing(client, work, received_at, wrap=wrap):
+        return work
+    return None
+
+
+async def queue_message_processing(
+    client: AsyncWebClient,
+    work: Dict[str, Any],
+    received_at: float | None = None,
+    wrap: Callable[[JobFactory], JobFactory] | None = None,
+) -> bool:
+    """Queue a request, handing it over or apologizing if this replica cannot take it"""
+    if submit_message_processing(client, work, received_at, wrap=wrap):
+        return True
+    user = work["user"]
+    if not worker_pool.accepting:
+        # This replica is shutting down; hand the request to another one
+        if await pending_work.save([work]):
+            return False
+        text = (
+            f"Sorry <@{user}>, I'm restarting right now. Please try again in a minute."
+        )
+    else:
+        text = (
+            f"Sorry <@{user}>, I'm handling too many requests right now. "
+            "Please try again in a few minutes."
         )
+    await slack_dispatcher.post_message(
+        client,
+        work["channel"],
+        text,
+        thread_ts=work["thread_ts"] or work["original_message_ts"],
+    )
+    return False
 
-    except Exception as e:
-        logger.error(f"Error processing message: {e}")
-        await client.chat_postMessage(
-            channel=channel,
-            text=f"Sorry <@{user}>, something went wrong while processing your request.",
-            thread_ts=session.thread_ts if "session" in locals() else thread_ts,
+
+def submit_message_processing(
+    client: AsyncWebClient,
+    work: Dict[str, Any],
+    received_at: float | None = None,
+    wrap: Callable[[JobFactory], JobFactory] | None = None,
+) -> bool:
+    """Queue a request described by `work` on the worker pool"""
+    job = functools.partial(
+        process_message_with_api,
+        client=client,
+        channel=work["channel"],
+        thread_ts=work["thread_ts"],
+        user=work["user"],
+        message=work["message"],
+        original_message_ts=work["original_message_ts"],
+        received_at=received_at,
+        # Requests saved by replicas predating the flag are not cached
+        cacheable=work.get("cacheable", False),
+    )
+    return worker_pool.submit(
+        wrap(job) if wrap else job,
+        user=work["user"],
+        channel=work["channel"],
+        work=work,
+    )
+
+
+async def resume_pending_work(work: Dict[str, Any]) -> bool:
+    """Queue a request saved by a replica that stopped before answering it"""
+    token = set_request_id(work.get("request_id") or new_request_id())
+    try:
+        logger.info(
+            "Resuming request from user %s in channel %s",
+            work["user"],
+            work["channel"],
         )
+        return submit_message_processing(app.client, work)
+    finally:
+        reset_request_id(token)
+
+
+def is_thread_reply(event: Dict[str, Any]) -> bool:
+    """
+    Whether a message event is a reply inside an existing thread.
+
+    A top-level message has no thread_ts, or one equal to its own ts.
+    """
+    thread_ts = event.get("thread_ts")
+    return bool(thread_ts) and thread_ts != event.get("ts")
+
+
+@app.middleware
+async def assign_request_id(body, next):
+    """Tag logs, spans and API calls for this Slack event with a request ID"""
+    request_id = body.get("event_id") or new_request_id()
+    set_request_id(request_id)
+    span = trace.get_current_span()
+    span.set_attribute("slack.request_id", request_id)
+    event = body.get("event") or {}
+    if event:
+        span.set_attribute("slack.event_type", event.get("type", ""))
+        span.set_attribute("slack.channel", event.get("channel", ""))
+    await next()
+
+
+@app.middleware
+async def drop_unanswerable_events(body, next):
+    """Acknowledge and drop message events the bot never answers"""
+    event = body.get("event")
+    if event and event.get("type") == "message":
+        # Keep cached thread context current without refetching the thread
+        thread_context_cache.record_message(event)
+        if event_prefilter.should_drop(event):
+            return BoltResponse(status=200, body="")
+    await next()
+
+
+@app.middleware
+async def drop_duplicate_events(body, request, next):
+    """Acknowledge and drop Slack retries and already-handled events"""
+    retry_num = (request.headers.get("x-slack-retry-num") or [None])[0]
+    if event_deduplicator.is_duplicate(body, retry_num):
+        # Returning a 200 without next() acks the event so Slack stops retrying.
+        # The response passed to middleware is None once earlier ones called next()
+        return BoltResponse(status=200, body="")
+    await next()
 
 
 @app.event("app_mention")
-async def handle_app_mention_events(body, say, client, logger):
+async def handle_app_mention_events(body, client, logger):
     """Handle app mentions (when someone @mentions the bot)"""
-    logger.info("App mention received")
-    logger.info(body)
     event = body.get("event", {})
+    logger.debug(
+        "App mention received - event %s, channel %s, ts %s, thread %s",
+        body.get("event_id"),
+        event.get("channel"),
+        event.get("ts"),
+        event.get("thread_ts"),
+    )
+    thread_context_cache.record_mention(event)
 
     if event.get("type") == "app_mention" and "text" in event:
         user = event.get("user")
@@ -798,21 +1136,23 @@ async def handle_app_mention_events(body, say, client, logger):
         thread_ts = event.get("thread_ts", event.get("ts"))
 
         if user:
-            logger.info(f"Received app mention from user {user}: {text}")
+            logger.info("Received app mention from user %s: %s", user, text)
 
             # Check if user is whitelisted
             if not is_user_whitelisted(user):
-                logger.info(f"User {user} not in whitelist, sending GA message")
+                logger.info("User %s not in whitelist, sending GA message", user)
                 try:
-                    await say(
-                        text=f"Hi <@{user}>! 👋 Thanks for your interest in the SRE bot. "
+                    await slack_dispatcher.post_message(
+                        client,
+                        channel,
+                        f"Hi <@{user}>! 👋 Thanks for your interest in the SRE bot. "
                         "This bot is currently in limited preview and will be available "
                         "to all users when it reaches general availability (GA). "
                         "Stay tuned for updates! 🚀",
                         thread_ts=thread_ts,
                     )
                 except Exception as e:
-                    logger.error(f"Error sending whitelist message: {e}")
+                    logger.error("Error sending whitelist message: %s", e)
                 return
 
             try:
@@ -820,33 +1160,38 @@ async def handle_app_mention_events(body, say, client, logger):
                 original_message_ts = event.get("ts") if not thread_ts else None
 
                 logger.info(
-                    f"Processing app mention - User: {user}, Channel: {channel}, "
-                    f"Thread: {thread_ts}, Original: {original_message_ts}"
+                    "Processing app mention - User: %s, Channel: %s, Thread: %s, "
+                    "Original: %s",
+                    user,
+                    channel,
+                    thread_ts,
+                    original_message_ts,
                 )
 
-                asyncio.create_task(
-                    process_message_with_api(
-                        client=client,
-                        channel=channel,
-                        thread_ts=thread_ts,
-                        user=user,
-                        message=text,
-                        original_message_ts=original_message_ts,
-                    )
+                await enqueue_message_processing(
+                    client=client,
+                    channel=channel,
+                    thread_ts=thread_ts,
+                    user=user,
+                    message=text,
+                    original_message_ts=original_message_ts,
+                    debounce=is_thread_reply(event),
+                    cacheable=not is_thread_reply(event),
                 )
 
             except Exception as e:
-                logger.error(f"Error handling app mention: {str(e)}")
-                await say(
-                    text=f"Sorry <@{user}>, something went wrong while processing your request.",
+                logger.error("Error handling app mention: %s", e)
+                await slack_dispatcher.post_message(
+                    client,
+                    channel,
+                    f"Sorry <@{user}>, something went wrong while processing your request.",
                     thread_ts=thread_ts,
                 )
 
 
 @app.event("message")
-async def handle_message_events(body, say, client, logger):
-    """Handle all message events"""
-    logger.info(body)
+async def handle_message_events(body, client, logger):
+    """Handle message events that passed the pre-filter"""
     event = body.get("event", {})
 
     if event.get("type") == "message" and "text" in event:
@@ -858,7 +1203,7 @@ async def handle_message_events(body, say, client, logger):
 
         # Avoid responding to bot's own messages
         if not event.get("bot_id") and user:
-            logger.info(f"Received message from user {user}: {text}")
+            logger.info("Received message from user %s: %s", user, text)
 
             # Use the global bot_user_id (initialized at startup)
             global bot_user_id
@@ -871,38 +1216,41 @@ async def handle_message_events(body, say, client, logger):
             # Check if user is whitelisted before any processing
             if not is_user_whitelisted(user):
                 # Only respond to direct mentions of the bot for non-whitelisted users
-                is_bot_mentioned = bot_user_id and text and f"<@{bot_user_id}>" in text
+                is_bot_mentioned = event_prefilter.mentions_bot(text)
                 if is_bot_mentioned:
-                    logger.info(f"User {user} not in whitelist, sending GA message")
+                    logger.info("User %s not in whitelist, sending GA message", user)
                     try:
-                        await say(
-                            {
-                                "text": f"Hi <@{user}>! 👋 Thanks for your interest in the SRE bot. "
-                                "This bot is currently in limited preview and will be available "
-                                "to all users when it reaches general availability (GA). "
-                                "Stay tuned for updates! 🚀",
-                                "thread_ts": thread_ts,
-                            }
+                        await slack_dispatcher.post_message(
+                            client,
+                            channel,
+                            f"Hi <@{user}>! 👋 Thanks for your interest in the SRE bot. "
+                            "This bot is currently in limited preview and will be available "
+                            "to all users when it reaches general availability (GA). "
+                            "Stay tuned for updates! 🚀",
+                            thread_ts=thread_ts,
                         )
                     except Exception as e:
-                        logger.error(f"Error sending whitelist message: {e}")
+                        logger.error("Error sending whitelist message: %s", e)
                 return
 
             # Only respond to direct mentions of the bot (either in channel or thread)
-            is_direct_mention = bot_user_id and text and f"<@{bot_user_id}>" in text
+            is_direct_mention = event_prefilter.mentions_bot(text)
 
             if is_direct_mention:
                 if thread_ts:
                     logger.info(
-                        f"Will respond - bot mentioned in thread {thread_ts} from user {user}"
+                        "Will respond - bot mentioned in thread %s from user %s",
+                        thread_ts,
+                        user,
                     )
                 else:
                     logger.info(
-                        f"Will respond - bot mentioned in channel from user {user}"
+                        "Will respond - bot mentioned in channel from user %s", user
                     )
             else:
                 logger.debug(
-                    f"Ignoring message - bot not mentioned (bot_user_id: {bot_user_id})"
+                    "Ignoring message - bot not mentioned (bot_user_id: %s)",
+                    bot_user_id,
                 )
 
             if is_direct_mention:
@@ -912,51 +1260,207 @@ async def handle_message_events(body, say, client, logger):
                     original_message_ts = event.get("ts") if not thread_ts else None
 
                     logger.info(
-                        f"Processing message - User: {user}, Channel: {channel}, "
-                        f"Thread: {thread_ts}, Original: {original_message_ts}"
+                        "Processing message - User: %s, Channel: %s, Thread: %s, "
+                        "Original: %s",
+                        user,
+                        channel,
+                        thread_ts,
+                        original_message_ts,
                     )
 
-                    asyncio.create_task(
-                        process_message_with_api(
-                            client=client,
-                            channel=channel,
-                            thread_ts=thread_ts,
-                            user=user,
-                            message=text,
-                            original_message_ts=original_message_ts,
-                        )
+                    await enqueue_message_processing(
+                        client=client,
+                        channel=channel,
+                        thread_ts=thread_ts,
+                        user=user,
+                        message=text,
+                        original_message_ts=original_message_ts,
+                        debounce=is_thread_reply(event),
+                        cacheable=not is_thread_reply(event),
                     )
 
                 except Exception as e:
-                    logger.error(f"Error in message handler: {e}", exc_info=True)
-                    await say(
-                        {
-                            "text": f"Sorry <@{user}>, something went wrong!",
-                            "thread_ts": thread_ts,
-                        }
+                    logger.error("Error in message handler: %s", e, exc_info=True)
+                    await slack_dispatcher.post_message(
+                        client,
+                        channel,
+                        f"Sorry <@{user}>, something went wrong!",
+                        thread_ts=thread_ts,
                     )
 
 
+@app.event("user_change")
+async def handle_user_change_events(body, logger):
+    """Keep the user directory current when profiles change"""
+    user = body.get("event", {}).get("user", {})
+    user_directory.update_user(user)
+    logger.debug("Updated user directory entry for %s", user.get("id"))
+
+
+# Component counters exposed on /metrics
+stats_collector.register(
+    "worker",
+    worker_pool.get_stats,
+    counters=("submitted", "completed", "failed", "cancelled", "rejected"),
+    gauges=("queued", "in_flight"),
+)
+stats_collector.register(
+    "pending_work",
+    pending_work.get_stats,
+    counters=("saved", "lost", "resumed", "expired"),
+)
+stats_collector.register(
+    "debounce",
+    thread_debouncer.get_stats,
+    counters=("turns", "merged", "superseded"),
+    gauges=("pending",),
+)
+stats_collector.register(
+    "session_locks",
+    session_locks.get_stats,
+    counters=("contended", "rejected"),
+    gauges=("active", "waiting"),
+)
+stats_collector.register(
+    "prefilter",
+    event_prefilter.get_stats,
+    counters=("passed",) + tuple(f"dropped_{reason}" for reason in DROP_REASONS),
+)
+stats_collector.register(
+    "rate_limit",
+    rate_limiter.get_stats,
+    counters=("allowed",) + tuple(f"limited_{scope}" for scope in RATE_LIMIT_SCOPES),
+    gauges=("tracked",),
+)
+stats_collector.register(
+    "events",
+    event_deduplicator.get_stats,
+    counters=("accepted", "duplicates", "retries", "dropped_retries"),
+)
+stats_collector.register(
+    "slack_writes",
+    slack_dispatcher.get_stats,
+    counters=("sent", "failed", "retries", "rate_limited", "coalesced_acks"),
+)
+stats_collector.register(
+    "api_circuit",
+    api_client.breaker.get_stats,
+    counters=("opened", "rejected"),
+    gauges=("state", "failures"),
+)
+stats_collector.register(
+    "api_pool", api_client.get_pool_stats, gauges=("in_use", "limit")
+)
+stats_collector.register(
+    "known_api_sessions",
+    known_api_sessions.get_stats,
+    counters=("hits", "misses"),
+    gauges=("size",),
+)
+stats_collector.register(
+    "thread_cache",
+    thread_context_cache.get_stats,
+    counters=("hits", "misses"),
+    gauges=("size",),
+)
+stats_collector.register(
+    "answer_cache",
+    answer_cache.get_stats,
+    counters=("hits", "misses", "bypassed"),
+    gauges=("size",),
+)
+stats_collector.register(
+    "user_directory",
+    user_directory.get_stats,
+    counters=("hits", "misses"),
+    gauges=("size",),
+)
+
+if socket_mode_runner is not None:
+    stats_collector.register(
+        "socket_mode",
+        socket_mode_runner.get_stats,
+        counters=("envelopes", "reconnects"),
+        gauges=("connected",),
+    )
+
+
+@fast_api.get("/metrics")
+async def metrics() -> Response:
+    """Prometheus metrics endpoint"""
+    try:
+        ACTIVE_SESSIONS.set(await session_manager.store.count())
+    except Exception as e:
+        logger.warning("Could not count active sessions: %s", e)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+api_probe = ApiProbe(f"{API_BASE_URL}/health")
+
+
 @fast_api.get("/health", status_code=200)
 async def health() -> dict[str, Any]:
-    """Health check endpoint"""
+    """Health check endpoint, kept as a plain liveness check for existing probes"""
     return healthcheck()
 
 
+@fast_api.get("/health/readiness")
+async def readiness(response: Response) -> dict[str, Any]:
+    """Readiness endpoint: 503 while this replica cannot serve requests"""
+    ready, report = await readiness_check(bot_user_id, api_probe, socket_mode_runner)
+    if not ready:
+        response.status_code = 503
+    return report
+
+
+@fast_api.get("/health/liveness")
+async def liveness() -> dict[str, Any]:
+    """Liveness endpoint"""
+    return liveness_check()
+
+
 @fast_api.on_event("startup")
 async def startup_event():
     """Initialize bot when FastAPI starts"""
+    await api_client.start()
+    await session_manager.start()
+    worker_pool.start()
     await initialize_bot_user_id()
+    if USER_DIRECTORY_WARM:
+        user_directory.start(app.client)
+    if socket_mode_runner is not None:
+        socket_mode_runner.start()
+    # Pick up requests left unanswered by replicas that stopped
+    pending_work.start(resume_pending_work)
+
+
+@fast_api.on_event("shutdown")
+async def shutdown_event():
+    """Release shared resources when FastAPI stops"""
+    if socket_mode_runner is not None:
+        await socket_mode_runner.close()
+    await pending_work.close()
+    # Messages held for merging go to the agent now rather than being dropped
+    await thread_debouncer.flush()
+    # Let queued and running agent calls finish before closing their resources,
+    # then hand whatever is left to another replica
+    if not await worker_pool.shutdown(WORKER_DRAIN_TIMEOUT):
+        await pending_work.save(worker_pool.unfinished)
+    await user_directory.close()
+    await session_manager.close()
+    await api_client.close()
+    shutdown_tracing()
 
 
 @fast_api.post("/slack/events")
 async def slack_events(req: Request) -> Any:
     """Handle incoming Slack events"""
-    return await app_handler.handle(req)
+    with tracer.start_as_current_span("slack.event"):
+        return await app_handler.handle(req)
 
 
 # Error handler for debugging
 @app.error
 async def custom_error_handler(error, body, logger):
-    logger.exception(f"Error: {error}")
-    logger.info(f"Request body: {body}")
+    logger.exception("Error: %s", error)
+    logger.debug("Request body: %s", body)
@@ -0,0 +1,123 @@
+"""
+Adaptive acknowledgement of requests.
+
+Instead of always posting "I'm processing your request" before calling the
+agent, the agent call is raced against a short deadline. Fast answers are
+posted directly with no acknowledgement; slow ones get an acknowledgement
+once the deadline passes, and that message is edited in place into the
+answer, so every interaction costs at most one new Slack message.
+"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Optional, TypeVar
+
+from slack_sdk.web.async_client import AsyncWebClient
+
+from modules.slack_dispatcher import slack_dispatcher
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+ADAPTIVE_ACK_ENABLED = (
+    os.getenv("ADAPTIVE_ACK_ENABLED", "true").lower() == "true"
+)  # Only acknowledge requests that take longer than the deadline
+ACK_DEADLINE_SECONDS = float(
+    os.getenv("ACK_DEADLINE_SECONDS", "2.0")
+)  # Seconds to wait for an answer before acknowledging
+
+T = TypeVar("T")
+
+
+class AdaptiveAck:
+    """
+    Acknowledgement posted only if the answer takes longer than a deadline.
+
+    Works as the `updater` for deliver_answer: finish() edits the
+    acknowledgement into the answer if one was posted, or posts the answer
+    otherwise. When streaming, the acknowledgement is the first text of the
+    streamed message, so the stream keeps editing the same message.
+    """
+
+    def __init__(
+        self,
+        client: AsyncWebClient,
+        channel: str,
+        thread_ts: Optional[str],
+        text: str,
+        deadline: float = ACK_DEADLINE_SECONDS,
+        updater: Optional[Any] = None,
+    ):
+        """
+        Initialize the acknowledgement.
+
+        Args:
+            client: Slack AsyncWebClient instance
+            channel: Channel ID
+            thread_ts: Thread to reply in (optional)
+            text: Acknowledgement text
+            deadline: Seconds the answer may take before acknowledging
+            updater: Streaming message updater to acknowledge through (optional)
+        """
+        self.client = client
+        self.channel = channel
+        self.thread_ts = thread_ts
+        self.text = text
+        self.deadline = deadline
+        self.updater = updater
+        self.message_ts: Optional[str] = None
+        self.acknowledged = False
+
+    async def run(self, work: Awaitable[T]) -> T:
+        """
+        Await the work, acknowledging if it outlasts the deadline.
+
+        Args:
+            work: Coroutine producing the answer
+
+        Returns:
+            The result of the work
+        """
+        task = asyncio.ensure_future(work)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), self.deadline)
+        except asyncio.TimeoutError:
+            await self.acknowledge()
+            return await task
+        finally:
+            if not task.done():
+                task.cancel()
+
+    async def acknowledge(self) -> None:
+        """Post the acknowledgement, unless streaming already shows progress"""
+        self.acknowledged = True
+        try:
+            if self.updater is not None:
+                if self.updater.message_ts is None:
+                    await self.updater.update(self.text)
+                return
+            response = await slack_dispatcher.post_message(
+                self.client, self.channel, self.text, thread_ts=self.thread_ts
+            )
+            self.message_ts = response.get("ts") if response else None
+        except Exception as e:
+            # The answer is still delivered as a new message
+            logger.error("Failed to send acknowledgment message: %s", e)
+
+    async def finish(self, text: str) -> None:
+        """
+        Show the first part of the answer, editing the acknowledgement if posted.
+
+        Args:
+            text: Message text
+        """
+        if self.updater is not None:
+            await self.updater.finish(text)
+        elif self.message_ts is not None:
+            await slack_dispatcher.update_message(
+                self.client, self.channel, self.message_ts, text
+            )
+        else:
+            await slack_dispatcher.post_message(
+                self.client, self.channel, text, thread_ts=self.thread_ts
+            )
@@ -0,0 +1,77 @@
+"""
+Extraction of the answer text from ADK /run responses.
+
+/run returns the list of events the agent produced, in order. The answer is
+the text of the final model turn: every text part of the events after the
+last tool call or tool response, one paragraph per event. Tool events,
+thoughts and user echoes are skipped, and the list is walked exactly once.
+"""
+
+from typing import Any, List, Optional
+
+# Legacy agent output written to session state instead of a text part
+_STATE_OUTPUT_KEY = "kubernetes_agent_output"
+
+
+def extract_response_text(data: Any) -> Optional[str]:
+    """
+    Get the answer text from a decoded /run response.
+
+    Args:
+        data: Decoded JSON body, normally a list of ADK events
+
+    Returns:
+        Optional[str]: The stripped answer, or None if it has no answer text
+    """
+    if isinstance(data, str):
+        return data.strip() or None
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list):
+        return None
+
+    turn_text: List[str] = []
+    state_output: Optional[str] = None
+
+    for event in data:
+        if not isinstance(event, dict):
+            continue
+
+        actions = event.get("actions")
+        if isinstance(actions, dict):
+            state_delta = actions.get("stateDelta") or actions.get("state_delta")
+            if isinstance(state_delta, dict):
+                output = state_delta.get(_STATE_OUTPUT_KEY)
+                if isinstance(output, str):
+                    state_output = output
+
+        content = event.get("content")
+        if not isinstance(content, dict) or content.get("role") == "user":
+            continue
+
+        event_text = ""
+        for part in content.get("parts") or ():
+            if not isinstance(part, dict):
+                continue
+            if (
+                "functionCall" in part
+                or "function_call" in part
+                or "functionResponse" in part
+                or "function_response" in part
+            ):
+                # A tool round trip ends the turn; only text after it counts
+                turn_text.clear()
+                event_text = ""
+            elif not part.get("thought"):
+                text = part.get("text")
+                if isinstance(text, str):
+                    event_text += text
+        if event_text.strip():
+            turn_text.append(event_text.strip())
+
+    answer = "\n\n".join(turn_text)
+    if answer:
+        return answer
+    if state_output:
+        return state_output.strip()
+    return None
@@ -0,0 +1,183 @@
+"""
+Cache of agent answers to repeated standalone questions.
+
+Channels ask the same cost questions ("what did we spend last month?") many
+times a day, and each one runs the full root agent → aws_cost_agent → Cost
+Explorer pipeline. Answers to questions that open a new conversation are
+cached under the normalized question text plus the date they were asked on,
+so a repeat returns in milliseconds and does not pay for another Cost
+Explorer request.
+
+The date is part of the key because the agent resolves relative periods
+("last month", "yesterday") with get_current_date_info(), which derives
+every field from today's date. The TTL bounds staleness within a day;
+Cost Explorer refreshes its data at most a few times a day.
+
+Only questions matching ANSWER_CACHE_PATTERN are cached, so questions about
+live state (pods, alarms) always reach the agent. Adding the opt-out keyword
+to a question skips the cache and refreshes the stored answer.
+
+A cached answer never reaches the agent, so the exchange is kept on the
+conversation session and passed to the agent with the thread's next turn.
+The cache is off unless ANSWER_CACHE_ENABLED=true.
+"""
+
+import os
+import re
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+ANSWER_CACHE_ENABLED = (
+    os.getenv("ANSWER_CACHE_ENABLED", "false").lower() == "true"
+)  # Reuse answers to repeated questions
+ANSWER_CACHE_TTL = float(
+    os.getenv("ANSWER_CACHE_TTL", "21600")
+)  # Seconds an answer is reused (Cost Explorer refreshes a few times a day)
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "500"))  # Answers cached
+ANSWER_CACHE_PATTERN = os.getenv(
+    "ANSWER_CACHE_PATTERN",
+    r"\b(cost|costs|spend|spent|spending|bill|billing|budget|forecast|savings)\b",
+)  # Only questions matching this (case-insensitive) are cached
+ANSWER_CACHE_BYPASS_KEYWORD = os.getenv(
+    "ANSWER_CACHE_BYPASS_KEYWORD", "fresh"
+)  # Word in a question that skips the cache, e.g. "@bot fresh what did we spend?"
+
+_MENTION = re.compile(r"<[@#!][^>]*>")
+_PUNCTUATION = re.compile(r"[^\w\s$%.-]|(?<!\d)\.|\.(?!\d)")
+# Politeness and filler that does not change what is being asked
+_FILLER = frozenset(
+    ("please", "pls", "plz", "hey", "hi", "hello", "thanks", "thank", "you", "can")
+)
+
+
+class AnswerCache:
+    """LRU + TTL cache of agent answers keyed by (normalized question, date)."""
+
+    def __init__(
+        self,
+        enabled: bool = ANSWER_CACHE_ENABLED,
+        max_size: int = ANSWER_CACHE_SIZE,
+        ttl: float = ANSWER_CACHE_TTL,
+        pattern: str = ANSWER_CACHE_PATTERN,
+        bypass_keyword: str = ANSWER_CACHE_BYPASS_KEYWORD,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            enabled: Whether answers are cached at all
+            max_size: Maximum number of answers cached
+            ttl: Seconds an answer is reused
+            pattern: Regex a question must match to be cached
+            bypass_keyword: Word that makes a question skip the cache
+        """
+        self.enabled = enabled
+        self.max_size = max_size
+        self.ttl = ttl
+        self.pattern = re.compile(pattern, re.IGNORECASE) if pattern else None
+        self.bypass = (
+            re.compile(rf"\b{re.escape(bypass_keyword)}\b", re.IGNORECASE)
+            if bypass_keyword
+            else None
+        )
+        self._answers: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def normalize(self, question: str) -> str:
+        """
+        Reduce a question to the words that determine its answer.
+
+        Mentions, case, punctuation, filler words, the opt-out keyword and
+        whitespace differences are dropped, so "@bot What did we spend last
+        month?" and "what did we spend last month" share an entry.
+        """
+        text = _MENTION.sub(" ", question).lower()
+        if self.bypass is not None:
+            text = self.bypass.sub(" ", text)
+        text = _PUNCTUATION.sub(" ", text)
+        return " ".join(word for word in text.split() if word not in _FILLER)
+
+    def key(self, question: str, today: Optional[date] = None) -> Optional[Tuple]:
+        """
+        Get the cache key of a question.
+
+        Args:
+            question: Question text as sent by the user
+            today: Date the question is asked on (defaults to today)
+
+        Returns:
+            (normalized question, ISO date), or None if the question is not cacheable
+        """
+        if not self.enabled or (self.pattern and not self.pattern.search(question)):
+            return None
+        normalized = self.normalize(question)
+        if not normalized:
+            return None
+        return normalized, (today or date.today()).isoformat()
+
+    def get(self, question: str) -> Optional[str]:
+        """
+        Get the cached answer to a question.
+
+        Args:
+            question: Question text as sent by the user
+
+        Returns:
+            The answer, or None if the question is not cached, expired, not
+            cacheable or asks to skip the cache
+        """
+        key = self.key(question)
+        if key is None:
+            return None
+        if self.bypass is not None and self.bypass.search(question):
+            self.bypassed += 1
+            logger.info("Answer cache bypassed for '%s'", key[0])
+            return None
+        entry = self._answers.get(key)
+        if entry is None or time.monotonic() > entry[0]:
+            if entry is not None:
+                del self._answers[key]
+            self.misses += 1
+            return None
+        self._answers.move_to_end(key)
+        self.hits += 1
+        logger.info("Answer cache hit for '%s'", key[0])
+        return entry[1]
+
+    def put(self, question: str, answer: str) -> None:
+        """Cache the answer to a question, if the question is cacheable"""
+        key = self.key(question)
+        if key is None:
+            return
+        self._answers[key] = (time.monotonic() + self.ttl, answer)
+        self._answers.move_to_end(key)
+        while len(self._answers) > self.max_size:
+            self._answers.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache size and lookup counters.
+
+        Returns:
+            Dict with size, hits, misses and bypassed lookups
+        """
+        return {
+            "size": len(self._answers),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+        }
+
+    def __len__(self) -> int:
+        return len(self._answers)
+
+
+answer_cache = AnswerCache()
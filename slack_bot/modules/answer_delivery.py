@@ -0,0 +1,219 @@
+"""
+Splitting and delivery of long agent answers.
+
+Slack truncates or folds very long messages, and a multi-page cost
+breakdown posted as one text field is hard to read. Answers are split on
+markdown boundaries (paragraphs, whole tables and code blocks) into
+messages of bounded size, and tables or code blocks too large for a single
+message are uploaded as file snippets instead. The parts are sent in order
+through the outbound dispatcher, which keeps them ordered per channel.
+"""
+
+import os
+from typing import Any, List, NamedTuple, Optional
+
+from slack_sdk.web.async_client import AsyncWebClient
+
+from modules.slack_dispatcher import slack_dispatcher
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+SLACK_MESSAGE_MAX_CHARS = int(
+    os.getenv("SLACK_MESSAGE_MAX_CHARS", "3000")
+)  # Longest message posted; larger tables and code blocks become snippets
+
+_FENCE = "```"
+_SNIPPET_EXTENSIONS = {"json": "json", "yaml": "yaml", "yml": "yaml", "sql": "sql"}
+
+
+class AnswerPart(NamedTuple):
+    """A message to post, or a snippet to upload when filename is set."""
+
+    text: str
+    filename: Optional[str] = None
+
+
+def _split_blocks(text: str) -> List[tuple]:
+    """Split markdown into (kind, text) blocks: paragraph, table or code."""
+    blocks = []
+    current: List[str] = []
+    kind = "paragraph"
+
+    def close():
+        nonlocal current, kind
+        if current:
+            blocks.append((kind, "\n".join(current)))
+        current = []
+        kind = "paragraph"
+
+    for line in text.split("\n"):
+        stripped = line.strip()
+        if kind == "code":
+            current.append(line)
+            if stripped.startswith(_FENCE):
+                close()
+            continue
+        if stripped.startswith(_FENCE):
+            close()
+            kind = "code"
+            current.append(line)
+            continue
+        is_table_row = stripped.startswith("|")
+        if is_table_row != (kind == "table") or not stripped:
+            close()
+            if is_table_row:
+                kind = "table"
+        if stripped:
+            current.append(line)
+    close()
+    return blocks
+
+
+def _hard_split(text: str, max_chars: int) -> List[str]:
+    """Split text into pieces of at most max_chars, preferring line then word breaks."""
+    pieces = []
+    while len(text) > max_chars:
+        cut = text.rfind("\n", 0, max_chars)
+        if cut <= 0:
+            cut = text.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(text[:cut].rstrip())
+        text = text[cut:].lstrip("\n ")
+    if text:
+        pieces.append(text)
+    return pieces
+
+
+def _split_code(block: str, max_chars: int) -> List[str]:
+    """Split a fenced code block into several fenced blocks."""
+    lines = block.split("\n")
+    opening = lines[0]
+    body = lines[1:-1] if lines[-1].strip().startswith(_FENCE) else lines[1:]
+    budget = max(max_chars - len(opening) - len(_FENCE) - 2, 1)
+    return [
+        f"{opening}\n{piece}\n{_FENCE}"
+        for piece in _hard_split("\n".join(body), budget)
+    ]
+
+
+def _snippet(kind: str, block: str, index: int) -> AnswerPart:
+    """Turn a large table or code block into a file snippet part."""
+    if kind == "table":
+        return AnswerPart(block, filename=f"table-{index}.md")
+    lines = block.split("\n")
+    language = lines[0].strip()[len(_FENCE) :].strip().lower()
+    body = lines[1:-1] if lines[-1].strip().startswith(_FENCE) else lines[1:]
+    extension = _SNIPPET_EXTENSIONS.get(language, "txt")
+    return AnswerPart("\n".join(body), filename=f"snippet-{index}.{extension}")
+
+
+def format_answer(
+    text: str, max_chars: int = SLACK_MESSAGE_MAX_CHARS
+) -> List[AnswerPart]:
+    """
+    Split an answer into ordered message and snippet parts.
+
+    Args:
+        text: Markdown answer from the agent
+        max_chars: Longest message to post
+
+    Returns:
+        List of parts in the order they should be sent; never empty
+    """
+    if len(text) <= max_chars:
+        return [AnswerPart(text)]
+
+    parts: List[AnswerPart] = []
+    message = ""
+    snippets = 0
+
+    def flush():
+        nonlocal message
+        if message:
+            parts.append(AnswerPart(message))
+        message = ""
+
+    for kind, block in _split_blocks(text):
+        if len(block) > max_chars:
+            if kind in ("table", "code"):
+                snippets += 1
+                flush()
+                parts.append(_snippet(kind, block, snippets))
+                continue
+            pieces = _hard_split(block, max_chars)
+        else:
+            pieces = [block]
+
+        for piece in pieces:
+            if message and len(message) + 2 + len(piece) > max_chars:
+                flush()
+            message = f"{message}\n\n{piece}" if message else piece
+    flush()
+    return parts or [AnswerPart(text[:max_chars])]
+
+
+async def deliver_answer(
+    client: AsyncWebClient,
+    channel: str,
+    text: str,
+    thread_ts: Optional[str] = None,
+    updater: Optional[Any] = None,
+    max_chars: int = SLACK_MESSAGE_MAX_CHARS,
+) -> int:
+    """
+    Send an answer to Slack as one or more messages and snippets, in order.
+
+    Args:
+        client: Slack AsyncWebClient instance
+        channel: Channel ID
+        text: Answer text
+        thread_ts: Thread to reply in (optional)
+        updater: Streaming message updater whose message receives the first
+            part instead of a new post (optional)
+        max_chars: Longest message to post
+
+    Returns:
+        int: Number of parts sent
+    """
+    parts = format_answer(text, max_chars)
+    if len(parts) > 1:
+        logger.info(
+            "Delivering answer of %s characters in %s parts", len(text), len(parts)
+        )
+
+    for index, part in enumerate(parts):
+        if index == 0 and updater is not None:
+            # The streamed message becomes the first part of the answer
+            await updater.finish(
+                part.text if part.filename is None else "_Answer attached below._"
+            )
+            if part.filename is None:
+                continue
+
+        if part.filename is None:
+            await slack_dispatcher.post_message(
+                client, channel, part.text, thread_ts=thread_ts
+            )
+            continue
+
+        try:
+            await slack_dispatcher.send(
+                client,
+                "files_upload_v2",
+                channel,
+                content=part.text,
+                filename=part.filename,
+                title=part.filename,
+                thread_ts=thread_ts,
+            )
+        except Exception as e:
+            # Without files:write, fall back to posting the block in pieces
+            logger.warning("Could not upload %s, posting inline: %s", part.filename, e)
+            fenced = f"{_FENCE}\n{part.text}\n{_FENCE}"
+            for piece in _split_code(fenced, max_chars):
+                await slack_dispatcher.post_message(
+                    client, channel, piece, thread_ts=thread_ts
+                )
+    return len(parts)
@@ -0,0 +1,262 @@
+"""
+Pooled HTTP client for talking to the sre-bot-api service.
+
+A single aiohttp ClientSession is shared by every Slack message so that
+connections to sre-bot-api are kept alive and reused instead of paying TCP
+(and TLS) setup on each request. Requests made through ApiClient.post() go
+through a circuit breaker, so while sre-bot-api is down they fail at once
+instead of each waiting for its timeout.
+"""
+
+import asyncio
+import contextlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiohttp
+
+from modules.circuit_breaker import CircuitBreaker
+from modules.sessions import SESSION_TIMEOUT_MINUTES
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Connection pool configuration from environment variables
+API_POOL_LIMIT = int(os.getenv("API_POOL_LIMIT", "100"))  # Total open connections
+API_POOL_LIMIT_PER_HOST = int(
+    os.getenv("API_POOL_LIMIT_PER_HOST", "50")
+)  # Open connections per host
+API_KEEPALIVE_TIMEOUT = float(
+    os.getenv("API_KEEPALIVE_TIMEOUT", "30")
+)  # Seconds an idle connection is kept open
+API_DNS_CACHE_TTL = int(os.getenv("API_DNS_CACHE_TTL", "300"))  # Seconds
+API_CIRCUIT_FAILURES = int(
+    os.getenv("API_CIRCUIT_FAILURES", "5")
+)  # Consecutive failed requests that open the circuit
+API_CIRCUIT_RESET_TIMEOUT = float(
+    os.getenv("API_CIRCUIT_RESET_TIMEOUT", "30")
+)  # Seconds requests fail fast before a probe request is let through
+KNOWN_SESSIONS_MAX = int(
+    os.getenv("KNOWN_SESSIONS_MAX", "10000")
+)  # API sessions remembered as existing
+# Remember API sessions as long as the Slack session that uses them lives
+KNOWN_SESSIONS_TTL = SESSION_TIMEOUT_MINUTES * 60
+
+
+class ApiClient:
+    """
+    Process-wide aiohttp client with a keep-alive connection pool.
+
+    The underlying session is created in the FastAPI startup hook and closed
+    on shutdown. If it is used before startup (or after it was closed) it is
+    created lazily so callers never have to care about lifecycle ordering.
+    """
+
+    def __init__(
+        self,
+        limit: int = API_POOL_LIMIT,
+        limit_per_host: int = API_POOL_LIMIT_PER_HOST,
+        keepalive_timeout: float = API_KEEPALIVE_TIMEOUT,
+        dns_cache_ttl: int = API_DNS_CACHE_TTL,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        """
+        Initialize the client configuration. No connections are opened here.
+
+        Args:
+            limit: Maximum number of simultaneous connections (0 for unlimited)
+            limit_per_host: Maximum simultaneous connections to the same host
+            keepalive_timeout: Seconds to keep an idle connection open for reuse
+            dns_cache_ttl: Seconds to cache resolved DNS entries
+            breaker: Circuit breaker for requests made with post()
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.breaker = breaker or CircuitBreaker(
+            "sre-bot-api",
+            failure_threshold=API_CIRCUIT_FAILURES,
+            reset_timeout=API_CIRCUIT_RESET_TIMEOUT,
+        )
+
+    async def start(self) -> aiohttp.ClientSession:
+        """
+        Create the shared session and connection pool if not already open.
+
+        Returns:
+            aiohttp.ClientSession: The shared session
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            logger.info(
+                "API client pool started - limit: %s, per host: %s, keepalive: %ss, DNS cache TTL: %ss",
+                self.limit,
+                self.limit_per_host,
+                self.keepalive_timeout,
+                self.dns_cache_ttl,
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Close the shared session and all pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("API client pool closed")
+        self._session = None
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the shared session, starting it lazily if needed.
+
+        Returns:
+            aiohttp.ClientSession: The shared session
+        """
+        if self._session is None or self._session.closed:
+            return await self.start()
+        return self._session
+
+    @contextlib.asynccontextmanager
+    async def post(
+        self, url: str, **kwargs: Any
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        POST to sre-bot-api through the circuit breaker.
+
+        Connection errors, timeouts and 5xx responses count as failures;
+        any other response shows the service is up. The outcome is recorded
+        when the caller is done with the response, so a body that stalls or
+        breaks off after the headers (e.g. a /run_sse stream hitting its
+        read timeout) counts as a failure too.
+
+        Args:
+            url: Request URL
+            **kwargs: Passed to aiohttp.ClientSession.post
+
+        Yields:
+            aiohttp.ClientResponse: The response
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        self.breaker.before_call()
+        # True for success, False for failure, None if there was no outcome
+        succeeded: Optional[bool] = None
+        try:
+            session = await self.get_session()
+            async with session.post(url, **kwargs) as response:
+                yield response
+                succeeded = response.status < 500
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            succeeded = False
+            raise
+        finally:
+            if succeeded is None:
+                self.breaker.release()
+            elif succeeded:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        Get connection pool usage for diagnostics.
+
+        Returns:
+            Dict with pool limits and current connection counts
+        """
+        stats: Dict[str, Any] = {
+            "open": self._session is not None and not self._session.closed,
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "in_use": 0,
+        }
+        if stats["open"]:
+            connector = self._session.connector
+            # _acquired holds connections currently checked out of the pool
+            stats["in_use"] = len(getattr(connector, "_acquired", ()))
+        return stats
+
+
+class KnownApiSessions:
+    """
+    Bounded LRU record of sessions known to exist on the sre-bot-api.
+
+    Lets follow-up messages in a thread skip the create-session round trip.
+    Entries expire after the session timeout and are invalidated when the
+    API reports a session as missing (404), e.g. after its database was reset.
+    """
+
+    def __init__(
+        self,
+        max_size: int = KNOWN_SESSIONS_MAX,
+        ttl_seconds: float = KNOWN_SESSIONS_TTL,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            max_size: Maximum number of sessions remembered
+            ttl_seconds: Seconds a session is remembered after it was last seen
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, float]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(user_id: str, session_id: str) -> str:
+        return f"{user_id}/{session_id}"
+
+    def is_known(self, user_id: str, session_id: str) -> bool:
+        """Check whether a session is known to exist on the API"""
+        key = self._key(user_id, session_id)
+        expires_at = self._sessions.get(key)
+        if expires_at is None or time.monotonic() > expires_at:
+            if expires_at is not None:
+                del self._sessions[key]
+            self.misses += 1
+            return False
+        self._sessions.move_to_end(key)
+        self.hits += 1
+        return True
+
+    def mark_known(self, user_id: str, session_id: str) -> None:
+        """Record that a session exists on the API"""
+        key = self._key(user_id, session_id)
+        self._sessions[key] = time.monotonic() + self.ttl_seconds
+        self._sessions.move_to_end(key)
+        while len(self._sessions) > self.max_size:
+            self._sessions.popitem(last=False)
+
+    def invalidate(self, user_id: str, session_id: str) -> None:
+        """Forget a session, forcing it to be created again on next use"""
+        self._sessions.pop(self._key(user_id, session_id), None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get registry size and lookup counters.
+
+        Returns:
+            Dict with size, hits and misses
+        """
+        return {"size": len(self._sessions), "hits": self.hits, "misses": self.misses}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+# Global client instance shared by all handlers
+api_client = ApiClient()
+known_api_sessions = KnownApiSessions()
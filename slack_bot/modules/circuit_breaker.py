@@ -0,0 +1,141 @@
+"""
+Circuit breaker for calls to a downstream service.
+
+After `failure_threshold` consecutive failures the circuit opens and calls
+are rejected immediately instead of each waiting for its own timeout. Once
+`reset_timeout` seconds have passed the circuit is half-open: a limited
+number of probe calls go through, and the first outcome decides whether it
+closes again or stays open for another `reset_timeout`.
+"""
+
+import time
+from typing import Any, Dict
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+# Numeric states for the metrics gauge
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(
+            f"{name} is unavailable (circuit open, retry in {retry_after:.0f}s)"
+        )
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with half-open probing."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        half_open_probes: int = 1,
+    ):
+        """
+        Initialize a closed circuit.
+
+        Args:
+            name: Service name used in logs and errors
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before probing
+            half_open_probes: Calls let through at once while half-open
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self.opened = 0
+        self.rejected = 0
+
+    def is_rejecting(self) -> bool:
+        """Whether a call made now would be rejected, without starting one"""
+        if self.state == OPEN:
+            return time.monotonic() - self._opened_at < self.reset_timeout
+        if self.state == HALF_OPEN:
+            return self._probes >= self.half_open_probes
+        return False
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a probe through"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def before_call(self) -> None:
+        """
+        Admit a call, counting it as a probe while half-open.
+
+        Every admitted call must be followed by record_success(),
+        record_failure() or release().
+
+        Raises:
+            CircuitOpenError: If the circuit rejects the call
+        """
+        if self.state == OPEN and not self.is_rejecting():
+            self.state = HALF_OPEN
+            self._probes = 0
+            logger.info("Circuit for %s half-open, probing", self.name)
+        if self.is_rejecting():
+            self.rejected += 1
+            raise CircuitOpenError(self.name, self.retry_after())
+        if self.state == HALF_OPEN:
+            self._probes += 1
+
+    def record_success(self) -> None:
+        """Record a successful call, closing the circuit if it was probing"""
+        self.release()
+        self._failures = 0
+        if self.state != CLOSED:
+            self.state = CLOSED
+            logger.info("Circuit for %s closed, service recovered", self.name)
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the circuit past the threshold"""
+        self.release()
+        self._failures += 1
+        if self.state == HALF_OPEN or (
+            self.state == CLOSED and self._failures >= self.failure_threshold
+        ):
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+            self.opened += 1
+            logger.warning(
+                "Circuit for %s opened after %s consecutive failures, rejecting calls for %ss",
+                self.name,
+                self._failures,
+                self.reset_timeout,
+            )
+
+    def release(self) -> None:
+        """Finish an admitted call without an outcome, e.g. when cancelled"""
+        if self.state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get circuit state and counters.
+
+        Returns:
+            Dict with state, consecutive failures, times opened and rejected calls
+        """
+        return {
+            "state": STATE_VALUES[self.state],
+            "failures": self._failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,207 @@
+"""
+Per-thread debouncing of rapid-fire messages.
+
+Users often send a question as two or three messages in quick succession.
+Messages from one user in one thread are held for DEBOUNCE_WINDOW seconds
+(restarted by each new message, up to DEBOUNCE_MAX_WAIT) and then sent to
+the agent as a single turn.
+
+A message that arrives while its turn is still waiting for a worker
+supersedes that turn: the queued turn is skipped and its messages are merged
+with the new one, so the bot never answers a stale half of a question. A turn
+that has started is left alone. Cancelling it here would not stop the agent
+run already executing on sre-bot-api, and could leave an acknowledgement or a
+partially streamed answer behind, so the new message gets its own turn and
+waits for the running one (see session_locks).
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+DEBOUNCE_WINDOW = float(
+    os.getenv("DEBOUNCE_WINDOW", "2")
+)  # Seconds of quiet in a thread before its messages go to the agent (0 disables)
+DEBOUNCE_MAX_WAIT = float(
+    os.getenv("DEBOUNCE_MAX_WAIT", "10")
+)  # Longest a message is held while more keep arriving
+DEBOUNCE_MAX_MESSAGES = int(
+    os.getenv("DEBOUNCE_MAX_MESSAGES", "5")
+)  # Messages merged into one turn at most
+
+JobFactory = Callable[[], Awaitable[Any]]
+# dispatch(message, received_at, wrap) queues a turn, returning the work description
+# it queued, or None if it could not
+Dispatch = Callable[
+    [str, float, Callable[[JobFactory], JobFactory]],
+    Awaitable[Optional[Dict[str, Any]]],
+]
+
+
+class _Pending:
+    """Messages waiting for their thread to go quiet."""
+
+    def __init__(self, received_at: float, dispatch: Dispatch):
+        self.texts: List[str] = []
+        self.received_at = received_at
+        self.dispatch = dispatch
+        self.timer: Optional[asyncio.Task] = None
+
+
+class _Turn:
+    """A queued agent turn that newer messages can still supersede."""
+
+    def __init__(self, texts: List[str], received_at: float):
+        self.texts = texts
+        self.received_at = received_at
+        self.work: Optional[Dict[str, Any]] = None
+        self.superseded = False
+
+    def supersede(self) -> None:
+        self.superseded = True
+        if self.work is not None:
+            # Keeps the worker pool from handing the stale turn over on shutdown
+            self.work["superseded"] = True
+
+
+class ThreadDebouncer:
+    """Merges messages per key (channel, thread, user) into single agent turns."""
+
+    def __init__(
+        self,
+        window: float = DEBOUNCE_WINDOW,
+        max_wait: float = DEBOUNCE_MAX_WAIT,
+        max_messages: int = DEBOUNCE_MAX_MESSAGES,
+    ):
+        """
+        Initialize the debouncer.
+
+        Args:
+            window: Seconds of quiet before pending messages are dispatched
+            max_wait: Longest the first pending message is held
+            max_messages: Pending messages that trigger an immediate dispatch
+        """
+        self.window = window
+        self.max_wait = max_wait
+        self.max_messages = max_messages
+        self._pending: Dict[Hashable, _Pending] = {}
+        self._turns: Dict[Hashable, _Turn] = {}
+        # Timer tasks are kept referenced until they finish dispatching
+        self._timers: Set[asyncio.Task] = set()
+        self.turns = 0
+        self.merged = 0
+        self.superseded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def add(self, key: Hashable, text: str, dispatch: Dispatch) -> None:
+        """
+        Hold a message until its thread goes quiet.
+
+        Args:
+            key: Debounce key, e.g. (channel, thread_ts, user)
+            text: Message text
+            dispatch: Coroutine function queueing the merged turn and returning
+                its work description; it must run the job through the `wrap`
+                it is given
+        """
+        now = time.monotonic()
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _Pending(now, dispatch)
+            self._supersede(key, pending)
+        else:
+            self.merged += 1
+            pending.timer.cancel()
+            pending.dispatch = dispatch
+        pending.texts.append(text)
+
+        if len(pending.texts) >= self.max_messages:
+            delay = 0.0
+        else:
+            delay = min(self.window, pending.received_at + self.max_wait - now)
+        pending.timer = asyncio.create_task(
+            self._dispatch_later(key, pending, max(0.0, delay))
+        )
+        self._timers.add(pending.timer)
+        pending.timer.add_done_callback(self._timers.discard)
+
+    def _supersede(self, key: Hashable, pending: _Pending) -> None:
+        """Fold a queued turn of the same key into the new pending messages"""
+        # Turns leave _turns when they start, so a running one is never replaced
+        turn = self._turns.pop(key, None)
+        if turn is None:
+            return
+        turn.supersede()
+        pending.texts.extend(turn.texts)
+        pending.received_at = turn.received_at
+        self.superseded += 1
+        self.merged += len(turn.texts)
+        logger.info("Superseding queued agent turn for %s with a newer message", key)
+
+    async def _dispatch_later(
+        self, key: Hashable, pending: _Pending, delay: float
+    ) -> None:
+        await asyncio.sleep(delay)
+        await self._dispatch(key, pending)
+
+    async def _dispatch(self, key: Hashable, pending: _Pending) -> None:
+        if self._pending.get(key) is not pending:
+            return
+        del self._pending[key]
+        turn = _Turn(pending.texts, pending.received_at)
+        self._turns[key] = turn
+        self.turns += 1
+
+        def wrap(job: JobFactory) -> JobFactory:
+            async def run() -> Any:
+                if turn.superseded:
+                    return None
+                if self._turns.get(key) is turn:
+                    del self._turns[key]
+                return await job()
+
+            return run
+
+        message = "\n".join(turn.texts)
+        try:
+            turn.work = await pending.dispatch(message, turn.received_at, wrap)
+        except Exception as e:
+            logger.error("Failed to dispatch merged messages: %s", e, exc_info=True)
+        if turn.work is None:
+            if self._turns.get(key) is turn:
+                del self._turns[key]
+        elif turn.superseded:
+            # Superseded while being queued
+            turn.supersede()
+
+    async def flush(self) -> None:
+        """Dispatch all pending messages now, e.g. before shutting down"""
+        for key, pending in list(self._pending.items()):
+            pending.timer.cancel()
+            await self._dispatch(key, pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get debouncing counters.
+
+        Returns:
+            Dict with pending threads, dispatched turns, merged messages and
+            superseded turns
+        """
+        return {
+            "pending": len(self._pending),
+            "turns": self.turns,
+            "merged": self.merged,
+            "superseded": self.superseded,
+        }
+
+
+thread_debouncer = ThreadDebouncer()
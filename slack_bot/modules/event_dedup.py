@@ -0,0 +1,147 @@
+"""
+Idempotency layer for incoming Slack events.
+
+Slack re-delivers an event when it is not acknowledged fast enough (the
+retry carries an X-Slack-Retry-Num header), and a single mention arrives
+twice, as an app_mention and as a message event (with a subtype such as
+file_share when files are attached). Either way the same
+agent call would run more than once. Events are remembered by event_id and
+by (channel, ts) for a bounded time so duplicates are dropped before any
+work is scheduled.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+EVENT_DEDUP_TTL = float(
+    os.getenv("EVENT_DEDUP_TTL", "600")
+)  # Seconds an event is remembered (Slack retries for up to ~5 minutes)
+EVENT_DEDUP_MAX = int(
+    os.getenv("EVENT_DEDUP_MAX", "10000")
+)  # Events remembered before the oldest are forgotten
+
+# Event types whose (channel, ts) identifies the user message they carry
+_MESSAGE_EVENT_TYPES = ("app_mention", "message")
+# Subtypes whose ts belongs to the edit or deletion, not to a user message
+_EDIT_SUBTYPES = ("message_changed", "message_deleted")
+
+
+class EventDeduplicator:
+    """
+    Bounded TTL record of Slack events already accepted for processing.
+
+    Every key lives for the same TTL, so insertion order is also expiry
+    order and expired keys are purged from the front in O(1) per key.
+    """
+
+    def __init__(self, max_size: int = EVENT_DEDUP_MAX, ttl: float = EVENT_DEDUP_TTL):
+        """
+        Initialize the record.
+
+        Args:
+            max_size: Maximum number of keys remembered
+            ttl: Seconds a key is remembered
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self.accepted = 0
+        self.duplicates = 0
+        self.retries = 0
+        self.dropped_retries = 0
+
+    @staticmethod
+    def event_keys(body: Dict[str, Any]) -> List[str]:
+        """
+        Get the idempotency keys of an Events API payload.
+
+        Args:
+            body: Slack request body
+
+        Returns:
+            List of keys; empty for payloads that are not events
+        """
+        keys = []
+        if body.get("event_id"):
+            keys.append(f"event:{body['event_id']}")
+        event = body.get("event") or {}
+        if (
+            event.get("type") in _MESSAGE_EVENT_TYPES
+            and event.get("subtype") not in _EDIT_SUBTYPES
+            and event.get("channel")
+            and event.get("ts")
+        ):
+            keys.append(f"message:{event['channel']}:{event['ts']}")
+        return keys
+
+    def is_duplicate(
+        self, body: Dict[str, Any], retry_num: Optional[str] = None
+    ) -> bool:
+        """
+        Check whether an event was already accepted, recording it if not.
+
+        Args:
+            body: Slack request body
+            retry_num: Value of the X-Slack-Retry-Num header, if present
+
+        Returns:
+            bool: True if the event should be dropped
+        """
+        keys = self.event_keys(body)
+        if not keys:
+            return False
+        if retry_num:
+            self.retries += 1
+
+        now = time.monotonic()
+        self._purge(now)
+        duplicate = any(key in self._seen for key in keys)
+        for key in keys:
+            if key not in self._seen:
+                self._seen[key] = now + self.ttl
+        while len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+
+        if duplicate:
+            self.duplicates += 1
+            if retry_num:
+                self.dropped_retries += 1
+            logger.info(
+                "Dropping duplicate Slack event %s%s",
+                keys[0],
+                f" (retry {retry_num})" if retry_num else "",
+            )
+        else:
+            self.accepted += 1
+        return duplicate
+
+    def _purge(self, now: float) -> None:
+        while self._seen:
+            key, expires_at = next(iter(self._seen.items()))
+            if expires_at > now:
+                break
+            del self._seen[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get deduplication counters.
+
+        Returns:
+            Dict with accepted, duplicate and retry counts
+        """
+        return {
+            "tracked": len(self._seen),
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+            "retries": self.retries,
+            "dropped_retries": self.dropped_retries,
+        }
+
+
+event_deduplicator = EventDeduplicator()
@@ -0,0 +1,94 @@
+"""
+Cheap pre-filter for Slack message events.
+
+The bot receives every message in every channel it is in, but only answers
+messages that mention it. The filter classifies message events from a few
+dictionary lookups and one precompiled pattern, so the large majority of
+events are acknowledged and dropped before any handler runs or anything is
+logged. Dropped events are counted by reason instead.
+"""
+
+import re
+from typing import Any, Dict, Optional, Pattern
+
+# Subtypes that are still a person writing a new message
+_ANSWERABLE_SUBTYPES = frozenset(("file_share", "thread_broadcast"))
+DROP_REASONS = ("bot", "edited", "subtype", "no_mention")
+
+
+class EventPrefilter:
+    """Decides which message events can be dropped before handler dispatch."""
+
+    def __init__(self, bot_user_id: Optional[str] = None):
+        """
+        Initialize the filter.
+
+        Args:
+            bot_user_id: The bot's Slack user ID; until it is known, mentions
+                cannot be detected and message events are not dropped for
+                lacking one
+        """
+        self._mention: Optional[Pattern[str]] = None
+        self.passed = 0
+        self.dropped = dict.fromkeys(DROP_REASONS, 0)
+        self.set_bot_user_id(bot_user_id)
+
+    def set_bot_user_id(self, bot_user_id: Optional[str]) -> None:
+        """Compile the mention pattern for the bot's user ID"""
+        # Matches <@U123> and the labelled form <@U123|name>
+        self._mention = (
+            re.compile(re.escape(f"<@{bot_user_id}") + r"[>|]") if bot_user_id else None
+        )
+
+    def mentions_bot(self, text: Optional[str]) -> bool:
+        """Check whether message text mentions the bot"""
+        return bool(text and self._mention and self._mention.search(text))
+
+    def drop_reason(self, event: Dict[str, Any]) -> Optional[str]:
+        """
+        Classify a Slack event.
+
+        Only message events are filtered; everything else passes.
+
+        Args:
+            event: The "event" object of an Events API payload
+
+        Returns:
+            The reason to drop the event, or None if handlers should see it
+        """
+        if event.get("type") != "message":
+            return None
+        subtype = event.get("subtype")
+        if event.get("bot_id") or subtype == "bot_message":
+            return "bot"
+        if subtype == "message_changed" or "edited" in event:
+            return "edited"
+        if subtype and subtype not in _ANSWERABLE_SUBTYPES:
+            return "subtype"
+        if self._mention is not None and not self.mentions_bot(event.get("text")):
+            return "no_mention"
+        return None
+
+    def should_drop(self, event: Dict[str, Any]) -> bool:
+        """Classify an event and count the outcome"""
+        reason = self.drop_reason(event)
+        if reason is None:
+            self.passed += 1
+            return False
+        self.dropped[reason] += 1
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get filter counters.
+
+        Returns:
+            Dict with passed and dropped_<reason> counts
+        """
+        stats = {"passed": self.passed}
+        for reason, count in self.dropped.items():
+            stats[f"dropped_{reason}"] = count
+        return stats
+
+
+event_prefilter = EventPrefilter()
@@ -1,3 +1,151 @@
+"""
+Liveness and readiness checks for the Slack bot.
+
+Liveness only says the process and its event loop respond. Readiness says
+whether this replica should receive traffic: the bot knows its own user ID,
+sre-bot-api is reachable, and neither the worker queue nor the API
+connection pool is saturated. The API probe result is cached for a short
+TTL so frequent load balancer checks stay cheap.
+
+/health stays a plain liveness check, so container healthchecks pointed at
+it do not restart replicas while sre-bot-api is down.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+from modules.api_client import api_client
+from modules.worker_pool import worker_pool
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+HEALTH_API_PROBE_TTL = float(
+    os.getenv("HEALTH_API_PROBE_TTL", "15")
+)  # Seconds an sre-bot-api probe result is reused
+HEALTH_API_PROBE_TIMEOUT = float(
+    os.getenv("HEALTH_API_PROBE_TIMEOUT", "2")
+)  # Seconds before the probe counts as failed
+HEALTH_MAX_QUEUE_FILL = float(
+    os.getenv("HEALTH_MAX_QUEUE_FILL", "0.9")
+)  # Worker queue fill ratio at which the replica stops being ready
+HEALTH_MAX_POOL_FILL = float(
+    os.getenv("HEALTH_MAX_POOL_FILL", "0.9")
+)  # API connection pool fill ratio at which the replica stops being ready
+
+
+class ApiProbe:
+    """Cached reachability probe of the sre-bot-api health endpoint."""
+
+    def __init__(
+        self,
+        url: str,
+        ttl: float = HEALTH_API_PROBE_TTL,
+        timeout: float = HEALTH_API_PROBE_TIMEOUT,
+    ):
+        """
+        Initialize the probe.
+
+        Args:
+            url: Health endpoint of sre-bot-api
+            ttl: Seconds a probe result is reused
+            timeout: Seconds before a probe counts as failed
+        """
+        self.url = url
+        self.ttl = ttl
+        self.timeout = timeout
+        self._result: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def check(self) -> Dict[str, Any]:
+        """
+        Get the latest probe result, probing again if it is older than the TTL.
+
+        Concurrent callers share one probe instead of each hitting the API.
+
+        Returns:
+            Dict with ok, latency_ms and error (if any)
+        """
+        async with self._lock:
+            if (
+                self._result is not None
+                and time.monotonic() - self._checked_at < self.ttl
+            ):
+                return self._result
+
+            start = time.monotonic()
+            try:
+                client = await api_client.get_session()
+                timeout = aiohttp.ClientTimeout(total=self.timeout)
+                async with client.get(self.url, timeout=timeout) as response:
+                    await response.read()
+                    ok = response.status == 200
+                    error = None if ok else f"status {response.status}"
+            except Exception as e:
+                ok = False
+                error = str(e) or type(e).__name__
+            if not ok:
+                logger.warning("sre-bot-api health probe failed: %s", error)
+
+            self._result = {
+                "ok": ok,
+                "latency_ms": round((time.monotonic() - start) * 1000, 1),
+            }
+            if error:
+                self._result["error"] = error
+            self._checked_at = time.monotonic()
+            return self._result
+
+
+def _fill_check(used: int, limit: int, max_fill: float) -> Dict[str, Any]:
+    """Check that used / limit stays below max_fill (a limit of 0 is unlimited)"""
+    ok = limit <= 0 or used < limit * max_fill
+    return {"ok": ok, "used": used, "limit": limit}
+
+
+async def readiness_check(
+    bot_user_id: Optional[str],
+    api_probe: ApiProbe,
+    socket_mode_runner: Optional[Any] = None,
+) -> Tuple[bool, Dict[str, Any]]:
+    """Readiness check for load balancers
+
+    Args:
+        bot_user_id: The bot's Slack user ID, None if initialization failed
+        api_probe: Probe of the sre-bot-api health endpoint
+        socket_mode_runner: Socket Mode runner whose connections must be up,
+            when events arrive over Socket Mode (optional)
+
+    Returns:
+        Tuple of whether the replica is ready and the per-check report
+    """
+    worker_stats = worker_pool.get_stats()
+    pool_stats = api_client.get_pool_stats()
+
+    queue_check = _fill_check(
+        worker_stats["queued"], worker_stats["max_queue"], HEALTH_MAX_QUEUE_FILL
+    )
+    queue_check["ok"] = queue_check["ok"] and worker_stats["accepting"]
+    checks = {
+        "bot_identity": {"ok": bot_user_id is not None},
+        "api": await api_probe.check(),
+        "worker_queue": queue_check,
+        "api_pool": _fill_check(
+            pool_stats["in_use"], pool_stats["limit"], HEALTH_MAX_POOL_FILL
+        ),
+    }
+    if socket_mode_runner is not None:
+        connected = socket_mode_runner.connected()
+        checks["socket_mode"] = {"ok": connected > 0, "connected": connected}
+    ready = all(check["ok"] for check in checks.values())
+    return ready, {"status": "ready" if ready else "not_ready", "checks": checks}
+
+
 def healthcheck():
     """Health check path for load balancers
 
@@ -5,3 +153,12 @@ def healthcheck():
         [string]: Returns a json string
     """
     return {"status": "ok"}
+
+
+def liveness_check():
+    """Liveness check: the process and its event loop are responding
+
+    Returns:
+        [dict]: Returns a json object
+    """
+    return {"status": "alive"}
@@ -0,0 +1,91 @@
+"""
+Prometheus metrics for the Slack bot.
+
+Latencies and errors are recorded where they happen. Counters the bot's
+components already keep in get_stats() (queue depth, cache hits, dropped
+duplicates, Slack retries) are read at scrape time by a collector instead of
+being mirrored on every update.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Agent answers take from seconds to minutes
+ANSWER_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300, 600)
+SLACK_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+
+MENTION_TO_ANSWER = Histogram(
+    "slackbot_mention_to_answer_seconds",
+    "Time from receiving a mention to delivering the answer",
+    buckets=ANSWER_BUCKETS,
+)
+API_REQUEST_LATENCY = Histogram(
+    "slackbot_api_request_seconds",
+    "Latency of sre-bot-api requests",
+    ["endpoint"],
+    buckets=ANSWER_BUCKETS,
+)
+SLACK_API_LATENCY = Histogram(
+    "slackbot_slack_api_seconds",
+    "Latency of Slack Web API calls",
+    ["method"],
+    buckets=SLACK_BUCKETS,
+)
+ERRORS = Counter(
+    "slackbot_errors",
+    "Errors by type",
+    ["type"],
+)
+ACTIVE_SESSIONS = Gauge(
+    "slackbot_active_sessions",
+    "Conversation sessions that have not expired",
+)
+
+
+class StatsCollector:
+    """Exposes values from components' get_stats() when Prometheus scrapes."""
+
+    def __init__(self):
+        self._sources: List[
+            Tuple[str, Callable[[], Dict[str, Any]], Iterable[str], Iterable[str]]
+        ] = []
+
+    def register(
+        self,
+        component: str,
+        get_stats: Callable[[], Dict[str, Any]],
+        counters: Iterable[str] = (),
+        gauges: Iterable[str] = (),
+    ) -> None:
+        """
+        Expose selected get_stats() keys of a component.
+
+        Args:
+            component: Metric name prefix, e.g. "worker"
+            get_stats: Callable returning the component's stats dict
+            counters: Keys that only ever increase
+            gauges: Keys that go up and down
+        """
+        self._sources.append((component, get_stats, tuple(counters), tuple(gauges)))
+
+    def collect(self):
+        for component, get_stats, counters, gauges in self._sources:
+            stats = get_stats()
+            for key in counters:
+                yield CounterMetricFamily(
+                    f"slackbot_{component}_{key}",
+                    f"{component} {key.replace('_', ' ')}",
+                    value=stats.get(key, 0),
+                )
+            for key in gauges:
+                yield GaugeMetricFamily(
+                    f"slackbot_{component}_{key}",
+                    f"{component} {key.replace('_', ' ')}",
+                    value=stats.get(key, 0),
+                )
+
+
+stats_collector = StatsCollector()
+REGISTRY.register(stats_collector)
@@ -0,0 +1,167 @@
+"""
+Hand-over of unfinished agent requests between replicas.
+
+A replica that is stopping drains its worker pool for WORKER_DRAIN_TIMEOUT
+seconds. Requests still queued or running after that, and mentions that
+arrive while it drains, are saved in the shared session store instead of
+being dropped. Every replica polls the store and resumes saved requests, so
+a rolling deploy answers them instead of leaving users to retry.
+
+Requests older than PENDING_WORK_MAX_AGE are discarded when claimed, since
+the user has most likely moved on by then. With the in-memory session store
+nothing can be handed over and unfinished requests are lost, as before.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from modules.sessions import SessionStore, session_manager
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+PENDING_WORK_POLL_INTERVAL = float(
+    os.getenv("PENDING_WORK_POLL_INTERVAL", "15")
+)  # Seconds between checks for requests left by stopped replicas
+PENDING_WORK_MAX_AGE = float(
+    os.getenv("PENDING_WORK_MAX_AGE", "900")
+)  # Seconds after which a saved request is discarded instead of resumed
+PENDING_WORK_BATCH = 20  # Requests claimed per poll
+
+ResumeCallback = Callable[[Dict[str, Any]], Awaitable[bool]]
+
+
+class PendingWork:
+    """Saves unfinished requests to the session store and resumes saved ones."""
+
+    def __init__(
+        self,
+        store: SessionStore,
+        poll_interval: float = PENDING_WORK_POLL_INTERVAL,
+        max_age: float = PENDING_WORK_MAX_AGE,
+    ):
+        """
+        Initialize the hand-over.
+
+        Args:
+            store: Session store shared with the other replicas
+            poll_interval: Seconds between checks for saved requests
+            max_age: Seconds after which a saved request is discarded
+        """
+        self.store = store
+        self.poll_interval = poll_interval
+        self.max_age = max_age
+        self._resume: Optional[ResumeCallback] = None
+        self._task: Optional[asyncio.Task] = None
+        self.saved = 0
+        self.lost = 0
+        self.resumed = 0
+        self.expired = 0
+
+    async def save(self, items: Iterable[Dict[str, Any]]) -> int:
+        """
+        Save unfinished requests for another replica.
+
+        Args:
+            items: Request descriptions as submitted to the worker pool
+
+        Returns:
+            int: Number of requests saved (0 if the store cannot hold them)
+        """
+        items = [{**item, "saved_at": time.time()} for item in items]
+        if not items:
+            return 0
+        try:
+            saved = await self.store.save_pending_work(items)
+        except Exception as e:
+            logger.error("Failed to save unfinished requests: %s", e, exc_info=True)
+            saved = 0
+        self.saved += saved
+        if saved < len(items):
+            self.lost += len(items) - saved
+            logger.warning(
+                "%s unfinished requests could not be handed over", len(items) - saved
+            )
+        else:
+            logger.info("Saved %s unfinished requests for another replica", saved)
+        return saved
+
+    def start(self, resume: ResumeCallback) -> None:
+        """
+        Start polling for saved requests.
+
+        Args:
+            resume: Coroutine function queueing a saved request, returning
+                False if it cannot take the request right now
+        """
+        self._resume = resume
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll_forever())
+
+    async def resume_saved(self) -> int:
+        """
+        Claim saved requests and pass them to the resume callback.
+
+        Requests the callback does not take are saved again.
+
+        Returns:
+            int: Number of requests resumed
+        """
+        items = await self.store.claim_pending_work(PENDING_WORK_BATCH)
+        resumed = 0
+        now = time.time()
+        for index, item in enumerate(items):
+            if now - item.get("saved_at", now) > self.max_age:
+                self.expired += 1
+                logger.warning(
+                    "Discarding request from user %s saved %.0fs ago",
+                    item.get("user"),
+                    now - item["saved_at"],
+                )
+                continue
+            if not await self._resume(item):
+                await self.store.save_pending_work(items[index:])
+                break
+            resumed += 1
+        self.resumed += resumed
+        if resumed:
+            logger.info("Resumed %s requests left by a stopped replica", resumed)
+        return resumed
+
+    async def _poll_forever(self) -> None:
+        # Check right away, to pick up work from the replica this one replaces
+        while True:
+            try:
+                await self.resume_saved()
+            except Exception as e:
+                logger.error("Failed to resume saved requests: %s", e, exc_info=True)
+            await asyncio.sleep(self.poll_interval)
+
+    async def close(self) -> None:
+        """Stop polling, so a stopping replica does not claim more work"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hand-over counters.
+
+        Returns:
+            Dict with saved, lost, resumed and expired request counts
+        """
+        return {
+            "saved": self.saved,
+            "lost": self.lost,
+            "resumed": self.resumed,
+            "expired": self.expired,
+        }
+
+
+pending_work = PendingWork(session_manager.store)
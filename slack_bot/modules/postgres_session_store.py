@@ -0,0 +1,400 @@
+"""
+PostgreSQL-backed session store for running several Slack bot replicas.
+
+Sessions and thread mappings are kept in the `postgres` service that already
+backs the sre-bot-api, so any replica can pick up any thread and restarts do
+not lose thread context. Reads go through a small local cache, activity
+updates are buffered and written in batches, and expired sessions are
+deleted in bounded batches by the session sweeper. Requests a stopping
+replica could not finish are queued in slack_bot_pending_work until a
+replica claims them.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from modules.sessions import (
+    SESSION_TIMEOUT_MINUTES,
+    ConversationSession,
+    SessionStore,
+)
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+
+def get_session_db_url() -> str:
+    """Get the session database URL from environment"""
+    url = os.getenv("SESSION_DB_URL")
+    if url:
+        return url
+
+    db_host = os.getenv("DB_HOST", "localhost")
+    db_port = os.getenv("DB_PORT", "5432")
+    db_name = os.getenv("DB_NAME", "srebot")
+    db_user = os.getenv("DB_USER", "postgres")
+    db_password = os.getenv("DB_PASSWORD", "postgres")
+
+    return f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+
+
+SESSION_DB_POOL_MIN = int(os.getenv("SESSION_DB_POOL_MIN", "1"))
+SESSION_DB_POOL_MAX = int(os.getenv("SESSION_DB_POOL_MAX", "10"))
+SESSION_CACHE_SIZE = int(
+    os.getenv("SESSION_CACHE_SIZE", "1000")
+)  # Sessions kept in the local read-through cache
+SESSION_CACHE_TTL = float(
+    os.getenv("SESSION_CACHE_TTL", "30")
+)  # Seconds a cached session is trusted before re-reading
+SESSION_FLUSH_INTERVAL = float(
+    os.getenv("SESSION_FLUSH_INTERVAL", "5")
+)  # Seconds between batched activity writes
+SESSION_EXPIRE_BATCH = 500  # Rows deleted per expiry statement
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS slack_bot_sessions (
+    key TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    slack_user TEXT NOT NULL,
+    current_slack_user TEXT NOT NULL,
+    thread_ts TEXT,
+    expires_at TIMESTAMPTZ NOT NULL
+);
+ALTER TABLE slack_bot_sessions ADD COLUMN IF NOT EXISTS cached_exchange JSONB;
+CREATE INDEX IF NOT EXISTS slack_bot_sessions_expires_at_idx
+    ON slack_bot_sessions (expires_at);
+CREATE TABLE IF NOT EXISTS slack_bot_thread_sessions (
+    thread_key TEXT PRIMARY KEY,
+    session_key TEXT NOT NULL REFERENCES slack_bot_sessions (key) ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS slack_bot_pending_work (
+    id BIGSERIAL PRIMARY KEY,
+    payload JSONB NOT NULL
+);
+"""
+
+
+class PostgresSessionStore(SessionStore):
+    """Session store shared between replicas through PostgreSQL."""
+
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        timeout_minutes: int = SESSION_TIMEOUT_MINUTES,
+        pool_min: int = SESSION_DB_POOL_MIN,
+        pool_max: int = SESSION_DB_POOL_MAX,
+        cache_size: int = SESSION_CACHE_SIZE,
+        cache_ttl: float = SESSION_CACHE_TTL,
+        flush_interval: float = SESSION_FLUSH_INTERVAL,
+    ):
+        """
+        Initialize the store. Connections are opened in start().
+
+        Args:
+            dsn: PostgreSQL connection URL (defaults to SESSION_DB_URL / DB_* env)
+            timeout_minutes: Session inactivity timeout
+            pool_min: Minimum pooled connections
+            pool_max: Maximum pooled connections
+            cache_size: Maximum sessions held in the local cache
+            cache_ttl: Seconds a cached session is served without a database read
+            flush_interval: Seconds between batched activity writes
+        """
+        super().__init__(timeout_minutes)
+        self.dsn = dsn or get_session_db_url()
+        self.pool_min = pool_min
+        self.pool_max = pool_max
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.flush_interval = flush_interval
+        self._pool = None
+        self._cache: "OrderedDict[str, Tuple[ConversationSession, float]]" = (
+            OrderedDict()
+        )
+        # thread key -> (session key, cached at); only positive lookups are cached
+        self._thread_cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        # session key -> thread keys cached for it, to forget them without a scan
+        self._session_threads: Dict[str, Set[str]] = {}
+        # key -> current user, written in the next batch
+        self._pending_touches: Dict[str, str] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        try:
+            import asyncpg
+        except ImportError as e:
+            raise RuntimeError(
+                "SESSION_STORE=postgres requires asyncpg. Install with: pip install asyncpg"
+            ) from e
+
+        if self._pool is None:
+            self._pool = await asyncpg.create_pool(
+                self.dsn, min_size=self.pool_min, max_size=self.pool_max
+            )
+            async with self._pool.acquire() as conn:
+                await conn.execute(SCHEMA_SQL)
+            logger.info(
+                "Postgres session store connected (pool %s-%s)",
+                self.pool_min,
+                self.pool_max,
+            )
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_forever())
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        if self._pool is not None:
+            await self.flush()
+            await self._pool.close()
+            self._pool = None
+            logger.info("Postgres session store closed")
+
+    async def get_session(self, key: str) -> Optional[ConversationSession]:
+        cached = self._cache.get(key)
+        if cached is not None:
+            session, cached_at = cached
+            if time.monotonic() - cached_at < self.cache_ttl:
+                self._cache.move_to_end(key)
+                return None if session.is_expired() else session
+            del self._cache[key]
+
+        row = await self._pool.fetchrow(
+            """
+            SELECT session_id, channel, slack_user, current_slack_user, thread_ts,
+                   cached_exchange,
+                   EXTRACT(EPOCH FROM expires_at - now()) AS ttl_remaining
+            FROM slack_bot_sessions
+            WHERE key = $1 AND expires_at > now()
+            """,
+            key,
+        )
+        if row is None:
+            return None
+
+        session = ConversationSession.restore(
+            channel=row["channel"],
+            user=row["slack_user"],
+            thread_ts=row["thread_ts"],
+            session_id=row["session_id"],
+            current_user=row["current_slack_user"],
+            ttl_remaining=float(row["ttl_remaining"]),
+            timeout_minutes=self.timeout_minutes,
+            cached_exchange=(
+                json.loads(row["cached_exchange"]) if row["cached_exchange"] else None
+            ),
+        )
+        self._cache_put(key, session)
+        return session
+
+    async def save_session(self, key: str, session: ConversationSession) -> None:
+        await self._pool.execute(
+            """
+            INSERT INTO slack_bot_sessions
+                (key, session_id, channel, slack_user, current_slack_user, thread_ts,
+                 cached_exchange, expires_at)
+            VALUES ($1, $2, $3, $4, $5, $6, $7::jsonb, now() + make_interval(secs => $8))
+            ON CONFLICT (key) DO UPDATE SET
+                session_id = EXCLUDED.session_id,
+                channel = EXCLUDED.channel,
+                slack_user = EXCLUDED.slack_user,
+                current_slack_user = EXCLUDED.current_slack_user,
+                thread_ts = EXCLUDED.thread_ts,
+                cached_exchange = EXCLUDED.cached_exchange,
+                expires_at = EXCLUDED.expires_at
+            """,
+            key,
+            session.session_id,
+            session.channel,
+            session.user,
+            session.current_user,
+            session.thread_ts,
+            json.dumps(session.cached_exchange) if session.cached_exchange else None,
+            float(session.timeout_seconds),
+        )
+        self._pending_touches.pop(key, None)
+        self._cache_put(key, session)
+
+    async def touch_session(self, key: str, session: ConversationSession) -> None:
+        # Extend locally now; the database catches up in the next batch
+        session.update_activity()
+        self._pending_touches[key] = session.current_user
+        cached = self._cache.get(key)
+        if cached is not None:
+            # Keep the original read time so cache_ttl still bounds how long
+            # changes made by other replicas go unseen
+            self._cache[key] = (session, cached[1])
+            self._cache.move_to_end(key)
+
+    async def delete_session(self, key: str) -> None:
+        self._forget({key})
+        self._pending_touches.pop(key, None)
+        # Thread mappings are removed by ON DELETE CASCADE
+        await self._pool.execute("DELETE FROM slack_bot_sessions WHERE key = $1", key)
+
+    async def get_thread_session_key(self, thread_key: str) -> Optional[str]:
+        cached = self._thread_cache.get(thread_key)
+        if cached is not None:
+            key, cached_at = cached
+            if time.monotonic() - cached_at < self.cache_ttl:
+                return key
+            self._thread_cache_pop(thread_key)
+
+        key = await self._pool.fetchval(
+            "SELECT session_key FROM slack_bot_thread_sessions WHERE thread_key = $1",
+            thread_key,
+        )
+        if key is not None:
+            self._thread_cache_put(thread_key, key)
+        return key
+
+    async def set_thread_session_key(self, thread_key: str, key: str) -> None:
+        await self._pool.execute(
+            """
+            INSERT INTO slack_bot_thread_sessions (thread_key, session_key)
+            VALUES ($1, $2)
+            ON CONFLICT (thread_key) DO UPDATE SET session_key = EXCLUDED.session_key
+            """,
+            thread_key,
+            key,
+        )
+        self._thread_cache_put(thread_key, key)
+
+    async def cleanup_expired(self, limit: Optional[int] = None) -> int:
+        # Persist pending activity first so live sessions are not deleted
+        await self.flush()
+
+        removed = 0
+        while limit is None or removed < limit:
+            batch = SESSION_EXPIRE_BATCH
+            if limit is not None:
+                batch = min(batch, limit - removed)
+            keys = await self._pool.fetch(
+                """
+                DELETE FROM slack_bot_sessions
+                WHERE key IN (
+                    SELECT key FROM slack_bot_sessions
+                    WHERE expires_at <= now()
+                    LIMIT $1
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING key
+                """,
+                batch,
+            )
+            self._forget({record["key"] for record in keys})
+            removed += len(keys)
+            if len(keys) < batch:
+                break
+        return removed
+
+    async def count(self) -> int:
+        return await self._pool.fetchval(
+            "SELECT count(*) FROM slack_bot_sessions WHERE expires_at > now()"
+        )
+
+    async def save_pending_work(self, items: List[Dict[str, Any]]) -> int:
+        if not items:
+            return 0
+        await self._pool.executemany(
+            "INSERT INTO slack_bot_pending_work (payload) VALUES ($1::jsonb)",
+            [(json.dumps(item),) for item in items],
+        )
+        return len(items)
+
+    async def claim_pending_work(self, limit: int) -> List[Dict[str, Any]]:
+        # SKIP LOCKED lets several replicas claim concurrently without overlap
+        records = await self._pool.fetch(
+            """
+            DELETE FROM slack_bot_pending_work
+            WHERE id IN (
+                SELECT id FROM slack_bot_pending_work
+                ORDER BY id
+                LIMIT $1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, payload
+            """,
+            limit,
+        )
+        return [
+            json.loads(record["payload"])
+            for record in sorted(records, key=lambda record: record["id"])
+        ]
+
+    async def flush(self) -> int:
+        """
+        Write buffered activity updates in a single statement.
+
+        Returns:
+            int: Number of sessions updated
+        """
+        if not self._pending_touches or self._pool is None:
+            return 0
+
+        pending, self._pending_touches = self._pending_touches, {}
+        try:
+            await self._pool.execute(
+                """
+                UPDATE slack_bot_sessions AS s
+                SET current_slack_user = v.current_slack_user,
+                    expires_at = now() + make_interval(secs => $3)
+                FROM unnest($1::text[], $2::text[]) AS v(key, current_slack_user)
+                WHERE s.key = v.key
+                """,
+                list(pending.keys()),
+                list(pending.values()),
+                float(self.timeout_minutes * 60),
+            )
+        except Exception:
+            # Keep the updates for the next attempt unless newer ones replaced them
+            for key, user in pending.items():
+                self._pending_touches.setdefault(key, user)
+            raise
+        return len(pending)
+
+    async def _flush_forever(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("Failed to flush session activity: %s", e, exc_info=True)
+
+    def _cache_put(self, key: str, session: ConversationSession) -> None:
+        self._cache[key] = (session, time.monotonic())
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _forget(self, keys: Set[str]) -> None:
+        """Drop deleted sessions and the cached thread mappings pointing at them"""
+        for key in keys:
+            self._cache.pop(key, None)
+            for thread_key in self._session_threads.pop(key, ()):
+                del self._thread_cache[thread_key]
+
+    def _thread_cache_put(self, thread_key: str, key: str) -> None:
+        self._thread_cache_pop(thread_key)
+        self._thread_cache[thread_key] = (key, time.monotonic())
+        self._session_threads.setdefault(key, set()).add(thread_key)
+        while len(self._thread_cache) > self.cache_size:
+            self._thread_cache_pop(next(iter(self._thread_cache)))
+
+    def _thread_cache_pop(self, thread_key: str) -> None:
+        cached = self._thread_cache.pop(thread_key, None)
+        if cached is None:
+            return
+        threads = self._session_threads[cached[0]]
+        threads.discard(thread_key)
+        if not threads:
+            del self._session_threads[cached[0]]
@@ -0,0 +1,208 @@
+"""
+Token-bucket rate limiting of agent requests.
+
+Each request needs a token from its user's bucket, its channel's bucket and
+a global bucket. Buckets hold up to `burst` tokens and refill continuously
+at `per_minute` tokens a minute, so short bursts are allowed while a
+sustained flood from one user or channel is turned away before it reaches
+the worker pool, the LLM quota or the Cost Explorer API budget.
+
+Buckets are kept per replica. A bucket that has refilled completely is no
+different from a new one, so idle buckets are forgotten and memory only
+grows with the number of recently active users and channels.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+RATE_LIMIT_ENABLED = (
+    os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+)  # Turn away requests beyond the limits below
+RATE_LIMIT_USER_PER_MINUTE = float(
+    os.getenv("RATE_LIMIT_USER_PER_MINUTE", "5")
+)  # Sustained requests per user (0 disables the user limit)
+RATE_LIMIT_USER_BURST = int(
+    os.getenv("RATE_LIMIT_USER_BURST", "3")
+)  # Requests a user can send at once
+RATE_LIMIT_CHANNEL_PER_MINUTE = float(
+    os.getenv("RATE_LIMIT_CHANNEL_PER_MINUTE", "20")
+)  # Sustained requests per channel (0 disables the channel limit)
+RATE_LIMIT_CHANNEL_BURST = int(
+    os.getenv("RATE_LIMIT_CHANNEL_BURST", "10")
+)  # Requests a channel can send at once
+RATE_LIMIT_GLOBAL_PER_MINUTE = float(
+    os.getenv("RATE_LIMIT_GLOBAL_PER_MINUTE", "60")
+)  # Sustained requests per replica (0 disables the global limit)
+RATE_LIMIT_GLOBAL_BURST = int(
+    os.getenv("RATE_LIMIT_GLOBAL_BURST", "30")
+)  # Requests a replica accepts at once
+RATE_LIMIT_MAX_KEYS = int(
+    os.getenv("RATE_LIMIT_MAX_KEYS", "10000")
+)  # Users and channels tracked before the least recently seen are forgotten
+
+SCOPES = ("user", "channel", "global")
+
+
+class TokenBucket:
+    """Bucket of up to `burst` tokens refilled at `per_minute` tokens a minute."""
+
+    def __init__(self, per_minute: float, burst: int, now: Optional[float] = None):
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic() if now is None else now
+        # Until when the sender has already been told to slow down
+        self.notified_until = 0.0
+
+    def refill(self, now: float) -> None:
+        """Add the tokens earned since the last update"""
+        if now > self.updated_at:
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated_at) * self.rate
+            )
+            self.updated_at = now
+
+    def is_full(self) -> bool:
+        return self.tokens >= self.burst
+
+    def retry_after(self) -> float:
+        """Seconds until a token is available"""
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """User, channel and global token buckets checked together."""
+
+    def __init__(
+        self,
+        enabled: bool = RATE_LIMIT_ENABLED,
+        user: Tuple[float, int] = (RATE_LIMIT_USER_PER_MINUTE, RATE_LIMIT_USER_BURST),
+        channel: Tuple[float, int] = (
+            RATE_LIMIT_CHANNEL_PER_MINUTE,
+            RATE_LIMIT_CHANNEL_BURST,
+        ),
+        global_: Tuple[float, int] = (
+            RATE_LIMIT_GLOBAL_PER_MINUTE,
+            RATE_LIMIT_GLOBAL_BURST,
+        ),
+        max_keys: int = RATE_LIMIT_MAX_KEYS,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            enabled: Whether requests are limited at all
+            user: (per_minute, burst) of each user's bucket
+            channel: (per_minute, burst) of each channel's bucket
+            global_: (per_minute, burst) of the bucket shared by all requests
+            max_keys: Maximum user and channel buckets kept
+        """
+        self.enabled = enabled
+        self.max_keys = max_keys
+        # Scopes with a rate of 0 are not limited
+        self.limits: Dict[str, Tuple[float, int]] = {
+            scope: limit
+            for scope, limit in zip(SCOPES, (user, channel, global_))
+            if limit[0] > 0 and limit[1] > 0
+        }
+        # Buckets ordered by last use, least recent first
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self.allowed = 0
+        self.limited = {scope: 0 for scope in SCOPES}
+
+    def acquire(self, user: str, channel: str) -> Optional[Tuple[str, float, bool]]:
+        """
+        Take a token for a request from every bucket it counts against.
+
+        Tokens are only taken when all buckets have one, so a request turned
+        away by its channel's limit does not also use up its user's tokens.
+
+        Args:
+            user: Slack user ID
+            channel: Slack channel ID
+
+        Returns:
+            None if the request may proceed, otherwise (scope, retry_after,
+            notify) where scope is the limit that was hit, retry_after the
+            seconds until it allows another request and notify whether the
+            sender has not been told to slow down yet
+        """
+        if not self.enabled or not self.limits:
+            self.allowed += 1
+            return None
+
+        now = time.monotonic()
+        keys = {"user": user, "channel": channel, "global": ""}
+        buckets = [
+            (scope, self._bucket(scope, keys[scope], now)) for scope in self.limits
+        ]
+        for scope, bucket in buckets:
+            bucket.refill(now)
+            if bucket.tokens < 1:
+                self.limited[scope] += 1
+                retry_after = bucket.retry_after()
+                notify = now >= bucket.notified_until
+                if notify:
+                    bucket.notified_until = now + retry_after
+                logger.info(
+                    "Rate limited request from user %s in channel %s "
+                    "(%s limit, retry in %.0fs)",
+                    user,
+                    channel,
+                    scope,
+                    retry_after,
+                )
+                return scope, retry_after, notify
+
+        for _, bucket in buckets:
+            bucket.tokens -= 1
+        self.allowed += 1
+        self._evict(now)
+        return None
+
+    def _bucket(self, scope: str, key: str, now: float) -> TokenBucket:
+        bucket_key = (scope, key)
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            per_minute, burst = self.limits[scope]
+            bucket = self._buckets[bucket_key] = TokenBucket(per_minute, burst, now)
+        else:
+            self._buckets.move_to_end(bucket_key)
+        return bucket
+
+    def _evict(self, now: float) -> None:
+        """Forget refilled buckets, and the least recently used ones beyond max_keys"""
+        while self._buckets:
+            bucket_key, bucket = next(iter(self._buckets.items()))
+            if len(self._buckets) <= self.max_keys:
+                bucket.refill(now)
+                if not bucket.is_full():
+                    break
+            del self._buckets[bucket_key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get rate limiting counters.
+
+        Returns:
+            Dict with allowed and limited request counts and tracked buckets
+        """
+        stats: Dict[str, Any] = {
+            "enabled": self.enabled,
+            "tracked": len(self._buckets),
+            "allowed": self.allowed,
+        }
+        for scope, count in self.limited.items():
+            stats[f"limited_{scope}"] = count
+        return stats
+
+
+rate_limiter = RateLimiter()
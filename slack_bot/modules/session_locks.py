@@ -0,0 +1,107 @@
+"""
+Per-session serialization of agent runs.
+
+Two messages in one thread would otherwise start two concurrent /run calls
+against the same ADK session, racing on its stored state and sometimes
+answering out of order. Each sre-bot-api session gets an asyncio lock, so a
+thread's turns run one at a time in arrival order while different threads
+still run in parallel.
+
+A lock only exists while a turn holds or waits for it, so memory is bounded
+by the turns in progress and nothing is left behind when a session expires.
+At most SESSION_MAX_QUEUED_TURNS turns wait per session; beyond that the
+caller is told the thread is busy instead of tying up another worker.
+"""
+
+import asyncio
+import contextlib
+import os
+from typing import Any, AsyncIterator, Dict
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+SESSION_MAX_QUEUED_TURNS = int(
+    os.getenv("SESSION_MAX_QUEUED_TURNS", "2")
+)  # Turns waiting behind a running one in the same thread
+
+
+class SessionBusyError(Exception):
+    """Raised when too many turns are already waiting for a session."""
+
+
+class _SessionLock:
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        # Turns holding or waiting for the lock
+        self.users = 0
+
+
+class SessionLocks:
+    """Reference-counted asyncio locks keyed by session ID."""
+
+    def __init__(self, max_queued: int = SESSION_MAX_QUEUED_TURNS):
+        """
+        Initialize the lock table.
+
+        Args:
+            max_queued: Turns allowed to wait per session
+        """
+        self.max_queued = max_queued
+        self._locks: Dict[str, _SessionLock] = {}
+        self.contended = 0
+        self.rejected = 0
+
+    @contextlib.asynccontextmanager
+    async def hold(self, session_id: str) -> AsyncIterator[None]:
+        """
+        Hold a session's lock, waiting for every earlier turn to finish.
+
+        Args:
+            session_id: sre-bot-api session the turn runs in
+
+        Raises:
+            SessionBusyError: If max_queued turns are already waiting
+        """
+        entry = self._locks.get(session_id)
+        if entry is None:
+            entry = self._locks[session_id] = _SessionLock()
+        elif entry.users > self.max_queued:
+            self.rejected += 1
+            raise SessionBusyError(
+                f"{entry.users - 1} turns already waiting for session {session_id}"
+            )
+
+        if entry.lock.locked():
+            self.contended += 1
+            logger.info(
+                "Waiting for %d earlier turns of session %s", entry.users, session_id
+            )
+        entry.users += 1
+        try:
+            async with entry.lock:
+                yield
+        finally:
+            entry.users -= 1
+            if entry.users == 0:
+                del self._locks[session_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get lock table size and contention counters.
+
+        Returns:
+            Dict with active sessions, waiting turns, contended and rejected turns
+        """
+        return {
+            "active": len(self._locks),
+            "waiting": sum(
+                entry.users - entry.lock.locked() for entry in self._locks.values()
+            ),
+            "contended": self.contended,
+            "rejected": self.rejected,
+        }
+
+
+session_locks = SessionLocks()
@@ -0,0 +1,416 @@
+"""
+Conversation session tracking for the Slack bot.
+
+Sessions map Slack channels/threads to sre-bot-api session IDs. SessionManager
+holds the lookup rules (thread continuity, session migration when the bot
+opens a thread) and delegates storage to a pluggable SessionStore:
+
+- InMemorySessionStore keeps sessions in process. Every session shares the
+  same inactivity timeout, so ordering sessions by last activity is also
+  ordering them by expiry time. Sessions live in an OrderedDict in that order:
+  touching a session moves it to the end and expired sessions are always at
+  the front, which makes both lookups and eviction O(1) amortized.
+- PostgresSessionStore (modules.postgres_session_store) shares sessions
+  between replicas so the bot can scale horizontally and survive restarts.
+  It also holds requests a stopping replica could not finish, for another
+  replica to resume.
+
+Select the backend with SESSION_STORE=memory|postgres.
+"""
+
+import asyncio
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+SESSION_TIMEOUT_MINUTES = int(
+    os.getenv("SESSION_TIMEOUT_MINUTES", "1200")
+)  # Default 1200 minutes (20 hours)
+SESSION_SWEEP_INTERVAL = int(
+    os.getenv("SESSION_SWEEP_INTERVAL", "60")
+)  # Seconds between background sweeps of expired sessions
+SESSION_STORE = os.getenv("SESSION_STORE", "memory").lower()  # memory | postgres
+SESSION_EVICT_BATCH = 100  # Max sessions evicted inline per lookup
+
+
+class ConversationSession:
+    def __init__(
+        self,
+        channel: str,
+        user: str,
+        thread_ts: str | None = None,
+        timeout_minutes: Optional[int] = None,
+    ):
+        self.channel = channel
+        self.user = user  # Original user who started the session
+        self.current_user = user  # Current user interacting (can change in threads)
+        self.thread_ts = thread_ts
+        # Use thread_ts in the session_id if available for continuity
+        thread_id = thread_ts if thread_ts else f"{datetime.now().timestamp()}"
+        self.session_id = f"s_{channel}_{thread_id}"
+        self.user_id = f"u_{user}"  # Unique user ID for the API
+        self.timeout_seconds = (
+            timeout_minutes if timeout_minutes is not None else SESSION_TIMEOUT_MINUTES
+        ) * 60
+        # Question and answer served from the answer cache, which the agent
+        # has not seen yet; passed to it with the next turn of the session
+        self.cached_exchange: Optional[Dict[str, str]] = None
+        self.update_activity()
+
+    @classmethod
+    def restore(
+        cls,
+        channel: str,
+        user: str,
+        thread_ts: str | None,
+        session_id: str,
+        current_user: str,
+        ttl_remaining: float,
+        timeout_minutes: Optional[int] = None,
+        cached_exchange: Optional[Dict[str, str]] = None,
+    ) -> "ConversationSession":
+        """
+        Rebuild a session loaded from an external store.
+
+        Args:
+            channel: Channel ID
+            user: User who started the session
+            thread_ts: Thread timestamp (optional)
+            session_id: Stored sre-bot-api session ID
+            current_user: User who interacted most recently
+            ttl_remaining: Seconds until the session expires
+            timeout_minutes: Inactivity timeout of the owning manager
+            cached_exchange: Stored cached answer the agent has not seen yet
+
+        Returns:
+            ConversationSession: Session with the stored identity and deadline
+        """
+        session = cls(channel, user, thread_ts, timeout_minutes=timeout_minutes)
+        session.session_id = session_id
+        session.current_user = current_user
+        session.cached_exchange = cached_exchange
+        session.expires_at = time.monotonic() + ttl_remaining
+        session.last_activity = datetime.now() - timedelta(
+            seconds=session.timeout_seconds - ttl_remaining
+        )
+        return session
+
+    def update_activity(self):
+        self.last_activity = datetime.now()
+        # Monotonic deadline so expiry checks are a single float comparison
+        self.expires_at = time.monotonic() + self.timeout_seconds
+
+    def is_expired(
+        self, timeout_minutes: Optional[int] = None, now: Optional[float] = None
+    ) -> bool:  # Configurable session timeout
+        if now is None:
+            now = time.monotonic()
+        if timeout_minutes is None:
+            return now > self.expires_at
+        last_activity = self.expires_at - self.timeout_seconds
+        return now - last_activity > timeout_minutes * 60
+
+
+class SessionStore(ABC):
+    """
+    Storage backend for conversation sessions and thread mappings.
+
+    Session keys have the form `{channel}_{user}_{thread_ts|main}` and thread
+    keys `{channel}_{thread_ts}`. Implementations only return live sessions;
+    expired ones are removed by cleanup_expired(), which the manager calls
+    from its background sweeper.
+    """
+
+    def __init__(self, timeout_minutes: int = SESSION_TIMEOUT_MINUTES):
+        self.timeout_minutes = timeout_minutes
+
+    async def start(self) -> None:
+        """Open connections or background resources used by the store."""
+
+    async def close(self) -> None:
+        """Release connections or background resources used by the store."""
+
+    @abstractmethod
+    async def get_session(self, key: str) -> Optional[ConversationSession]:
+        """Get a live session by key, or None if missing or expired."""
+
+    @abstractmethod
+    async def save_session(self, key: str, session: ConversationSession) -> None:
+        """Insert or replace a session under key."""
+
+    @abstractmethod
+    async def touch_session(self, key: str, session: ConversationSession) -> None:
+        """Record activity on a session, extending its expiry."""
+
+    @abstractmethod
+    async def delete_session(self, key: str) -> None:
+        """Remove a session and any thread mapping pointing at it."""
+
+    @abstractmethod
+    async def get_thread_session_key(self, thread_key: str) -> Optional[str]:
+        """Get the session key a thread is mapped to."""
+
+    @abstractmethod
+    async def set_thread_session_key(self, thread_key: str, key: str) -> None:
+        """Map a thread to a session key."""
+
+    @abstractmethod
+    async def cleanup_expired(self, limit: Optional[int] = None) -> int:
+        """Remove expired sessions, returning how many were removed."""
+
+    @abstractmethod
+    async def count(self) -> int:
+        """Count sessions currently held by the store."""
+
+    async def save_pending_work(self, items: List[Dict[str, Any]]) -> int:
+        """
+        Persist unfinished requests for another replica to resume.
+
+        Stores that do not outlive the process cannot hand work over, so
+        the default saves nothing.
+
+        Returns:
+            int: Number of requests saved
+        """
+        return 0
+
+    async def claim_pending_work(self, limit: int) -> List[Dict[str, Any]]:
+        """Remove and return up to `limit` saved requests, oldest first."""
+        return []
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local session store ordered by expiry."""
+
+    def __init__(self, timeout_minutes: int = SESSION_TIMEOUT_MINUTES):
+        super().__init__(timeout_minutes)
+        # Sessions ordered by last activity (oldest first, i.e. next to expire)
+        self.sessions: "OrderedDict[str, ConversationSession]" = OrderedDict()
+        # Map thread_ts to session_id for continuity
+        self.thread_session_map: Dict[str, str] = {}
+
+    async def get_session(self, key: str) -> Optional[ConversationSession]:
+        now = time.monotonic()
+        # Evict a bounded batch of expired sessions; the sweeper handles the rest
+        self._evict_expired(now, limit=SESSION_EVICT_BATCH)
+        session = self.sessions.get(key)
+        if session is None or session.is_expired(now=now):
+            return None
+        return session
+
+    async def save_session(self, key: str, session: ConversationSession) -> None:
+        # Re-insert so the session lands at the back of the expiry order
+        self.sessions.pop(key, None)
+        self.sessions[key] = session
+
+    async def touch_session(self, key: str, session: ConversationSession) -> None:
+        session.update_activity()
+        if key in self.sessions:
+            self.sessions.move_to_end(key)
+
+    async def delete_session(self, key: str) -> None:
+        self._remove_session(key)
+
+    async def get_thread_session_key(self, thread_key: str) -> Optional[str]:
+        return self.thread_session_map.get(thread_key)
+
+    async def set_thread_session_key(self, thread_key: str, key: str) -> None:
+        self.thread_session_map[thread_key] = key
+
+    async def cleanup_expired(self, limit: Optional[int] = None) -> int:
+        return self._evict_expired(time.monotonic(), limit=limit)
+
+    async def count(self) -> int:
+        return len(self.sessions)
+
+    def _remove_session(self, key: str) -> Optional[ConversationSession]:
+        """Remove a session and any thread mapping that points at it"""
+        session = self.sessions.pop(key, None)
+        if session is not None and session.thread_ts:
+            thread_key = f"{session.channel}_{session.thread_ts}"
+            if self.thread_session_map.get(thread_key) == key:
+                del self.thread_session_map[thread_key]
+        return session
+
+    def _evict_expired(self, now: float, limit: Optional[int] = None) -> int:
+        """
+        Evict expired sessions from the front of the expiry order.
+
+        Stops at the first live session, so the cost is proportional to the
+        number of sessions evicted rather than the number of sessions alive.
+
+        Args:
+            now: Monotonic timestamp to compare against
+            limit: Maximum number of sessions to evict in this call
+
+        Returns:
+            int: Number of sessions evicted
+        """
+        evicted = 0
+        while self.sessions and (limit is None or evicted < limit):
+            key, session = next(iter(self.sessions.items()))
+            if not session.is_expired(now=now):
+                break
+            self._remove_session(key)
+            evicted += 1
+            logger.info("Cleaned up expired session: %s", key)
+        return evicted
+
+
+def create_session_store(
+    backend: str = SESSION_STORE, timeout_minutes: int = SESSION_TIMEOUT_MINUTES
+) -> SessionStore:
+    """
+    Create the configured session store backend.
+
+    Args:
+        backend: Backend name ("memory" or "postgres")
+        timeout_minutes: Session inactivity timeout
+
+    Returns:
+        SessionStore: Store instance (not yet started)
+    """
+    if backend == "postgres":
+        # Imported lazily so asyncpg is only required when the backend is used
+        from modules.postgres_session_store import PostgresSessionStore
+
+        return PostgresSessionStore(timeout_minutes=timeout_minutes)
+    if backend != "memory":
+        logger.warning("Unknown SESSION_STORE '%s', using in-memory store", backend)
+    return InMemorySessionStore(timeout_minutes=timeout_minutes)
+
+
+# Global session manager
+class SessionManager:
+    def __init__(
+        self,
+        store: Optional[SessionStore] = None,
+        timeout_minutes: Optional[int] = None,
+    ):
+        self.timeout_minutes = (
+            timeout_minutes if timeout_minutes is not None else SESSION_TIMEOUT_MINUTES
+        )
+        self.store = store or InMemorySessionStore(self.timeout_minutes)
+        self.cleanup_interval = SESSION_SWEEP_INTERVAL
+        self._sweeper_task: Optional[asyncio.Task] = None
+
+    async def update_session_thread(
+        self, session: ConversationSession, new_thread_ts: str
+    ):
+        """Update an existing session with a new thread_ts (for thread creation)"""
+        old_key = f"{session.channel}_{session.user}_{session.thread_ts if session.thread_ts else 'main'}"
+
+        # Update the session object
+        session.thread_ts = new_thread_ts
+
+        # Create new session ID with thread
+        thread_id = new_thread_ts
+        session.session_id = f"s_{session.channel}_{thread_id}"
+        session.update_activity()
+
+        # Create new key with thread
+        new_key = f"{session.channel}_{session.user}_{new_thread_ts}"
+
+        # Move session to new key
+        await self.store.delete_session(old_key)
+        await self.store.save_session(new_key, session)
+        logger.info("Migrated session from %s to %s", old_key, new_key)
+
+        # Update thread mapping
+        thread_key = f"{session.channel}_{new_thread_ts}"
+        await self.store.set_thread_session_key(thread_key, new_key)
+
+        return session
+
+    async def save_session(self, session: ConversationSession) -> None:
+        """Store changes made to a session, e.g. its cached exchange"""
+        key = f"{session.channel}_{session.user}_{session.thread_ts if session.thread_ts else 'main'}"
+        await self.store.save_session(key, session)
+
+    async def get_session(
+        self, channel: str, user: str, thread_ts: str | None = None
+    ) -> ConversationSession:
+        # For threaded conversations, prioritize thread-based sessions
+        if thread_ts:
+            thread_key = f"{channel}_{thread_ts}"
+
+            # Check if we already have a session for this thread
+            existing_session_key = await self.store.get_thread_session_key(thread_key)
+            if existing_session_key is not None:
+                # The store only returns sessions that have not expired
+                session = await self.store.get_session(existing_session_key)
+                if session is not None:
+                    logger.info(
+                        "Reusing existing thread session %s for thread %s (current user: %s)",
+                        existing_session_key,
+                        thread_ts,
+                        user,
+                    )
+                    # Update current user for this interaction
+                    session.current_user = user
+                    await self.store.touch_session(existing_session_key, session)
+                    return session
+
+        # For non-threaded or new threads, use user-based session key
+        key = f"{channel}_{user}_{thread_ts if thread_ts else 'main'}"
+
+        # Create new session if doesn't exist or is expired
+        session = await self.store.get_session(key)
+        if session is None:
+            session = ConversationSession(
+                channel, user, thread_ts, timeout_minutes=self.timeout_minutes
+            )
+            await self.store.save_session(key, session)
+
+            # If this is a threaded message, record the mapping from thread to session
+            if thread_ts:
+                thread_key = f"{channel}_{thread_ts}"
+                await self.store.set_thread_session_key(thread_key, key)
+                logger.info("Created new session for thread %s: %s", thread_ts, key)
+        else:
+            await self.store.touch_session(key, session)
+            logger.info("Using existing session: %s", key)
+
+        return session
+
+    async def _sweep_forever(self):
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            try:
+                evicted = await self.store.cleanup_expired()
+                if evicted:
+                    logger.info("Session sweep evicted %s sessions", evicted)
+            except Exception as e:
+                logger.error("Session sweep failed: %s", e, exc_info=True)
+
+    async def start(self):
+        """Open the session store and start the background expiry sweeper"""
+        await self.store.start()
+        if self._sweeper_task is None or self._sweeper_task.done():
+            self._sweeper_task = asyncio.create_task(self._sweep_forever())
+            logger.info(
+                "Session manager started with %s (sweep interval: %ss)",
+                type(self.store).__name__,
+                self.cleanup_interval,
+            )
+
+    async def close(self):
+        """Stop the sweeper and close the session store"""
+        if self._sweeper_task is not None:
+            self._sweeper_task.cancel()
+            try:
+                await self._sweeper_task
+            except asyncio.CancelledError:
+                pass
+            self._sweeper_task = None
+        await self.store.close()
+
+
+session_manager = SessionManager(create_session_store())
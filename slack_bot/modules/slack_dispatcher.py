@@ -0,0 +1,353 @@
+"""
+Rate-limit-aware dispatcher for outbound Slack writes.
+
+Slack limits chat.postMessage to roughly one message per second per channel
+and answers bursts with HTTP 429 and a Retry-After header. Every write the
+bot makes goes through this dispatcher, which serialises writes per
+channel, spaces new messages out, waits out Retry-After (for the channel,
+or for the whole method when it is limited per workspace, like chat.update)
+and retries transient failures with jittered exponential backoff.
+
+Channel state lives only while it still paces writes: channels are kept in
+order of last use and idle ones are evicted from the front whenever a new
+channel is written to, so the map does not grow with every channel the bot
+has ever posted in.
+
+Acknowledgements are queued without blocking the caller. If the answer for
+the same thread is ready before the acknowledgement could be sent, the
+acknowledgement is dropped and only the answer is posted.
+"""
+
+import asyncio
+import os
+import random
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
+import aiohttp
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_client import AsyncWebClient
+from slack_sdk.web.async_slack_response import AsyncSlackResponse
+
+from modules.metrics import ERRORS, SLACK_API_LATENCY
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+SLACK_CHANNEL_MIN_INTERVAL = float(
+    os.getenv("SLACK_CHANNEL_MIN_INTERVAL", "1.0")
+)  # Minimum seconds between new messages in the same channel
+SLACK_SEND_MAX_RETRIES = int(
+    os.getenv("SLACK_SEND_MAX_RETRIES", "5")
+)  # Retries for rate-limited or failed writes
+SLACK_BACKOFF_BASE = float(
+    os.getenv("SLACK_BACKOFF_BASE", "0.5")
+)  # First backoff delay in seconds, doubled on every retry
+SLACK_BACKOFF_MAX = float(
+    os.getenv("SLACK_BACKOFF_MAX", "30")
+)  # Longest backoff or Retry-After wait in seconds
+
+# Slack errors that are worth retrying; anything else is a permanent failure
+_RETRYABLE_ERRORS = {
+    "ratelimited",
+    "internal_error",
+    "fatal_error",
+    "service_unavailable",
+}
+
+
+class _ChannelQueue:
+    """Write ordering and pacing state for one channel."""
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.next_send_at = 0.0
+        self.waiters = 0
+
+
+class SlackDispatcher:
+    """Serialises, paces and retries Slack writes per channel."""
+
+    def __init__(
+        self,
+        min_interval: float = SLACK_CHANNEL_MIN_INTERVAL,
+        max_retries: int = SLACK_SEND_MAX_RETRIES,
+        backoff_base: float = SLACK_BACKOFF_BASE,
+        backoff_max: float = SLACK_BACKOFF_MAX,
+    ):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            min_interval: Minimum seconds between new messages in a channel
+            max_retries: Retries per write after the first attempt
+            backoff_base: First backoff delay in seconds
+            backoff_max: Longest single wait in seconds
+        """
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Ordered by last use, oldest first
+        self._channels: Dict[str, _ChannelQueue] = {}
+        self._method_blocked_until: Dict[str, float] = {}
+        self._pending_acks: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._superseded_acks: Set[Tuple[str, str]] = set()
+        self._ack_tasks: Set[asyncio.Task] = set()
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.coalesced_acks = 0
+
+    async def send(
+        self,
+        client: AsyncWebClient,
+        method: str,
+        channel: str,
+        max_retries: Optional[int] = None,
+        coalesce_key: Optional[Tuple[str, str]] = None,
+        **kwargs: Any,
+    ) -> Optional[AsyncSlackResponse]:
+        """
+        Call a Slack write method once the channel is free to receive it.
+
+        Args:
+            client: Slack AsyncWebClient instance
+            method: Client method name, e.g. "chat_postMessage"
+            channel: Channel ID the write goes to
+            max_retries: Override of the retry count for this write
+            coalesce_key: (channel, thread_ts) of an acknowledgement that an
+                answer to the same thread may supersede
+            **kwargs: Arguments for the Slack method
+
+        Returns:
+            Optional[AsyncSlackResponse]: Slack's response, or None if the
+            write was superseded before it was sent
+
+        Raises:
+            SlackApiError: If Slack rejects the write permanently or retries
+                are exhausted
+        """
+        retries_left = self.max_retries if max_retries is None else max_retries
+        attempt = 0
+        queue = self._channels.pop(channel, None)
+        if queue is None:
+            self._evict_idle_channels()
+            queue = _ChannelQueue()
+        self._channels[channel] = queue
+        queue.waiters += 1
+        try:
+            async with queue.lock:
+                while True:
+                    await self._wait_until(
+                        max(
+                            queue.next_send_at,
+                            self._method_blocked_until.get(method, 0),
+                        )
+                    )
+                    if (
+                        coalesce_key is not None
+                        and coalesce_key in self._superseded_acks
+                    ):
+                        self._superseded_acks.discard(coalesce_key)
+                        self.coalesced_acks += 1
+                        logger.info(
+                            "Dropped acknowledgement superseded by answer in %s",
+                            channel,
+                        )
+                        return None
+
+                    try:
+                        with SLACK_API_LATENCY.labels(method=method).time():
+                            response = await getattr(client, method)(
+                                channel=channel, **kwargs
+                            )
+                        if method == "chat_postMessage":
+                            # Slack's one-per-second channel limit covers new messages only
+                            queue.next_send_at = time.monotonic() + self.min_interval
+                        self.sent += 1
+                        return response
+                    except (
+                        SlackApiError,
+                        aiohttp.ClientError,
+                        asyncio.TimeoutError,
+                    ) as e:
+                        delay = self._retry_delay(e, attempt)
+                        if delay is None or retries_left <= 0:
+                            self.failed += 1
+                            ERRORS.labels(type="slack_write").inc()
+                            raise
+                        if (
+                            isinstance(e, SlackApiError)
+                            and e.response.status_code == 429
+                        ):
+                            self.rate_limited += 1
+                            blocked_until = time.monotonic() + delay
+                            queue.next_send_at = blocked_until
+                            if method != "chat_postMessage":
+                                # Other write methods are limited per workspace
+                                self._method_blocked_until[method] = blocked_until
+                        else:
+                            queue.next_send_at = time.monotonic() + delay
+                        logger.warning(
+                            "Slack %s to %s failed (%s), retrying in %.2fs",
+                            method,
+                            channel,
+                            e,
+                            delay,
+                        )
+                        self.retries += 1
+                        retries_left -= 1
+                        attempt += 1
+        finally:
+            queue.waiters -= 1
+            if queue.waiters == 0 and queue.next_send_at <= time.monotonic():
+                self._channels.pop(channel, None)
+
+    def _evict_idle_channels(self) -> None:
+        """Forget least recently used channels that no longer delay a write"""
+        now = time.monotonic()
+        while self._channels:
+            channel = next(iter(self._channels))
+            queue = self._channels[channel]
+            if queue.waiters or queue.next_send_at > now:
+                # Channels behind it were used later, so stop at the first busy one
+                break
+            del self._channels[channel]
+
+    async def post_message(
+        self,
+        client: AsyncWebClient,
+        channel: str,
+        text: str,
+        thread_ts: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Optional[AsyncSlackResponse]:
+        """
+        Post a message, superseding any acknowledgement still queued for the thread.
+
+        Args:
+            client: Slack AsyncWebClient instance
+            channel: Channel ID
+            text: Message text
+            thread_ts: Thread timestamp to reply in (optional)
+            **kwargs: Extra chat.postMessage arguments, plus max_retries
+
+        Returns:
+            Optional[AsyncSlackResponse]: Slack's response
+        """
+        if thread_ts and (channel, thread_ts) in self._pending_acks:
+            self._superseded_acks.add((channel, thread_ts))
+        return await self.send(
+            client,
+            "chat_postMessage",
+            channel,
+            text=text,
+            thread_ts=thread_ts,
+            **kwargs,
+        )
+
+    async def update_message(
+        self, client: AsyncWebClient, channel: str, ts: str, text: str, **kwargs: Any
+    ) -> Optional[AsyncSlackResponse]:
+        """
+        Edit a message in place.
+
+        Args:
+            client: Slack AsyncWebClient instance
+            channel: Channel ID
+            ts: Timestamp of the message to edit
+            text: New message text
+            **kwargs: Extra chat.update arguments, plus max_retries
+
+        Returns:
+            Optional[AsyncSlackResponse]: Slack's response
+        """
+        return await self.send(
+            client, "chat_update", channel, ts=ts, text=text, **kwargs
+        )
+
+    def post_ack(
+        self,
+        client: AsyncWebClient,
+        channel: str,
+        text: str,
+        thread_ts: Optional[str] = None,
+    ) -> asyncio.Task:
+        """
+        Queue an acknowledgement without waiting for it to be sent.
+
+        Args:
+            client: Slack AsyncWebClient instance
+            channel: Channel ID
+            text: Acknowledgement text
+            thread_ts: Thread the acknowledgement and answer go to; without
+                one the acknowledgement is never superseded
+
+        Returns:
+            asyncio.Task: Resolves to Slack's response, or None if the answer
+            superseded the acknowledgement
+        """
+        key = (channel, thread_ts) if thread_ts else None
+        task = asyncio.create_task(
+            self.send(
+                client,
+                "chat_postMessage",
+                channel,
+                coalesce_key=key,
+                text=text,
+                thread_ts=thread_ts,
+            )
+        )
+        if key is not None:
+            self._pending_acks[key] = task
+        self._ack_tasks.add(task)
+
+        def _done(finished: asyncio.Task) -> None:
+            self._ack_tasks.discard(finished)
+            if key is not None and self._pending_acks.get(key) is finished:
+                del self._pending_acks[key]
+                self._superseded_acks.discard(key)
+            if not finished.cancelled() and finished.exception() is not None:
+                logger.error("Failed to send acknowledgement: %s", finished.exception())
+
+        task.add_done_callback(_done)
+        return task
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Get how long to wait before retrying, or None if not retryable"""
+        if isinstance(error, SlackApiError):
+            status = error.response.status_code
+            if status == 429:
+                retry_after = error.response.headers.get("Retry-After", "1")
+                return min(float(retry_after), self.backoff_max)
+            if status < 500 and error.response.get("error") not in _RETRYABLE_ERRORS:
+                return None
+        # Full jitter: spreads retries of concurrent writers apart
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    @staticmethod
+    async def _wait_until(deadline: float) -> None:
+        delay = deadline - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get outbound write counters.
+
+        Returns:
+            Dict with send, retry and coalescing statistics
+        """
+        return {
+            "active_channels": len(self._channels),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "coalesced_acks": self.coalesced_acks,
+        }
+
+
+slack_dispatcher = SlackDispatcher()
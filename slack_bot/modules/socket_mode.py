@@ -0,0 +1,162 @@
+"""
+Socket Mode transport for the Slack bot.
+
+Instead of Slack calling /slack/events over public HTTPS, the bot opens
+WebSocket connections to Slack and receives events over them, so it can run
+in a private network. Envelopes are acknowledged over the same connection
+once the Bolt middleware and handlers have accepted them, exactly as the
+HTTP handler acknowledges a request. Several connections are kept open at
+once: Slack spreads envelopes across them, and events keep flowing while
+one connection is being refreshed. Reconnects (Slack's periodic disconnect
+messages, closed sockets, missed pongs) are handled by each client.
+"""
+
+import asyncio
+import os
+from time import time
+from typing import Any, Dict, List, Optional, Set
+
+from slack_bolt.adapter.socket_mode.async_internals import send_async_response
+from slack_bolt.async_app import AsyncApp
+from slack_bolt.request.async_request import AsyncBoltRequest
+from slack_sdk.socket_mode.aiohttp import SocketModeClient
+from slack_sdk.socket_mode.request import SocketModeRequest
+from slack_sdk.web.async_client import AsyncWebClient
+
+from modules.tracing import tracer
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+SLACK_SOCKET_MODE = (
+    os.getenv("SLACK_SOCKET_MODE", "false").lower() == "true"
+)  # Receive events over Socket Mode (needs SLACK_APP_TOKEN) instead of /slack/events
+SLACK_SOCKET_MODE_CONNECTIONS = int(
+    os.getenv("SLACK_SOCKET_MODE_CONNECTIONS", "2")
+)  # Concurrent WebSocket connections (Slack allows up to 10 per app)
+SLACK_SOCKET_MODE_PING_INTERVAL = float(
+    os.getenv("SLACK_SOCKET_MODE_PING_INTERVAL", "10")
+)  # Seconds between pings; a connection missing 4 pongs is reopened
+
+
+class SocketModeRunner:
+    """Runs a Bolt app over several Socket Mode connections."""
+
+    def __init__(
+        self,
+        app: AsyncApp,
+        app_token: Optional[str] = None,
+        connections: int = SLACK_SOCKET_MODE_CONNECTIONS,
+        ping_interval: float = SLACK_SOCKET_MODE_PING_INTERVAL,
+        web_client: Optional[AsyncWebClient] = None,
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            app: Bolt app whose middleware and handlers process the events
+            app_token: App-level token starting with xapp- (defaults to SLACK_APP_TOKEN)
+            connections: Number of WebSocket connections to keep open
+            ping_interval: Seconds between pings on each connection
+            web_client: Client used to call apps.connections.open (defaults to the app's)
+        """
+        self.app = app
+        self.app_token = app_token or os.environ["SLACK_APP_TOKEN"]
+        self.connections = max(connections, 1)
+        self.ping_interval = ping_interval
+        self.web_client = web_client or app.client
+        self._clients: List[SocketModeClient] = []
+        self._connect_tasks: List[asyncio.Task] = []
+        self._greeted: Set[int] = set()
+        self.envelopes = 0
+        self.reconnects = 0
+
+    def start(self) -> None:
+        """
+        Open the connections in the background.
+
+        Each client keeps retrying until it connects, so startup is not
+        blocked while Slack is unreachable.
+        """
+        if self._clients:
+            return
+        for _ in range(self.connections):
+            client = SocketModeClient(
+                app_token=self.app_token,
+                logger=logger,
+                web_client=self.web_client,
+                ping_interval=self.ping_interval,
+            )
+            client.message_listeners.append(self._track)
+            client.socket_mode_request_listeners.append(self.handle)
+            self._clients.append(client)
+            self._connect_tasks.append(asyncio.create_task(client.connect()))
+        logger.info("Opening %s Socket Mode connections", self.connections)
+
+    async def close(self) -> None:
+        """Close all connections, stopping new events from arriving"""
+        for task in self._connect_tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*self._connect_tasks, return_exceptions=True)
+        for client in self._clients:
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning("Error closing Socket Mode connection: %s", e)
+        self._clients = []
+        self._connect_tasks = []
+        self._greeted.clear()
+
+    async def _track(self, client: SocketModeClient, message: dict, raw: str) -> None:
+        """Count reconnects: every session after a client's first starts with hello"""
+        if message.get("type") != "hello":
+            return
+        if id(client) in self._greeted:
+            self.reconnects += 1
+            logger.info("Socket Mode connection re-established")
+        else:
+            self._greeted.add(id(client))
+
+    async def handle(self, client: SocketModeClient, req: SocketModeRequest) -> None:
+        """
+        Dispatch an envelope to the Bolt app and acknowledge it.
+
+        Slack's retry attempt is passed on as the X-Slack-Retry-Num header,
+        so middleware treats retries the same as over HTTP.
+        """
+        start = time()
+        self.envelopes += 1
+        headers = {}
+        if req.retry_attempt:
+            headers["x-slack-retry-num"] = str(req.retry_attempt)
+        bolt_request = AsyncBoltRequest(
+            mode="socket_mode", body=req.payload, headers=headers
+        )
+        with tracer.start_as_current_span("slack.event"):
+            bolt_response = await self.app.async_dispatch(bolt_request)
+            await send_async_response(client, req, bolt_response, start)
+
+    def connected(self) -> int:
+        """Number of connections with an open WebSocket"""
+        return sum(
+            1
+            for client in self._clients
+            if client.current_session is not None
+            and not client.current_session.closed
+            and not client.stale
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get connection state and counters.
+
+        Returns:
+            Dict with connections, connected, envelopes and reconnects
+        """
+        return {
+            "connections": len(self._clients),
+            "connected": self.connected(),
+            "envelopes": self.envelopes,
+            "reconnects": self.reconnects,
+        }
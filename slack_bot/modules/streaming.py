@@ -0,0 +1,279 @@
+"""
+Streaming support for relaying ADK agent runs into Slack.
+
+The sre-bot-api exposes a server-sent-events endpoint (/run_sse) that emits
+one ADK event per `data:` line as the agent works. This module parses that
+stream, folds the events into the answer shown to the user and progressively
+edits a single Slack message, coalescing edits to stay under Slack's
+chat.update rate limits.
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+from slack_sdk.web.async_client import AsyncWebClient
+
+from modules.slack_dispatcher import slack_dispatcher
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Streaming configuration from environment variables
+STREAMING_ENABLED = os.getenv("STREAMING_ENABLED", "false").lower() == "true"
+STREAM_UPDATE_INTERVAL = float(
+    os.getenv("STREAM_UPDATE_INTERVAL", "1.5")
+)  # Minimum seconds between chat.update calls for one message
+STREAM_PREVIEW_CHARS = int(
+    os.getenv("STREAM_PREVIEW_CHARS", "3000")
+)  # Tail of the answer shown while the agent is still working
+
+
+async def iter_sse_events(stream: Any) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Parse a server-sent-events byte stream into decoded JSON events.
+
+    Reads raw chunks instead of lines so large events are not limited by the
+    reader's line buffer. Comment lines and non-JSON payloads are skipped.
+
+    Args:
+        stream: aiohttp StreamReader (response.content) or any object with iter_any()
+
+    Yields:
+        Dict[str, Any]: Each decoded event payload
+    """
+    buffer = b""
+    data_lines = []
+
+    async for chunk in stream.iter_any():
+        buffer += chunk
+        while b"\n" in buffer:
+            raw_line, buffer = buffer.split(b"\n", 1)
+            line = raw_line.rstrip(b"\r")
+
+            if not line:
+                # A blank line terminates the current event
+                if data_lines:
+                    event = _decode_sse_data(b"\n".join(data_lines))
+                    data_lines = []
+                    if event is not None:
+                        yield event
+            elif line.startswith(b"data:"):
+                data_lines.append(line[5:].lstrip(b" "))
+            # Other fields (event:, id:, retry:, comments) are not used by ADK
+
+    # Flush a trailing event that was not followed by a blank line
+    if buffer.startswith(b"data:"):
+        data_lines.append(buffer[5:].strip())
+    if data_lines:
+        event = _decode_sse_data(b"\n".join(data_lines))
+        if event is not None:
+            yield event
+
+
+def _decode_sse_data(data: bytes) -> Optional[Dict[str, Any]]:
+    """Decode one SSE data payload, returning None if it is not a JSON object"""
+    try:
+        event = json.loads(data)
+    except ValueError:
+        logger.warning("Skipping non-JSON SSE payload (%s bytes)", len(data))
+        return None
+    return event if isinstance(event, dict) else None
+
+
+class StreamingAnswer:
+    """
+    Accumulates ADK events into the answer text and a progress status line.
+
+    Partial events carry text deltas; the non-partial event that closes a
+    model turn carries the full text of that turn and replaces the deltas.
+    A tool call starts a new turn, so text from before the call is dropped
+    in favour of the answer the agent gives once the tool returns.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.status: Optional[str] = None
+        self.error: Optional[str] = None
+        self.event_count = 0
+
+    def apply(self, event: Dict[str, Any]) -> bool:
+        """
+        Fold one ADK event into the answer.
+
+        Args:
+            event: Decoded ADK event
+
+        Returns:
+            bool: True if the visible answer or status changed
+        """
+        self.event_count += 1
+
+        if "error" in event and "content" not in event:
+            self.error = str(event["error"])
+            return True
+
+        content = event.get("content")
+        if not isinstance(content, dict):
+            return False
+
+        changed = False
+        turn_text = []
+        for part in content.get("parts") or []:
+            if not isinstance(part, dict):
+                continue
+            function_call = part.get("functionCall") or part.get("function_call")
+            function_response = part.get("functionResponse") or part.get(
+                "function_response"
+            )
+            if function_call:
+                name = function_call.get("name", "tool")
+                if name == "transfer_to_agent":
+                    agent = (function_call.get("args") or {}).get("agent_name", "")
+                    self.status = f"Handing off to {agent or 'a specialist agent'}..."
+                else:
+                    self.status = f"Running `{name}`..."
+                self.text = ""
+                changed = True
+            elif function_response:
+                name = function_response.get("name", "tool")
+                self.status = f"Finished `{name}`, thinking..."
+                changed = True
+            elif isinstance(part.get("text"), str) and not part.get("thought"):
+                turn_text.append(part["text"])
+
+        if turn_text:
+            joined = "".join(turn_text)
+            if event.get("partial"):
+                self.text += joined
+            else:
+                self.text = joined
+            self.status = None
+            changed = True
+
+        return changed
+
+    def render(self, max_chars: int = STREAM_PREVIEW_CHARS) -> str:
+        """
+        Render the in-progress message shown in Slack.
+
+        Args:
+            max_chars: Maximum characters of answer text to show
+
+        Returns:
+            str: Message text with the status line appended
+        """
+        text = self.text
+        if len(text) > max_chars:
+            text = "..." + text[-max_chars:]
+        lines = [text] if text else []
+        if self.status:
+            lines.append(f"_{self.status}_")
+        return "\n\n".join(lines) or "_Working on it..._"
+
+
+class SlackStreamUpdater:
+    """
+    Progressively edits a single Slack message with coalesced updates.
+
+    The message is posted on the first update and edited in place with
+    chat.update afterwards. Updates arriving faster than the configured
+    interval are merged: only the latest text is sent once the interval
+    has elapsed.
+    """
+
+    def __init__(
+        self,
+        client: AsyncWebClient,
+        channel: str,
+        thread_ts: Optional[str],
+        min_interval: float = STREAM_UPDATE_INTERVAL,
+    ):
+        """
+        Initialize the updater.
+
+        Args:
+            client: Slack AsyncWebClient instance
+            channel: Channel ID
+            thread_ts: Thread timestamp to post into (optional)
+            min_interval: Minimum seconds between edits of the message
+        """
+        self.client = client
+        self.channel = channel
+        self.thread_ts = thread_ts
+        self.min_interval = min_interval
+        self.message_ts: Optional[str] = None
+        self.update_count = 0
+        self._pending: Optional[str] = None
+        self._last_sent: Optional[str] = None
+        self._last_flush = 0.0
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def update(self, text: str) -> None:
+        """
+        Queue new message text, sending it now or after the coalescing interval.
+
+        Args:
+            text: Full message text to display
+        """
+        self._pending = text
+        wait = self.min_interval - (time.monotonic() - self._last_flush)
+        if wait <= 0:
+            await self._flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush(wait))
+
+    async def finish(self, text: str) -> None:
+        """
+        Send the final text immediately, cancelling any scheduled edit.
+
+        Args:
+            text: Final message text
+        """
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._pending = text
+        await self._flush(raise_errors=True)
+
+    async def _delayed_flush(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self._flush()
+
+    async def _flush(self, raise_errors: bool = False) -> None:
+        async with self._lock:
+            text = self._pending
+            self._pending = None
+            if text is None or text == self._last_sent:
+                return
+
+            self._last_flush = time.monotonic()
+            try:
+                # Intermediate edits are not retried; the next edit replaces them
+                max_retries = None if raise_errors else 0
+                if self.message_ts is None:
+                    response = await slack_dispatcher.post_message(
+                        self.client,
+                        self.channel,
+                        text,
+                        thread_ts=self.thread_ts,
+                        max_retries=max_retries,
+                    )
+                    self.message_ts = response.get("ts")
+                else:
+                    await slack_dispatcher.update_message(
+                        self.client,
+                        self.channel,
+                        self.message_ts,
+                        text,
+                        max_retries=max_retries,
+                    )
+                self._last_sent = text
+                self.update_count += 1
+            except Exception as e:
+                if raise_errors:
+                    raise
+                # A failed intermediate edit is not fatal; the next one retries
+                logger.warning("Failed to update streaming message: %s", e)
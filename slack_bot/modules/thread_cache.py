@@ -0,0 +1,184 @@
+"""
+Cache for Slack thread context.
+
+A thread's parent message never changes, so once a thread has been fetched
+with conversations.replies it is kept in an LRU cache and new replies are
+appended from the message events the bot already receives, instead of
+refetching the thread for every follow-up.
+
+Replies only reach the bot as message events when the app subscribes to
+`message.channels`. Without that subscription a cached thread would miss
+every reply that does not mention the bot, so while no message events
+arrive, a mention in a cached thread drops it and the thread is refetched.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+THREAD_CACHE_SIZE = int(os.getenv("THREAD_CACHE_SIZE", "500"))  # Threads cached
+THREAD_CACHE_TTL = float(
+    os.getenv("THREAD_CACHE_TTL", "900")
+)  # Seconds before a thread is refetched from Slack
+THREAD_CONTEXT_MAX_REPLIES = 9  # Replies kept per thread for agent context
+
+
+class ThreadContext:
+    """Parent message and recent replies of one Slack thread."""
+
+    def __init__(self, parent: Dict[str, Any], replies: List[Dict[str, Any]]):
+        self.parent = parent
+        self.replies = replies[-THREAD_CONTEXT_MAX_REPLIES:]
+        self.fetched_at = time.monotonic()
+
+    def add_reply(self, message: Dict[str, Any]) -> bool:
+        """
+        Append a reply, keeping replies ordered and bounded.
+
+        Args:
+            message: Slack message with at least a `ts` field
+
+        Returns:
+            bool: True if the reply was new
+        """
+        ts = message.get("ts")
+        if not ts or ts == self.parent.get("ts"):
+            return False
+        if any(reply.get("ts") == ts for reply in self.replies):
+            return False
+
+        self.replies.append(message)
+        if len(self.replies) > 1 and float(ts) < float(self.replies[-2]["ts"]):
+            self.replies.sort(key=lambda reply: float(reply["ts"]))
+        del self.replies[:-THREAD_CONTEXT_MAX_REPLIES]
+        return True
+
+
+class ThreadContextCache:
+    """LRU + TTL cache of thread context keyed by (channel, thread_ts)."""
+
+    def __init__(
+        self, max_size: int = THREAD_CACHE_SIZE, ttl: float = THREAD_CACHE_TTL
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of threads cached
+            ttl: Seconds after fetching before a thread must be refetched
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._threads: "OrderedDict[Tuple[str, str], ThreadContext]" = OrderedDict()
+        self._last_message_event: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, channel: str, thread_ts: str) -> Optional[ThreadContext]:
+        """Get a cached thread, or None if missing or stale"""
+        key = (channel, thread_ts)
+        context = self._threads.get(key)
+        if context is None or time.monotonic() - context.fetched_at > self.ttl:
+            if context is not None:
+                del self._threads[key]
+            self.misses += 1
+            return None
+        self._threads.move_to_end(key)
+        self.hits += 1
+        return context
+
+    def put(
+        self,
+        channel: str,
+        thread_ts: str,
+        parent: Dict[str, Any],
+        replies: List[Dict[str, Any]],
+    ) -> ThreadContext:
+        """Cache a freshly fetched thread"""
+        context = ThreadContext(parent, replies)
+        self._threads[(channel, thread_ts)] = context
+        self._threads.move_to_end((channel, thread_ts))
+        while len(self._threads) > self.max_size:
+            self._threads.popitem(last=False)
+        return context
+
+    def record_message(self, event: Dict[str, Any]) -> bool:
+        """
+        Append a thread reply from a Slack message event to its cached thread.
+
+        Only threads already in the cache are updated; unknown threads are
+        fetched in full the first time the bot needs their context.
+
+        Args:
+            event: Slack message event
+
+        Returns:
+            bool: True if a cached thread was updated
+        """
+        if event.get("type") == "message":
+            self._last_message_event = time.monotonic()
+        thread_ts = event.get("thread_ts")
+        channel = event.get("channel")
+        if not thread_ts or not channel or event.get("subtype"):
+            return False
+        context = self._threads.get((channel, thread_ts))
+        if context is None:
+            return False
+        return context.add_reply(
+            {
+                "text": event.get("text", ""),
+                "user": event.get("user"),
+                "ts": event.get("ts"),
+                "bot_id": event.get("bot_id"),
+            }
+        )
+
+    def record_mention(self, event: Dict[str, Any]) -> bool:
+        """
+        Update a cached thread from an app_mention event.
+
+        If no message events arrived within the TTL, replies since the
+        thread was cached may be missing, so the thread is dropped instead.
+
+        Args:
+            event: Slack app_mention event
+
+        Returns:
+            bool: True if a cached thread was updated
+        """
+        if self.receives_replies():
+            return self.record_message(event)
+        if event.get("thread_ts") and event.get("channel"):
+            self.invalidate(event["channel"], event["thread_ts"])
+        return False
+
+    def receives_replies(self) -> bool:
+        """Whether message events, and with them thread replies, are arriving"""
+        return (
+            self._last_message_event is not None
+            and time.monotonic() - self._last_message_event <= self.ttl
+        )
+
+    def invalidate(self, channel: str, thread_ts: str) -> None:
+        """Drop a cached thread so it is refetched on next use"""
+        self._threads.pop((channel, thread_ts), None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache size and lookup counters.
+
+        Returns:
+            Dict with size, hits and misses
+        """
+        return {"size": len(self._threads), "hits": self.hits, "misses": self.misses}
+
+    def __len__(self) -> int:
+        return len(self._threads)
+
+
+thread_context_cache = ThreadContextCache()
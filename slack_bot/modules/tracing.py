@@ -0,0 +1,144 @@
+"""
+OpenTelemetry tracing for the Slack bot.
+
+Spans cover receiving a Slack event, fetching thread context, creating the
+API session and the agent run as seen from the bot. The W3C traceparent
+header is added to sre-bot-api requests, so the agent's own spans (the /run
+request, sub-agent runs, tool calls and AWS API calls) join the same trace.
+
+Tracing is off unless TRACING_EXPORTER is set; without a configured
+provider the OpenTelemetry API hands out no-op spans, so instrumented code
+costs next to nothing.
+"""
+
+import functools
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+)
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+TRACING_EXPORTER = os.getenv(
+    "TRACING_EXPORTER", "none"
+).lower()  # none, file (JSON lines) or otlp (collector at OTEL_EXPORTER_OTLP_ENDPOINT)
+TRACING_FILE = os.getenv(
+    "TRACING_FILE", "traces.jsonl"
+)  # Span output file for TRACING_EXPORTER=file
+TRACING_SERVICE_NAME = os.getenv(
+    "TRACING_SERVICE_NAME", "slack-bot"
+)  # service.name of the spans
+
+tracer = trace.get_tracer("slack_bot")
+
+T = TypeVar("T")
+
+
+def build_exporter(kind: str, path: str = TRACING_FILE) -> Optional[SpanExporter]:
+    """
+    Create the span exporter selected by TRACING_EXPORTER.
+
+    Args:
+        kind: none, file or otlp
+        path: Output file for the file exporter
+
+    Returns:
+        The exporter, or None if tracing is disabled or unavailable
+    """
+    if kind == "file":
+        # One span per line, appended so restarts keep earlier traces
+        return ConsoleSpanExporter(
+            out=open(path, "a", encoding="utf-8"),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    if kind == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                OTLPSpanExporter,
+            )
+        except ImportError:
+            logger.error(
+                "TRACING_EXPORTER=otlp requires opentelemetry-exporter-otlp-proto-http"
+            )
+            return None
+        return OTLPSpanExporter()
+    if kind not in ("", "none"):
+        logger.warning("Unknown TRACING_EXPORTER '%s', tracing disabled", kind)
+    return None
+
+
+def configure_tracing(
+    exporter: Optional[SpanExporter] = None,
+) -> Optional[TracerProvider]:
+    """
+    Install a global tracer provider exporting spans, if tracing is enabled.
+
+    Args:
+        exporter: Exporter to use instead of the one from TRACING_EXPORTER
+
+    Returns:
+        The installed provider, or None if tracing is disabled
+    """
+    exporter = exporter or build_exporter(TRACING_EXPORTER)
+    if exporter is None:
+        return None
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": TRACING_SERVICE_NAME})
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    logger.info("Tracing enabled with %s", type(exporter).__name__)
+    return provider
+
+
+def traced(
+    name: str,
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """
+    Decorator running an async function inside a span.
+
+    Exceptions raised by the function are recorded on the span.
+
+    Args:
+        name: Span name
+    """
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            with tracer.start_as_current_span(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def inject_trace_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    """
+    Add the current trace context (traceparent) to outgoing request headers.
+
+    Args:
+        headers: Headers to add to
+
+    Returns:
+        The same headers dict
+    """
+    propagate.inject(headers)
+    return headers
+
+
+def shutdown_tracing() -> None:
+    """Export spans still buffered in the provider"""
+    provider = trace.get_tracer_provider()
+    if isinstance(provider, TracerProvider):
+        provider.shutdown()
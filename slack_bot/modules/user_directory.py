@@ -0,0 +1,188 @@
+"""
+In-memory directory of Slack user names.
+
+The directory is warmed in the background at startup from paginated
+users.list and kept current from user_change events, so resolving a
+message author's name never needs a Slack round trip on the hot path.
+Only the two names the bot uses are kept per user, as a tuple, which keeps
+a 5k-person workspace well under a megabyte.
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_client import AsyncWebClient
+
+from modules.metrics import SLACK_API_LATENCY
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+USER_DIRECTORY_WARM = (
+    os.getenv("USER_DIRECTORY_WARM", "true").lower() == "true"
+)  # Load all users via users.list at startup
+USER_DIRECTORY_PAGE_SIZE = int(
+    os.getenv("USER_DIRECTORY_PAGE_SIZE", "200")
+)  # Users fetched per users.list call
+USER_DIRECTORY_MAX_RETRIES = 5  # Rate-limited users.list pages retried per page
+
+
+class UserDirectory:
+    """
+    Maps Slack user IDs to (display_name, real_name).
+
+    Lookups for users not loaded yet (e.g. while warming, or people who
+    joined since) fall back to users.info and are added to the directory.
+    """
+
+    def __init__(self, page_size: int = USER_DIRECTORY_PAGE_SIZE):
+        """
+        Initialize an empty directory.
+
+        Args:
+            page_size: Users requested per users.list page when warming
+        """
+        self.page_size = page_size
+        self._users: Dict[str, Tuple[str, str]] = {}
+        self._warm_task: Optional[asyncio.Task] = None
+        self.warmed = False
+        self.hits = 0
+        self.misses = 0
+
+    def start(self, client: AsyncWebClient) -> None:
+        """Start warming the directory in the background"""
+        if self._warm_task is None or self._warm_task.done():
+            self._warm_task = asyncio.create_task(self.warm(client))
+
+    async def close(self) -> None:
+        """Stop warming if still in progress"""
+        if self._warm_task is not None and not self._warm_task.done():
+            self._warm_task.cancel()
+            await asyncio.gather(self._warm_task, return_exceptions=True)
+        self._warm_task = None
+
+    async def warm(self, client: AsyncWebClient) -> int:
+        """
+        Load every workspace user from paginated users.list.
+
+        Args:
+            client: Slack AsyncWebClient instance
+
+        Returns:
+            int: Number of users loaded
+        """
+        loaded = 0
+        cursor = None
+        retries = 0
+        try:
+            while True:
+                try:
+                    with SLACK_API_LATENCY.labels(method="users_list").time():
+                        response = await client.users_list(
+                            limit=self.page_size, cursor=cursor
+                        )
+                except SlackApiError as e:
+                    if (
+                        e.response.status_code != 429
+                        or retries >= USER_DIRECTORY_MAX_RETRIES
+                    ):
+                        raise
+                    retries += 1
+                    delay = float(e.response.headers.get("Retry-After", "1"))
+                    logger.info("users.list rate limited, retrying in %ss", delay)
+                    await asyncio.sleep(delay)
+                    continue
+
+                retries = 0
+                for user in response.get("members", []):
+                    self.update_user(user)
+                    loaded += 1
+                cursor = response.get("response_metadata", {}).get("next_cursor")
+                if not cursor:
+                    break
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(
+                "Could not warm user directory after %s users: %s. Falling back to users.info lookups",
+                loaded,
+                e,
+            )
+            return loaded
+
+        self.warmed = True
+        logger.info("User directory warmed with %s users", loaded)
+        return loaded
+
+    def update_user(self, user: Dict[str, Any]) -> None:
+        """
+        Add or refresh a user from a Slack user object.
+
+        Used for users.list members, users.info results and user_change events.
+        """
+        user_id = user.get("id")
+        if not user_id:
+            return
+        profile = user.get("profile", {})
+        self._users[user_id] = (
+            profile.get("display_name", ""),
+            profile.get("real_name", ""),
+        )
+
+    def get(self, user_id: str) -> Optional[Dict[str, str]]:
+        """Get a user's display_name and real_name if loaded"""
+        names = self._users.get(user_id)
+        if names is None:
+            return None
+        return {"display_name": names[0], "real_name": names[1]}
+
+    async def lookup(self, client: AsyncWebClient, user_id: str) -> Dict[str, str]:
+        """
+        Get a user's names, falling back to users.info for unknown users.
+
+        Args:
+            client: Slack AsyncWebClient instance
+            user_id: Slack user ID
+
+        Returns:
+            Dict with display_name and real_name, empty if the lookup failed
+        """
+        if not user_id:
+            return {}
+        profile = self.get(user_id)
+        if profile is not None:
+            self.hits += 1
+            return profile
+
+        self.misses += 1
+        try:
+            with SLACK_API_LATENCY.labels(method="users_info").time():
+                user_info = await client.users_info(user=user_id)
+            if user_info.get("ok"):
+                self.update_user(user_info.get("user", {}))
+                return self.get(user_id) or {}
+        except Exception as e:
+            logger.warning("Could not fetch user info: %s", e)
+        return {}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get directory size and lookup counters.
+
+        Returns:
+            Dict with size, hits and misses
+        """
+        return {
+            "size": len(self._users),
+            "warmed": self.warmed,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+
+user_directory = UserDirectory()
@@ -0,0 +1,273 @@
+"""
+Bounded worker pool for background Slack message processing.
+
+Agent calls can take minutes, so handlers hand them to a fixed number of
+workers instead of spawning an unbounded task per mention. Jobs wait in a
+bounded priority queue ordered by (priority, fair share rank): a job's rank
+is how many jobs its user or channel already has queued or running, so one
+user or channel flooding the bot cannot starve everybody else.
+
+On shutdown the pool stops accepting jobs and drains for a deadline. Jobs
+still queued or running when it passes are cancelled, and the descriptions
+they were submitted with are kept in `unfinished` so they can be handed to
+another replica.
+"""
+
+import asyncio
+import contextvars
+import itertools
+import os
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+WORKER_MAX_IN_FLIGHT = int(
+    os.getenv("WORKER_MAX_IN_FLIGHT", "10")
+)  # Agent calls processed concurrently
+WORKER_QUEUE_SIZE = int(
+    os.getenv("WORKER_QUEUE_SIZE", "100")
+)  # Jobs waiting for a worker before new ones are rejected
+WORKER_DRAIN_TIMEOUT = float(
+    os.getenv("WORKER_DRAIN_TIMEOUT", "30")
+)  # Seconds to wait for queued and running jobs on shutdown
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+
+JobFactory = Callable[[], Awaitable[Any]]
+
+
+class WorkerPool:
+    """
+    Fixed-size pool of workers consuming a fair, bounded priority queue.
+
+    Worker tasks are kept in a set for the lifetime of the pool, so jobs
+    running on them are never garbage-collected mid-flight.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = WORKER_MAX_IN_FLIGHT,
+        max_queue: int = WORKER_QUEUE_SIZE,
+    ):
+        """
+        Initialize the pool. Workers are started on first use or by start().
+
+        Args:
+            max_in_flight: Number of workers, i.e. jobs running concurrently
+            max_queue: Maximum jobs waiting for a worker
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: Set[asyncio.Task] = set()
+        self._sequence = itertools.count()
+        self._accepting = True
+        # Jobs queued or running per user / channel, used for fair ordering
+        self._user_load: Dict[str, int] = defaultdict(int)
+        self._channel_load: Dict[str, int] = defaultdict(int)
+        # Description of the job each busy worker is running, by worker id
+        self._running: Dict[int, Optional[Dict[str, Any]]] = {}
+        # Descriptions of jobs cut off by the last shutdown
+        self.unfinished: List[Dict[str, Any]] = []
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        """Start the worker tasks if they are not running yet"""
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue(maxsize=self.max_queue)
+        self._accepting = True
+        while len(self._workers) < self.max_in_flight:
+            task = asyncio.create_task(self._worker(len(self._workers)))
+            self._workers.add(task)
+            task.add_done_callback(self._workers.discard)
+        logger.info(
+            "Worker pool started - max in flight: %s, queue size: %s",
+            self.max_in_flight,
+            self.max_queue,
+        )
+
+    @property
+    def accepting(self) -> bool:
+        """Whether new jobs are accepted (False while draining)"""
+        return self._accepting
+
+    def submit(
+        self,
+        job: JobFactory,
+        user: str,
+        channel: str,
+        priority: int = PRIORITY_NORMAL,
+        work: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """
+        Queue a job for background processing.
+
+        Args:
+            job: Zero-argument callable returning the coroutine to run
+            user: Slack user the job is for (fairness key)
+            channel: Slack channel the job is for (fairness key)
+            priority: PRIORITY_HIGH or PRIORITY_NORMAL
+            work: JSON-serializable description of the job, kept in
+                `unfinished` if shutdown cuts the job off
+
+        Returns:
+            bool: True if queued, False if the pool is full or shutting down
+        """
+        if not self._accepting:
+            self.rejected += 1
+            logger.warning("Rejected job for user %s: worker pool is draining", user)
+            return False
+        if self._queue is None or not self._workers:
+            self.start()
+
+        rank = max(self._user_load[user], self._channel_load[channel])
+        item = (
+            priority,
+            rank,
+            next(self._sequence),
+            time.monotonic(),
+            user,
+            channel,
+            work,
+        )
+        try:
+            # Jobs run in the submitter's context, keeping e.g. its request ID
+            self._queue.put_nowait(item + (job, contextvars.copy_context()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            logger.warning(
+                "Rejected job for user %s in channel %s: queue full (%s waiting)",
+                user,
+                channel,
+                self.max_queue,
+            )
+            return False
+
+        self._user_load[user] += 1
+        self._channel_load[channel] += 1
+        self.submitted += 1
+        logger.debug(
+            "Queued job for user %s (rank %d), depth %d",
+            user,
+            rank,
+            self._queue.qsize(),
+        )
+        return True
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            item = await self._queue.get()
+            _, _, _, queued_at, user, channel, work, job, context = item
+            self._running[worker_id] = work
+            self.in_flight += 1
+            logger.debug(
+                "Worker %d starting job after %.1fms wait",
+                worker_id,
+                (time.monotonic() - queued_at) * 1000,
+            )
+            try:
+                await asyncio.create_task(job(), context=context)
+                self.completed += 1
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    raise
+                # Only the job was cancelled, e.g. superseded by a newer request
+                self.cancelled += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error("Worker %s job failed: %s", worker_id, e, exc_info=True)
+            finally:
+                del self._running[worker_id]
+                self.in_flight -= 1
+                self._release(user, channel)
+                self._queue.task_done()
+
+    def _release(self, user: str, channel: str) -> None:
+        for load, key in ((self._user_load, user), (self._channel_load, channel)):
+            load[key] -= 1
+            if load[key] <= 0:
+                del load[key]
+
+    async def shutdown(self, timeout: float = WORKER_DRAIN_TIMEOUT) -> bool:
+        """
+        Stop accepting jobs and wait for queued and running ones to finish.
+
+        Jobs that do not finish within the timeout are cancelled and their
+        work descriptions collected in `unfinished`, except work marked
+        `superseded` (e.g. by the thread debouncer), which would only answer
+        part of a message that a newer turn answers in full.
+
+        Args:
+            timeout: Maximum seconds to wait before cancelling the workers
+
+        Returns:
+            bool: True if every job finished within the timeout
+        """
+        self._accepting = False
+        self.unfinished = []
+        drained = True
+        if self._queue is not None and (self._queue.qsize() or self.in_flight):
+            logger.info(
+                "Draining worker pool: %s queued, %s in flight (timeout %ss)",
+                self._queue.qsize(),
+                self.in_flight,
+                timeout,
+            )
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                drained = False
+                logger.warning(
+                    "Worker pool drain timed out with %s queued and %s in flight",
+                    self._queue.qsize(),
+                    self.in_flight,
+                )
+                works = list(self._running.values())
+                while not self._queue.empty():
+                    _, _, _, _, user, channel, work, _, _ = self._queue.get_nowait()
+                    self._release(user, channel)
+                    self._queue.task_done()
+                    works.append(work)
+                self.unfinished = [
+                    work for work in works if work and not work.get("superseded")
+                ]
+
+        workers = list(self._workers)
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._workers.clear()
+        return drained
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get queue depth and throughput counters.
+
+        Returns:
+            Dict with queue and worker statistics
+        """
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected,
+            "accepting": self._accepting,
+        }
+
+
+worker_pool = WorkerPool()
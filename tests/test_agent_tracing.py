@@ -0,0 +1,122 @@
+"""
+Tests for the SRE agent's tracing helpers.
+
+Covers spans for AWS API calls and continuing a caller's trace from its
+traceparent header.
+"""
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from botocore.stub import Stubber
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from opentelemetry.trace import SpanKind, StatusCode
+
+from agents.sre_agent.tracing import (
+    build_exporter,
+    extract_context,
+    instrument_botocore,
+    uninstrument_botocore,
+)
+
+
+@pytest.fixture
+def spans():
+    """Record AWS call spans on a local provider"""
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    instrument_botocore(tracer_provider=provider)
+    yield exporter
+    uninstrument_botocore()
+
+
+def sts_client():
+    return boto3.client(
+        "sts",
+        region_name="us-east-1",
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+    )
+
+
+class TestBotocoreSpans:
+    """Test client spans around AWS API calls."""
+
+    def test_successful_call(self, spans):
+        """Test that a call records service, operation and request ID."""
+        client = sts_client()
+        with Stubber(client) as stubber:
+            stubber.add_response(
+                "get_caller_identity",
+                {
+                    "Account": "123456789012",
+                    "UserId": "AIDATEST",
+                    "Arn": "arn:aws:iam::123456789012:user/test",
+                    "ResponseMetadata": {"RequestId": "req-1"},
+                },
+            )
+            client.get_caller_identity()
+
+        (span,) = spans.get_finished_spans()
+        assert span.name == "aws sts.GetCallerIdentity"
+        assert span.kind == SpanKind.CLIENT
+        assert span.attributes["rpc.service"] == "sts"
+        assert span.attributes["rpc.method"] == "GetCallerIdentity"
+        assert span.attributes["cloud.region"] == "us-east-1"
+        assert span.attributes["aws.request_id"] == "req-1"
+
+    def test_failed_call_is_recorded_as_error(self, spans):
+        """Test that AWS errors mark the span as failed."""
+        client = sts_client()
+        with Stubber(client) as stubber:
+            stubber.add_client_error("get_caller_identity", "AccessDenied")
+            with pytest.raises(ClientError):
+                client.get_caller_identity()
+
+        (span,) = spans.get_finished_spans()
+        assert span.status.status_code == StatusCode.ERROR
+
+    def test_uninstrument_stops_recording(self, spans):
+        """Test that uninstrumenting restores the original call path."""
+        uninstrument_botocore()
+        client = sts_client()
+        with Stubber(client) as stubber:
+            stubber.add_response(
+                "get_caller_identity",
+                {
+                    "Account": "123456789012",
+                    "UserId": "AIDATEST",
+                    "Arn": "arn:aws:iam::123456789012:user/test",
+                },
+            )
+            client.get_caller_identity()
+        assert spans.get_finished_spans() == ()
+
+
+class TestPropagation:
+    """Test continuing the Slack bot's trace."""
+
+    def test_traceparent_becomes_parent(self):
+        """Test that spans started in the extracted context join the trace."""
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+
+        context = extract_context(
+            {"traceparent": "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"}
+        )
+        with provider.get_tracer("test").start_as_current_span("POST /run", context):
+            pass
+
+        (span,) = exporter.get_finished_spans()
+        assert span.context.trace_id == 0x0AF7651916CD43DD8448EB211C80319C
+        assert span.parent.span_id == 0xB7AD6B7169203331
+
+    def test_disabled_by_default(self):
+        """Test that no exporter is built unless one is selected."""
+        assert build_exporter("none") is None
@@ -0,0 +1,90 @@
+"""
+Tests for acknowledging only slow agent answers.
+"""
+
+import asyncio
+import os
+import sys
+from unittest.mock import AsyncMock
+
+import pytest
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+from modules.adaptive_ack import AdaptiveAck  # noqa: E402
+from modules.slack_dispatcher import slack_dispatcher  # noqa: E402
+
+
+async def _answer(delay, text="answer"):
+    await asyncio.sleep(delay)
+    return text
+
+
+class TestAdaptiveAck:
+    """Test racing the answer against the acknowledgement deadline."""
+
+    @pytest.fixture(autouse=True)
+    def no_channel_pacing(self, monkeypatch):
+        """Disable the dispatcher's per-channel pacing between tests."""
+        monkeypatch.setattr(slack_dispatcher, "min_interval", 0)
+        monkeypatch.setattr(slack_dispatcher, "_channels", {})
+
+    @pytest.mark.asyncio
+    async def test_fast_answer_skips_acknowledgement(self):
+        """Test that an answer within the deadline is posted without an ack."""
+        client = AsyncMock()
+        ack = AdaptiveAck(client, "C1", "1.0", "working", deadline=0.1)
+
+        assert await ack.run(_answer(0)) == "answer"
+        await ack.finish("answer")
+
+        assert not ack.acknowledged
+        client.chat_postMessage.assert_awaited_once_with(
+            channel="C1", text="answer", thread_ts="1.0"
+        )
+        client.chat_update.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_slow_answer_edits_acknowledgement_in_place(self):
+        """Test that a late answer replaces the acknowledgement message."""
+        client = AsyncMock()
+        client.chat_postMessage.return_value = {"ok": True, "ts": "2.0"}
+        ack = AdaptiveAck(client, "C1", "1.0", "working", deadline=0.01)
+
+        assert await ack.run(_answer(0.05)) == "answer"
+        await ack.finish("answer")
+
+        assert ack.acknowledged
+        client.chat_postMessage.assert_awaited_once_with(
+            channel="C1", text="working", thread_ts="1.0"
+        )
+        client.chat_update.assert_awaited_once_with(
+            channel="C1", ts="2.0", text="answer"
+        )
+
+    @pytest.mark.asyncio
+    async def test_streaming_acknowledges_through_updater(self):
+        """Test that the ack becomes the streamed message's first text."""
+        updater = AsyncMock()
+        updater.message_ts = None
+        ack = AdaptiveAck(AsyncMock(), "C1", "1.0", "working", 0.01, updater)
+
+        await ack.run(_answer(0.05))
+        await ack.finish("answer")
+
+        updater.update.assert_awaited_once_with("working")
+        updater.finish.assert_awaited_once_with("answer")
+
+    @pytest.mark.asyncio
+    async def test_cancelling_run_cancels_work(self):
+        """Test that the agent call does not outlive a cancelled run."""
+        work = asyncio.ensure_future(_answer(10))
+        ack = AdaptiveAck(AsyncMock(), "C1", "1.0", "working", deadline=10)
+        runner = asyncio.ensure_future(ack.run(work))
+        await asyncio.sleep(0)
+
+        runner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await runner
+        assert work.cancelled()
@@ -0,0 +1,63 @@
+"""
+Tests for extracting the answer text from ADK /run responses.
+"""
+
+import os
+import sys
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+from modules.adk_response import extract_response_text  # noqa: E402
+
+
+def _event(*parts, role="model", **extra):
+    return {"id": "e", "content": {"role": role, "parts": list(parts)}, **extra}
+
+
+class TestExtractResponseText:
+    """Test answer extraction from ADK event lists."""
+
+    def test_concatenates_all_text_parts_of_final_turn(self):
+        """Test that every text part is kept, not only parts[0] of data[-1]."""
+        data = [
+            _event({"text": "Checking costs..."}),
+            _event({"functionCall": {"name": "get_cost", "args": {}}}),
+            _event({"functionResponse": {"name": "get_cost", "response": {}}}),
+            _event({"text": "EC2: $10\n"}, {"text": "S3: $2"}),
+            _event({"text": "Total: $12"}),
+        ]
+        assert extract_response_text(data) == "EC2: $10\nS3: $2\n\nTotal: $12"
+
+    def test_skips_thoughts_and_user_events(self):
+        """Test that thoughts and echoed user messages are not returned."""
+        data = [
+            _event({"text": "question"}, role="user"),
+            _event({"text": "planning", "thought": True}, {"text": "Answer"}),
+        ]
+        assert extract_response_text(data) == "Answer"
+
+    def test_tool_call_after_text_starts_new_turn(self):
+        """Test that text preceding a tool call is dropped."""
+        data = [
+            _event({"text": "Let me hand this over"}),
+            _event({"function_call": {"name": "transfer_to_agent"}}),
+        ]
+        assert extract_response_text(data) is None
+
+    def test_falls_back_to_state_delta_output(self):
+        """Test the legacy state_delta answer when there is no text part."""
+        data = [
+            _event(
+                {"functionResponse": {"name": "k8s"}},
+                actions={"stateDelta": {"kubernetes_agent_output": " pods ok "}},
+            )
+        ]
+        assert extract_response_text(data) == "pods ok"
+
+    def test_non_event_payloads(self):
+        """Test plain strings, single events and unrecognized payloads."""
+        assert extract_response_text(" hello ") == "hello"
+        assert extract_response_text(_event({"text": "hi"})) == "hi"
+        assert extract_response_text([]) is None
+        assert extract_response_text(42) is None
@@ -0,0 +1,93 @@
+"""
+Tests for the Slack bot answer cache.
+"""
+
+import os
+import sys
+from datetime import date
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+import modules.answer_cache as answer_cache_module  # noqa: E402
+from modules.answer_cache import AnswerCache  # noqa: E402
+
+
+class TestNormalization:
+    """Test which questions share a cache entry."""
+
+    def test_equivalent_questions_share_a_key(self):
+        """Test that mentions, case, punctuation and filler are ignored."""
+        cache = AnswerCache(enabled=True)
+        expected = cache.key("what did we spend last month")
+        assert cache.key("<@U0BOT> What did we SPEND last month?") == expected
+        assert cache.key("hey, what did we spend last month please!") == expected
+
+    def test_numbers_keep_their_decimal_point(self):
+        """Test that amounts are not merged with different amounts."""
+        cache = AnswerCache(enabled=True)
+        assert cache.normalize("costs above $1.5k?") == "costs above $1.5k"
+
+    def test_date_is_part_of_the_key(self):
+        """Test that relative periods are not reused across days."""
+        cache = AnswerCache(enabled=True)
+        question = "what did we spend yesterday"
+        assert cache.key(question, date(2026, 3, 1)) != cache.key(
+            question, date(2026, 3, 2)
+        )
+
+    def test_only_matching_questions_are_cached(self):
+        """Test that questions about live state are never cached."""
+        cache = AnswerCache(enabled=True)
+        assert cache.key("are the pods in prod healthy?") is None
+        cache.put("are the pods in prod healthy?", "yes")
+        assert len(cache) == 0
+
+
+class TestAnswerCache:
+    """Test lookups, expiry and the opt-out keyword."""
+
+    def test_hit_and_miss(self):
+        """Test that a repeated question is answered from the cache."""
+        cache = AnswerCache(enabled=True)
+        assert cache.get("what did we spend last month?") is None
+        cache.put("what did we spend last month?", "$1,234")
+        assert cache.get("<@U0BOT> What did we spend last month") == "$1,234"
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+
+    def test_expired_answers_are_dropped(self, monkeypatch):
+        """Test that answers are reused only within the TTL."""
+        now = [1000.0]
+        monkeypatch.setattr(answer_cache_module.time, "monotonic", lambda: now[0])
+        cache = AnswerCache(enabled=True, ttl=60)
+        cache.put("monthly cost", "$10")
+        now[0] += 61
+        assert cache.get("monthly cost") is None
+        assert len(cache) == 0
+
+    def test_keyword_skips_and_refreshes(self):
+        """Test that the opt-out keyword skips the cache but shares the key."""
+        cache = AnswerCache(enabled=True, bypass_keyword="fresh")
+        cache.put("what did we spend last month", "old")
+        assert cache.get("fresh what did we spend last month") is None
+        cache.put("fresh what did we spend last month", "new")
+        assert cache.get("what did we spend last month") == "new"
+        assert cache.get_stats()["bypassed"] == 1
+
+    def test_size_is_bounded(self):
+        """Test that the least recently used answers are evicted."""
+        cache = AnswerCache(enabled=True, max_size=2)
+        for month in ("january", "february", "march"):
+            cache.put(f"cost in {month}", month)
+        assert len(cache) == 2
+        assert cache.get("cost in january") is None
+
+    def test_disabled(self):
+        """Test that nothing is cached when disabled."""
+        cache = AnswerCache(enabled=False)
+        cache.put("monthly cost", "$10")
+        assert cache.get("monthly cost") is None
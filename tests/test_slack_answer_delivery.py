@@ -0,0 +1,98 @@
+"""
+Tests for splitting and delivering long agent answers.
+"""
+
+import os
+import sys
+from unittest.mock import AsyncMock
+
+import pytest
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+from modules.answer_delivery import deliver_answer, format_answer  # noqa: E402
+from modules.slack_dispatcher import slack_dispatcher  # noqa: E402
+
+
+def _table(rows):
+    lines = ["| Service | Cost |", "| --- | --- |"]
+    lines += [f"| service-{i} | ${i}.00 |" for i in range(rows)]
+    return "\n".join(lines)
+
+
+class TestFormatAnswer:
+    """Test splitting answers on markdown boundaries."""
+
+    def test_short_answer_is_unchanged(self):
+        """Test that answers within the limit are sent as-is."""
+        parts = format_answer("Total: $12", max_chars=100)
+        assert [(p.text, p.filename) for p in parts] == [("Total: $12", None)]
+
+    def test_splits_between_paragraphs(self):
+        """Test that paragraphs are packed into messages without being cut."""
+        paragraphs = [f"Paragraph {i} " + "x" * 40 for i in range(6)]
+        parts = format_answer("\n\n".join(paragraphs), max_chars=120)
+
+        assert all(len(p.text) <= 120 for p in parts)
+        assert "\n\n".join(p.text for p in parts) == "\n\n".join(paragraphs)
+
+    def test_keeps_small_tables_whole_and_uploads_large_ones(self):
+        """Test that tables stay intact and oversized ones become snippets."""
+        small = _table(2)
+        large = _table(40)
+        text = f"Summary\n\n{small}\n\nDetails:\n{large}\n\nDone."
+        parts = format_answer(text, max_chars=len(small) + 20)
+
+        assert any(small in p.text and p.filename is None for p in parts)
+        snippets = [p for p in parts if p.filename]
+        assert [(p.filename, p.text) for p in snippets] == [("table-1.md", large)]
+        assert parts[-1].text == "Done."
+
+    def test_large_code_block_becomes_typed_snippet(self):
+        """Test that oversized code blocks are uploaded without their fences."""
+        body = "\n".join(f'  "key{i}": {i},' for i in range(50))
+        parts = format_answer(f"Raw data:\n```json\n{body}\n```", max_chars=200)
+
+        assert parts[-1] == (body, "snippet-1.json")
+
+    def test_long_paragraph_is_split_on_words(self):
+        """Test that a paragraph longer than a message is split between words."""
+        parts = format_answer("word " * 100, max_chars=50)
+        assert all(len(p.text) <= 50 for p in parts)
+        assert all(not p.text.startswith(" ") for p in parts)
+
+
+class TestDeliverAnswer:
+    """Test sending answer parts to Slack in order."""
+
+    @pytest.fixture(autouse=True)
+    def no_channel_pacing(self, monkeypatch):
+        """Disable the dispatcher's per-channel pacing between tests."""
+        monkeypatch.setattr(slack_dispatcher, "min_interval", 0)
+        monkeypatch.setattr(slack_dispatcher, "_channels", {})
+
+    @pytest.mark.asyncio
+    async def test_posts_parts_and_uploads_snippets_in_order(self):
+        """Test that messages and snippets are sent in answer order."""
+        client = AsyncMock()
+        text = "Intro " + "y" * 250 + f"\n\n{_table(30)}\n\nOutro"
+
+        assert await deliver_answer(client, "C1", text, "1.0", max_chars=300) == 3
+
+        calls = [call[0] for call in client.method_calls]
+        assert calls == ["chat_postMessage", "files_upload_v2", "chat_postMessage"]
+        upload = client.files_upload_v2.await_args.kwargs
+        assert upload["filename"] == "table-1.md"
+        assert upload["thread_ts"] == "1.0"
+
+    @pytest.mark.asyncio
+    async def test_first_part_finishes_streamed_message(self):
+        """Test that a streaming updater receives the first part."""
+        client = AsyncMock()
+        updater = AsyncMock()
+
+        await deliver_answer(client, "C1", "short answer", updater=updater)
+
+        updater.finish.assert_awaited_once_with("short answer")
+        client.chat_postMessage.assert_not_awaited()
@@ -0,0 +1,137 @@
+"""
+Tests for the Slack bot's sre-bot-api client helpers.
+
+Covers the pooled client lifecycle and connection reuse, and the registry of
+sessions known to exist on the API.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+from aiohttp import web
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+from modules.api_client import ApiClient, KnownApiSessions  # noqa: E402
+
+
+class PeerRecorder:
+    """Local server recording the client address of each request."""
+
+    def __init__(self):
+        self.peers = []
+        self.runner = None
+        self.url = None
+
+    async def handle(self, request):
+        self.peers.append(request.transport.get_extra_info("peername"))
+        return web.json_response({"ok": True})
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post("/run", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/run"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.runner.cleanup()
+
+
+class TestApiClient:
+    """Test the shared connection pool lifecycle."""
+
+    @pytest.mark.asyncio
+    async def test_connector_uses_pool_settings(self):
+        """Test that limits, keep-alive and DNS caching reach the connector."""
+        client = ApiClient(
+            limit=10, limit_per_host=5, keepalive_timeout=12, dns_cache_ttl=60
+        )
+        try:
+            connector = (await client.start()).connector
+            assert connector.limit == 10
+            assert connector.limit_per_host == 5
+            assert connector._keepalive_timeout == 12
+            assert connector.use_dns_cache
+            assert client.get_pool_stats() == {
+                "open": True,
+                "limit": 10,
+                "limit_per_host": 5,
+                "in_use": 0,
+            }
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_connections_are_reused(self):
+        """Test that sequential requests share one kept-alive connection."""
+        client = ApiClient()
+        try:
+            async with PeerRecorder() as api:
+                session = await client.get_session()
+                for _ in range(3):
+                    async with session.post(api.url, json={}) as response:
+                        assert (await response.json()) == {"ok": True}
+            assert len(api.peers) == 3
+            assert len(set(api.peers)) == 1
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_session_is_shared_and_recreated_after_close(self):
+        """Test that callers share one session and it reopens lazily."""
+        client = ApiClient(limit=10, limit_per_host=5)
+        first = await client.get_session()
+        assert await client.get_session() is first
+        assert client.get_pool_stats()["open"] is True
+
+        await client.close()
+        assert client.get_pool_stats()["open"] is False
+
+        second = await client.get_session()
+        assert second is not first
+        await client.close()
+
+
+class TestKnownApiSessions:
+    """Test tracking of sessions that exist on the API."""
+
+    def test_mark_and_invalidate(self):
+        """Test that sessions can be recorded and forgotten."""
+        known = KnownApiSessions(max_size=10, ttl_seconds=60)
+        assert not known.is_known("u_U1", "s_C1_1.0")
+
+        known.mark_known("u_U1", "s_C1_1.0")
+        assert known.is_known("u_U1", "s_C1_1.0")
+        assert not known.is_known("u_U2", "s_C1_1.0")
+
+        known.invalidate("u_U1", "s_C1_1.0")
+        assert not known.is_known("u_U1", "s_C1_1.0")
+
+    def test_entries_expire(self):
+        """Test that entries are forgotten after the TTL."""
+        known = KnownApiSessions(max_size=10, ttl_seconds=60)
+        known.mark_known("u_U1", "s_1")
+        known._sessions["u_U1/s_1"] = time.monotonic() - 1
+
+        assert not known.is_known("u_U1", "s_1")
+        assert len(known) == 0
+
+    def test_least_recently_used_entries_are_evicted(self):
+        """Test that the registry stays within its size bound."""
+        known = KnownApiSessions(max_size=2, ttl_seconds=60)
+        known.mark_known("u_U1", "s_1")
+        known.mark_known("u_U1", "s_2")
+        known.is_known("u_U1", "s_1")
+        known.mark_known("u_U1", "s_3")
+
+        assert known.is_known("u_U1", "s_1")
+        assert not known.is_known("u_U1", "s_2")
+        assert known.is_known("u_U1", "s_3")
@@ -0,0 +1,232 @@
+"""
+Tests for the circuit breaker around sre-bot-api calls.
+"""
+
+import asyncio
+import os
+import sys
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+import modules.circuit_breaker as circuit_breaker  # noqa: E402
+from modules.api_client import ApiClient  # noqa: E402
+from modules.circuit_breaker import (  # noqa: E402
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock"""
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def fail(breaker, times):
+    for _ in range(times):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+class TestCircuitBreaker:
+    """Test opening, fast failure and half-open recovery."""
+
+    def test_opens_after_consecutive_failures(self, clock):
+        """Test that only consecutive failures open the circuit."""
+        breaker = CircuitBreaker("api", failure_threshold=3, reset_timeout=30)
+        fail(breaker, 2)
+        breaker.before_call()
+        breaker.record_success()
+        fail(breaker, 2)
+        assert breaker.state == CLOSED
+
+        fail(breaker, 1)
+        assert breaker.state == OPEN
+        assert breaker.is_rejecting()
+        with pytest.raises(CircuitOpenError) as error:
+            breaker.before_call()
+        assert error.value.retry_after == pytest.approx(30)
+        assert breaker.get_stats()["rejected"] == 1
+
+    def test_half_open_probe_closes_on_success(self, clock):
+        """Test that one probe goes through after the reset timeout."""
+        breaker = CircuitBreaker("api", failure_threshold=1, reset_timeout=30)
+        fail(breaker, 1)
+        clock[0] += 30
+
+        assert not breaker.is_rejecting()
+        breaker.before_call()
+        assert breaker.state == HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        breaker.before_call()
+
+    def test_failed_probe_reopens(self, clock):
+        """Test that a failed probe keeps failing fast for another timeout."""
+        breaker = CircuitBreaker("api", failure_threshold=1, reset_timeout=30)
+        fail(breaker, 1)
+        clock[0] += 30
+        fail(breaker, 1)
+        assert breaker.state == OPEN
+        assert breaker.retry_after() == pytest.approx(30)
+        assert breaker.get_stats()["opened"] == 2
+
+    def test_released_probe_frees_its_slot(self, clock):
+        """Test that a probe ending without an outcome lets another through."""
+        breaker = CircuitBreaker("api", failure_threshold=1, reset_timeout=30)
+        fail(breaker, 1)
+        clock[0] += 30
+        breaker.before_call()
+        breaker.release()
+        breaker.before_call()
+
+
+class FakeApi:
+    """Local sre-bot-api stand-in answering /run with queued statuses."""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.runner = None
+        self.url = None
+
+    async def handle(self, request):
+        return web.Response(status=self.statuses.pop(0))
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post("/run", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/run"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.runner.cleanup()
+
+
+class StallingApi:
+    """Local server that sends response headers and then stops sending."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.runner = None
+        self.url = None
+
+    async def handle(self, request):
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        await response.write(b'data: {"id": "1"}\n\n')
+        await self.release.wait()
+        return response
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post("/run_sse", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/run_sse"
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release.set()
+        await self.runner.cleanup()
+
+
+class TestApiClientBreaker:
+    """Test that sre-bot-api requests feed the breaker."""
+
+    @pytest.mark.asyncio
+    async def test_server_errors_open_and_success_closes(self):
+        """Test that 5xx responses count as failures and 4xx do not."""
+        breaker = CircuitBreaker("api", failure_threshold=2, reset_timeout=0)
+        client = ApiClient(breaker=breaker)
+        try:
+            async with FakeApi([503, 503, 400]) as api:
+                for _ in range(2):
+                    async with client.post(api.url) as response:
+                        assert response.status == 503
+                assert breaker.state == OPEN
+
+                # reset_timeout=0: the next request is the half-open probe
+                async with client.post(api.url) as response:
+                    assert response.status == 400
+                assert breaker.state == CLOSED
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_connection_errors_fail_fast(self):
+        """Test that refused connections open the circuit and then fail fast."""
+        async with FakeApi([]) as api:
+            url = api.url
+        # The server is gone, so connections to its port are refused
+        breaker = CircuitBreaker("api", failure_threshold=1, reset_timeout=60)
+        client = ApiClient(breaker=breaker)
+        try:
+            with pytest.raises(aiohttp.ClientConnectionError):
+                async with client.post(url):
+                    pass
+            with pytest.raises(CircuitOpenError):
+                async with client.post(url):
+                    pass
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_stalled_stream_counts_as_failure(self):
+        """Test that a read timeout after the headers opens the circuit."""
+        breaker = CircuitBreaker("api", failure_threshold=1, reset_timeout=60)
+        client = ApiClient(breaker=breaker)
+        timeout = aiohttp.ClientTimeout(sock_read=0.2)
+        try:
+            async with StallingApi() as api:
+                with pytest.raises(asyncio.TimeoutError):
+                    async with client.post(api.url, timeout=timeout) as response:
+                        assert response.status == 200
+                        # Headers arrived, but nothing is decided yet
+                        assert breaker.state == CLOSED
+                        async for _ in response.content:
+                            pass
+            assert breaker.state == OPEN
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_probe_stays_in_flight_until_body_is_read(self):
+        """Test that a half-open probe is judged once its body was consumed."""
+        breaker = CircuitBreaker("api", failure_threshold=1, reset_timeout=0)
+        client = ApiClient(breaker=breaker)
+        try:
+            async with FakeApi([503, 200]) as api:
+                async with client.post(api.url):
+                    pass
+                assert breaker.state == OPEN
+
+                async with client.post(api.url) as response:
+                    await response.read()
+                    assert breaker.state == HALF_OPEN
+                    with pytest.raises(CircuitOpenError):
+                        async with client.post(api.url):
+                            pass
+                assert breaker.state == CLOSED
+        finally:
+            await client.close()
@@ -0,0 +1,157 @@
+"""
+Tests for merging rapid-fire thread messages into one agent turn.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+from modules.debounce import ThreadDebouncer  # noqa: E402
+from modules.worker_pool import WorkerPool  # noqa: E402
+
+KEY = ("C1", "100.000001", "U1")
+
+
+class Agent:
+    """Runs dispatched turns as tasks, recording their messages"""
+
+    def __init__(self, duration=0.0, busy=False):
+        self.duration = duration
+        self.started = []
+        self.finished = []
+        self.tasks = []
+        # While busy, turns wait in `queued` as if no worker were free
+        self.busy = busy
+        self.queued = []
+
+    async def dispatch(self, message, received_at, wrap):
+        async def job():
+            self.started.append(message)
+            await asyncio.sleep(self.duration)
+            self.finished.append(message)
+
+        if self.busy:
+            self.queued.append(wrap(job))
+        else:
+            self.tasks.append(asyncio.create_task(wrap(job)()))
+        return {"message": message}
+
+    async def run_queued(self):
+        for job in self.queued:
+            await job()
+
+    async def settle(self):
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+
+class TestThreadDebouncer:
+    """Test per-thread debouncing and superseding of turns."""
+
+    @pytest.mark.asyncio
+    async def test_rapid_messages_become_one_turn(self):
+        """Test that messages within the window are merged in order."""
+        debouncer = ThreadDebouncer(window=0.05, max_wait=1)
+        agent = Agent()
+        for text in ("how much did", "we spend on EC2", "last month?"):
+            debouncer.add(KEY, text, agent.dispatch)
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+        await agent.settle()
+
+        assert agent.finished == ["how much did\nwe spend on EC2\nlast month?"]
+        stats = debouncer.get_stats()
+        assert stats["turns"] == 1
+        assert stats["merged"] == 2
+        assert stats["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_threads_and_users_are_separate(self):
+        """Test that only messages with the same key are merged."""
+        debouncer = ThreadDebouncer(window=0.02)
+        agent = Agent()
+        debouncer.add(KEY, "first", agent.dispatch)
+        debouncer.add(("C1", "100.000001", "U2"), "other user", agent.dispatch)
+        await asyncio.sleep(0.05)
+        await agent.settle()
+        assert sorted(agent.finished) == ["first", "other user"]
+
+    @pytest.mark.asyncio
+    async def test_max_messages_dispatches_at_once(self):
+        """Test that a full batch is not held for the window."""
+        debouncer = ThreadDebouncer(window=10, max_messages=2)
+        agent = Agent()
+        debouncer.add(KEY, "one", agent.dispatch)
+        debouncer.add(KEY, "two", agent.dispatch)
+        await asyncio.sleep(0.01)
+        await agent.settle()
+        assert agent.finished == ["one\ntwo"]
+
+    @pytest.mark.asyncio
+    async def test_newer_message_supersedes_queued_turn(self):
+        """Test that a turn waiting for a worker is skipped and merged forward."""
+        debouncer = ThreadDebouncer(window=0.01)
+        agent = Agent(busy=True)
+        debouncer.add(KEY, "what did we spend", agent.dispatch)
+        await asyncio.sleep(0.05)
+        debouncer.add(KEY, "on S3?", agent.dispatch)
+        await asyncio.sleep(0.05)
+        await agent.run_queued()
+
+        assert agent.started == ["what did we spend\non S3?"]
+        assert debouncer.get_stats()["superseded"] == 1
+
+    @pytest.mark.asyncio
+    async def test_superseded_turn_is_not_handed_over(self):
+        """Test that shutdown keeps only the merged turn for another replica."""
+        debouncer = ThreadDebouncer(window=0.01)
+        pool = WorkerPool(max_in_flight=1, max_queue=10)
+
+        async def busy():
+            await asyncio.sleep(10)
+
+        async def dispatch(message, received_at, wrap):
+            work = {"message": message}
+            pool.submit(wrap(busy), user="U1", channel="C1", work=work)
+            return work
+
+        pool.submit(busy, user="U0", channel="C1")
+        debouncer.add(KEY, "what did we spend", dispatch)
+        await asyncio.sleep(0.05)
+        debouncer.add(KEY, "on S3?", dispatch)
+        await asyncio.sleep(0.05)
+
+        assert not await pool.shutdown(timeout=0.01)
+        assert pool.unfinished == [{"message": "what did we spend\non S3?"}]
+
+    @pytest.mark.asyncio
+    async def test_running_turn_is_not_superseded(self):
+        """Test that a started turn finishes and the new message runs after it."""
+        debouncer = ThreadDebouncer(window=0.01)
+        agent = Agent(duration=0.1)
+        debouncer.add(KEY, "first question", agent.dispatch)
+        await asyncio.sleep(0.05)
+        assert agent.started == ["first question"]
+
+        debouncer.add(KEY, "second question", agent.dispatch)
+        await asyncio.sleep(0.05)
+        await agent.settle()
+
+        assert agent.finished == ["first question", "second question"]
+        assert not agent.tasks[0].cancelled()
+        assert debouncer.get_stats()["superseded"] == 0
+
+    @pytest.mark.asyncio
+    async def test_flush_dispatches_pending_messages(self):
+        """Test that held messages are dispatched on shutdown."""
+        debouncer = ThreadDebouncer(window=10)
+        agent = Agent()
+        debouncer.add(KEY, "held", agent.dispatch)
+        await debouncer.flush()
+        await agent.settle()
+        assert agent.finished == ["held"]
+        assert debouncer.get_stats()["pending"] == 0
@@ -0,0 +1,123 @@
+"""
+Tests for the rate-limit-aware outbound Slack dispatcher.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+from slack_sdk.errors import SlackApiError  # noqa: E402
+from slack_sdk.web.async_slack_response import AsyncSlackResponse  # noqa: E402
+
+from modules.slack_dispatcher import SlackDispatcher  # noqa: E402
+
+
+def _error(status_code, error, headers=None):
+    response = AsyncSlackResponse(
+        client=None,
+        http_verb="POST",
+        api_url="https://slack.com/api/chat.postMessage",
+        req_args={},
+        data={"ok": False, "error": error},
+        headers=headers or {},
+        status_code=status_code,
+    )
+    return SlackApiError(error, response)
+
+
+class FakeSlackClient:
+    """Records writes and fails the first ones with configured errors."""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.calls = []
+
+    async def chat_postMessage(self, **kwargs):
+        self.calls.append((time.monotonic(), kwargs))
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"ok": True, "ts": f"{len(self.calls)}.0"}
+
+    async def chat_update(self, **kwargs):
+        return await self.chat_postMessage(**kwargs)
+
+
+class TestSlackDispatcher:
+    """Test pacing, retries and acknowledgement coalescing."""
+
+    @pytest.mark.asyncio
+    async def test_honours_retry_after(self):
+        """Test that a 429 is retried after its Retry-After delay."""
+        client = FakeSlackClient([_error(429, "ratelimited", {"Retry-After": "0.05"})])
+        dispatcher = SlackDispatcher(min_interval=0)
+
+        response = await dispatcher.post_message(client, "C1", "hello")
+
+        assert response["ok"]
+        assert client.calls[1][0] - client.calls[0][0] >= 0.05
+        stats = dispatcher.get_stats()
+        assert (stats["rate_limited"], stats["retries"], stats["sent"]) == (1, 1, 1)
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors_but_not_permanent_ones(self):
+        """Test jittered retries for server errors and no retry for bad requests."""
+        client = FakeSlackClient([_error(503, "service_unavailable")])
+        dispatcher = SlackDispatcher(min_interval=0, backoff_base=0.01)
+        assert (await dispatcher.post_message(client, "C1", "hi"))["ok"]
+
+        client = FakeSlackClient([_error(200, "channel_not_found")])
+        with pytest.raises(SlackApiError):
+            await dispatcher.post_message(client, "C1", "hi")
+        assert len(client.calls) == 1
+        assert dispatcher.get_stats()["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_paces_new_messages_per_channel(self):
+        """Test that messages to one channel are spaced by the minimum interval."""
+        client = FakeSlackClient()
+        dispatcher = SlackDispatcher(min_interval=0.05)
+
+        await asyncio.gather(
+            dispatcher.post_message(client, "C1", "one"),
+            dispatcher.post_message(client, "C1", "two"),
+            dispatcher.post_message(client, "C2", "other"),
+        )
+
+        times = {kwargs["text"]: sent_at for sent_at, kwargs in client.calls}
+        assert times["two"] - times["one"] >= 0.05
+        assert times["other"] - times["one"] < 0.05
+
+    @pytest.mark.asyncio
+    async def test_answer_supersedes_queued_ack(self):
+        """Test that an ack still waiting to be sent is dropped for the answer."""
+        client = FakeSlackClient([_error(429, "ratelimited", {"Retry-After": "0.05"})])
+        dispatcher = SlackDispatcher(min_interval=0)
+
+        ack = dispatcher.post_ack(client, "C1", "working on it", thread_ts="1.0")
+        await asyncio.sleep(0)  # ack is now waiting out the rate limit
+        await dispatcher.post_message(client, "C1", "answer", thread_ts="1.0")
+
+        assert await ack is None
+        sent = [kwargs["text"] for _, kwargs in client.calls]
+        assert sent == ["working on it", "answer"]  # first ack attempt was the 429
+        assert dispatcher.get_stats()["coalesced_acks"] == 1
+
+    @pytest.mark.asyncio
+    async def test_idle_channels_are_forgotten(self):
+        """Test that channel state does not outlive its pacing interval."""
+        client = FakeSlackClient()
+        dispatcher = SlackDispatcher(min_interval=0.02)
+
+        for channel in ("C1", "C2", "C3"):
+            await dispatcher.post_message(client, channel, "hello")
+        assert list(dispatcher._channels) == ["C1", "C2", "C3"]
+
+        await asyncio.sleep(0.03)
+        await dispatcher.post_message(client, "C4", "hello")
+        assert list(dispatcher._channels) == ["C4"]
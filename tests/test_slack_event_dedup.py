@@ -0,0 +1,76 @@
+"""
+Tests for Slack event deduplication.
+"""
+
+import os
+import sys
+import time
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+from modules.event_dedup import EventDeduplicator  # noqa: E402
+
+
+def _body(event_id, event_type="app_mention", ts="1700000000.000100", **extra):
+    return {
+        "type": "event_callback",
+        "event_id": event_id,
+        "event": {"type": event_type, "channel": "C1", "ts": ts, **extra},
+    }
+
+
+class TestEventDeduplicator:
+    """Test dropping of retried and repeated Slack events."""
+
+    def test_retry_with_same_event_id_is_dropped(self):
+        """Test that a Slack retry of an accepted event is dropped and counted."""
+        dedup = EventDeduplicator(max_size=100, ttl=60)
+        assert not dedup.is_duplicate(_body("Ev1"))
+        assert dedup.is_duplicate(_body("Ev1"), retry_num="1")
+
+        stats = dedup.get_stats()
+        assert stats["accepted"] == 1
+        assert stats["duplicates"] == 1
+        assert stats["retries"] == 1
+        assert stats["dropped_retries"] == 1
+
+    def test_mention_and_message_for_same_ts_run_once(self):
+        """Test that app_mention and message events for one message dedupe."""
+        dedup = EventDeduplicator(max_size=100, ttl=60)
+        assert not dedup.is_duplicate(_body("Ev1", "app_mention"))
+        assert dedup.is_duplicate(_body("Ev2", "message"))
+        assert not dedup.is_duplicate(_body("Ev3", "message", ts="1700000001.0"))
+
+    def test_mention_with_file_runs_once(self):
+        """Test that a mention with an attachment dedupes with its file_share event."""
+        dedup = EventDeduplicator(max_size=100, ttl=60)
+        assert not dedup.is_duplicate(_body("Ev1", "app_mention", files=[{}]))
+        assert dedup.is_duplicate(_body("Ev2", "message", subtype="file_share"))
+
+    def test_edits_and_non_events_are_not_keyed_by_ts(self):
+        """Test that edits, deletions and non-event payloads pass through."""
+        dedup = EventDeduplicator(max_size=100, ttl=60)
+        assert not dedup.is_duplicate(_body("Ev1"))
+        assert not dedup.is_duplicate(
+            _body("Ev2", "message", subtype="message_changed")
+        )
+        assert not dedup.is_duplicate(
+            _body("Ev3", "message", subtype="message_deleted")
+        )
+        assert not dedup.is_duplicate({"type": "url_verification"})
+        assert not dedup.is_duplicate({"type": "url_verification"})
+
+    def test_keys_expire_and_are_bounded(self):
+        """Test that remembered events are forgotten after the TTL or size bound."""
+        dedup = EventDeduplicator(max_size=100, ttl=60)
+        dedup.is_duplicate(_body("Ev1"))
+        for key in dedup._seen:
+            dedup._seen[key] = time.monotonic() - 1
+        assert not dedup.is_duplicate(_body("Ev1"))
+
+        small = EventDeduplicator(max_size=2, ttl=60)
+        small.is_duplicate(_body("Ev1", ts="1.0"))
+        small.is_duplicate(_body("Ev2", ts="2.0"))
+        assert small.get_stats()["tracked"] == 2
+        assert not small.is_duplicate(_body("Ev1", ts="1.0"))
@@ -0,0 +1,88 @@
+"""
+Tests for the Slack bot's message event pre-filter.
+"""
+
+import os
+import sys
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+from modules.event_filter import EventPrefilter  # noqa: E402
+
+
+def message(**fields):
+    """Build a plain user message event"""
+    event = {"type": "message", "user": "U1", "channel": "C1", "ts": "1.0"}
+    event.update(fields)
+    return event
+
+
+class TestMentionDetection:
+    """Test the precompiled mention pattern."""
+
+    def test_plain_and_labelled_mentions(self):
+        """Test that both mention forms match and other users do not."""
+        prefilter = EventPrefilter("UBOT")
+        assert prefilter.mentions_bot("<@UBOT> what did EC2 cost?")
+        assert prefilter.mentions_bot("hey <@UBOT|sre-bot>")
+        assert not prefilter.mentions_bot("<@UBOT2> hello")
+        assert not prefilter.mentions_bot("<@UOTHER> hello")
+        assert not prefilter.mentions_bot("")
+        assert not prefilter.mentions_bot(None)
+
+    def test_unknown_bot_user_never_matches(self):
+        """Test that nothing is a mention before the bot ID is known."""
+        assert not EventPrefilter().mentions_bot("<@UBOT> hi")
+
+
+class TestDropReasons:
+    """Test classification of events."""
+
+    def test_reasons(self):
+        """Test each kind of unanswerable message is dropped with its reason."""
+        prefilter = EventPrefilter("UBOT")
+        assert prefilter.drop_reason(message(text="<@UBOT> hi", bot_id="B1")) == "bot"
+        assert prefilter.drop_reason(message(subtype="bot_message")) == "bot"
+        assert prefilter.drop_reason(message(subtype="message_changed")) == "edited"
+        assert (
+            prefilter.drop_reason(message(text="<@UBOT> hi", edited={"ts": "2.0"}))
+            == "edited"
+        )
+        assert prefilter.drop_reason(message(subtype="channel_join")) == "subtype"
+        assert prefilter.drop_reason(message(text="lunch?")) == "no_mention"
+
+    def test_answerable_events_pass(self):
+        """Test that mentions and non-message events reach handlers."""
+        prefilter = EventPrefilter("UBOT")
+        assert prefilter.drop_reason(message(text="<@UBOT> hi")) is None
+        assert (
+            prefilter.drop_reason(message(text="<@UBOT> see", subtype="file_share"))
+            is None
+        )
+        assert prefilter.drop_reason({"type": "app_mention", "text": "hi"}) is None
+        assert prefilter.drop_reason({"type": "user_change"}) is None
+
+    def test_messages_pass_until_bot_id_is_known(self):
+        """Test that unmentioned messages reach handlers before initialization."""
+        prefilter = EventPrefilter()
+        assert prefilter.drop_reason(message(text="lunch?")) is None
+
+        prefilter.set_bot_user_id("UBOT")
+        assert prefilter.drop_reason(message(text="lunch?")) == "no_mention"
+
+    def test_counters(self):
+        """Test that outcomes are counted by reason."""
+        prefilter = EventPrefilter("UBOT")
+        assert prefilter.should_drop(message(text="lunch?"))
+        assert prefilter.should_drop(message(text="coffee?"))
+        assert prefilter.should_drop(message(subtype="channel_join"))
+        assert not prefilter.should_drop(message(text="<@UBOT> hi"))
+
+        assert prefilter.get_stats() == {
+            "passed": 1,
+            "dropped_bot": 0,
+            "dropped_edited": 0,
+            "dropped_subtype": 1,
+            "dropped_no_mention": 2,
+        }
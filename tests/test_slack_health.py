@@ -0,0 +1,133 @@
+"""
+Tests for the Slack bot's liveness and readiness checks.
+"""
+
+import os
+import sys
+
+import pytest
+from aiohttp import web
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+import modules.health as health  # noqa: E402
+from modules.api_client import api_client  # noqa: E402
+from modules.health import ApiProbe, liveness_check, readiness_check  # noqa: E402
+
+
+class FakeApi:
+    """Local sre-bot-api stand-in counting health requests."""
+
+    def __init__(self, status=200):
+        self.status = status
+        self.requests = 0
+        self.runner = None
+        self.url = None
+
+    async def handle(self, request):
+        self.requests += 1
+        return web.json_response({"status": "healthy"}, status=self.status)
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get("/health", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/health"
+        return self
+
+    async def __aexit__(self, *exc):
+        await api_client.close()
+        await self.runner.cleanup()
+
+
+class TestApiProbe:
+    """Test the cached sre-bot-api reachability probe."""
+
+    @pytest.mark.asyncio
+    async def test_result_is_cached_for_ttl(self):
+        """Test that repeated checks within the TTL reuse one probe."""
+        async with FakeApi() as api:
+            probe = ApiProbe(api.url, ttl=60, timeout=2)
+            assert (await probe.check())["ok"] is True
+            assert (await probe.check())["ok"] is True
+            assert api.requests == 1
+
+            probe._checked_at -= 61
+            await probe.check()
+            assert api.requests == 2
+
+    @pytest.mark.asyncio
+    async def test_error_status_is_not_ok(self):
+        """Test that a non-200 health response fails the probe."""
+        async with FakeApi(status=500) as api:
+            result = await ApiProbe(api.url, ttl=60).check()
+        assert result["ok"] is False
+        assert result["error"] == "status 500"
+
+    @pytest.mark.asyncio
+    async def test_unreachable_api_is_not_ok(self):
+        """Test that a connection failure fails the probe."""
+        async with FakeApi() as api:
+            url = api.url
+        result = await ApiProbe(url, ttl=60, timeout=1).check()
+        await api_client.close()
+        assert result["ok"] is False
+        assert result["error"]
+
+
+class TestReadiness:
+    """Test the readiness report."""
+
+    @pytest.mark.asyncio
+    async def test_ready_when_all_checks_pass(self):
+        """Test that a healthy replica reports ready."""
+        async with FakeApi() as api:
+            ready, report = await readiness_check("U123", ApiProbe(api.url))
+        assert ready is True
+        assert report["status"] == "ready"
+        assert set(report["checks"]) == {
+            "bot_identity",
+            "api",
+            "worker_queue",
+            "api_pool",
+        }
+
+    @pytest.mark.asyncio
+    async def test_missing_bot_identity_is_not_ready(self):
+        """Test that a replica without its bot user ID is not ready."""
+        async with FakeApi() as api:
+            ready, report = await readiness_check(None, ApiProbe(api.url))
+        assert ready is False
+        assert report["status"] == "not_ready"
+        assert report["checks"]["bot_identity"]["ok"] is False
+        assert report["checks"]["api"]["ok"] is True
+
+    @pytest.mark.asyncio
+    async def test_full_worker_queue_is_not_ready(self, monkeypatch):
+        """Test that a saturated worker queue stops readiness."""
+        monkeypatch.setattr(
+            health.worker_pool,
+            "get_stats",
+            lambda: {"queued": 95, "max_queue": 100, "accepting": True},
+        )
+        async with FakeApi() as api:
+            ready, report = await readiness_check("U123", ApiProbe(api.url))
+        assert ready is False
+        assert report["checks"]["worker_queue"] == {
+            "ok": False,
+            "used": 95,
+            "limit": 100,
+        }
+
+
+class TestLiveness:
+    """Test the liveness check."""
+
+    def test_liveness(self):
+        """Test that liveness does not depend on dependencies."""
+        assert liveness_check() == {"status": "alive"}
@@ -0,0 +1,161 @@
+"""
+Tests for the Slack bot's logging helpers.
+
+Covers JSON formatting, call-site sampling, request ID correlation, the
+queued writer and that the agent image's copy of this code matches.
+"""
+
+import asyncio
+import io
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+import pytest
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+from utils import (  # noqa: E402
+    JsonFormatter,
+    RequestIdFilter,
+    SamplingFilter,
+    TextFormatter,
+    get_request_id,
+    parse_sample_rates,
+    reset_request_id,
+    set_request_id,
+)
+
+
+def make_record(msg="hello %s", args=("world",), level=logging.INFO, lineno=10):
+    """Build a log record as a logger call would"""
+    return logging.LogRecord("test", level, "/app/main.py", lineno, msg, args, None)
+
+
+class TestFormatters:
+    """Test JSON and text output."""
+
+    def test_json_includes_message_request_id_and_extra(self):
+        """Test that records become one JSON object with extra fields."""
+        record = make_record()
+        record.request_id = "Ev123"
+        record.channel = "C1"
+
+        entry = json.loads(JsonFormatter().format(record))
+        assert entry["message"] == "hello world"
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "test"
+        assert entry["request_id"] == "Ev123"
+        assert entry["channel"] == "C1"
+        assert "args" not in entry
+
+    def test_json_includes_exception(self):
+        """Test that tracebacks are kept in a single JSON field."""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = make_record()
+            record.exc_info = sys.exc_info()
+        entry = json.loads(JsonFormatter().format(record))
+        assert "ValueError: boom" in entry["exc_info"]
+
+    def test_text_appends_request_id_when_set(self):
+        """Test that text lines only mention a request ID when there is one."""
+        formatter = TextFormatter("%(levelname)s - %(message)s")
+        record = make_record()
+        record.request_id = None
+        assert formatter.format(record) == "INFO - hello world"
+        record.request_id = "Ev123"
+        assert formatter.format(record) == "INFO - hello world [request_id=Ev123]"
+
+
+class TestSampling:
+    """Test per-call-site sampling."""
+
+    def test_keeps_one_in_n_per_call_site(self):
+        """Test that each call site is sampled independently."""
+        sampler = SamplingFilter(3)
+        kept = [sampler.filter(make_record(lineno=10)) for _ in range(6)]
+        assert kept == [True, False, False, True, False, False]
+        assert sampler.filter(make_record(lineno=20))
+
+    def test_warnings_are_never_sampled(self):
+        """Test that warnings and errors always pass."""
+        sampler = SamplingFilter(100)
+        sampler.filter(make_record(level=logging.WARNING))
+        assert sampler.filter(make_record(level=logging.WARNING))
+        assert sampler.filter(make_record(level=logging.ERROR))
+
+    def test_parse_sample_rates(self):
+        """Test parsing of LOG_SAMPLE_RATES, ignoring malformed entries."""
+        assert parse_sample_rates("main=10, modules.worker_pool=5,bad,x=y") == {
+            "main": 10,
+            "modules.worker_pool": 5,
+        }
+        assert parse_sample_rates("") == {}
+
+
+class TestRequestId:
+    """Test request ID correlation."""
+
+    @pytest.mark.asyncio
+    async def test_request_id_follows_tasks(self):
+        """Test that tasks created after setting the ID inherit it."""
+        token = set_request_id("Ev1")
+        try:
+            assert await asyncio.create_task(asyncio.sleep(0, get_request_id())) == (
+                "Ev1"
+            )
+            record = make_record()
+            RequestIdFilter().filter(record)
+            assert record.request_id == "Ev1"
+        finally:
+            reset_request_id(token)
+        assert get_request_id() is None
+
+
+class TestQueuedWriter:
+    """Test that queued records are written by the listener."""
+
+    def test_queue_handler_defers_writes(self):
+        """Test that records are formatted by the caller and written later."""
+        log_queue = queue.SimpleQueue()
+        stream = io.StringIO()
+        writer = logging.StreamHandler(stream)
+        writer.setFormatter(logging.Formatter("%(message)s"))
+        listener = logging.handlers.QueueListener(log_queue, writer)
+
+        handler = logging.handlers.QueueHandler(log_queue)
+        handler.setFormatter(JsonFormatter())
+        handler.addFilter(RequestIdFilter())
+        handler.handle(make_record())
+        assert stream.getvalue() == ""
+
+        listener.start()
+        listener.stop()
+        assert json.loads(stream.getvalue())["message"] == "hello world"
+
+
+class TestAgentCopy:
+    """Test that the agent image carries the same logging code."""
+
+    @staticmethod
+    def _logging_section(path):
+        with open(path) as f:
+            text = f.read()
+        start = text.index("# --- Structured logging")
+        end = text.index("# --- End of structured logging ---")
+        return text[start:end]
+
+    def test_logging_sections_match(self):
+        """Test that the Slack bot and agent copies have not drifted apart."""
+        root = os.path.join(os.path.dirname(__file__), "..")
+        assert self._logging_section(
+            os.path.join(root, "slack_bot", "utils.py")
+        ) == self._logging_section(
+            os.path.join(root, "agents", "sre_agent", "utils.py")
+        )
@@ -0,0 +1,411 @@
+"""
+Tests for the Slack bot's request flow in main.py against a local sre-bot-api.
+"""
+
+import asyncio
+import contextlib
+import functools
+import logging
+import os
+import sys
+from collections import OrderedDict
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+from aiohttp import web
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+# Slack credentials are only checked when the app talks to Slack
+os.environ.setdefault("SLACK_BOT_TOKEN", "xoxb-test")
+os.environ.setdefault("SLACK_SIGNING_SECRET", "test-secret")
+
+import main  # noqa: E402
+from modules.adaptive_ack import AdaptiveAck  # noqa: E402
+from modules.api_client import ApiClient, known_api_sessions  # noqa: E402
+import modules.health as health_module  # noqa: E402
+from modules.health import ApiProbe  # noqa: E402
+from modules.answer_cache import AnswerCache  # noqa: E402
+from modules.rate_limit import RateLimiter  # noqa: E402
+from modules.sessions import ConversationSession, SessionManager  # noqa: E402
+from modules.slack_dispatcher import slack_dispatcher  # noqa: E402
+from modules.thread_cache import ThreadContextCache  # noqa: E402
+from modules.worker_pool import WorkerPool  # noqa: E402
+
+
+class FakeAgentApi:
+    """Local sre-bot-api stand-in for session creation and /run."""
+
+    def __init__(self, run_statuses=(), answer="The answer", gate=None, sse_status=503):
+        self.run_statuses = list(run_statuses)
+        # Status of /run_sse, which never streams here
+        self.sse_status = sse_status
+        self.sse_runs = []
+        self.answer = answer
+        # Runs wait for this event when given, to keep the agent busy
+        self.gate = gate
+        self.created = []
+        self.runs = []
+        self.runner = None
+        self.url = None
+
+    async def create_session(self, request):
+        self.created.append(await request.json())
+        return web.json_response({"id": request.match_info["session_id"]})
+
+    async def run(self, request):
+        self.runs.append(await request.json())
+        if self.gate is not None:
+            await self.gate.wait()
+        status = self.run_statuses.pop(0) if self.run_statuses else 200
+        if status != 200:
+            return web.json_response({"detail": "Session not found"}, status=status)
+        return web.json_response(
+            [{"content": {"role": "model", "parts": [{"text": self.answer}]}}]
+        )
+
+    async def run_sse(self, request):
+        self.sse_runs.append(await request.json())
+        return web.json_response({"detail": "unavailable"}, status=self.sse_status)
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post(
+            "/apps/sre_agent/users/{user_id}/sessions/{session_id}",
+            self.create_session,
+        )
+        app.router.add_post("/run", self.run)
+        app.router.add_post("/run_sse", self.run_sse)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.runner.cleanup()
+
+
+@pytest.fixture
+def api_client(monkeypatch):
+    """Fresh pooled client, so tests do not share a circuit or connections"""
+    client = ApiClient()
+    monkeypatch.setattr(main, "api_client", client)
+    monkeypatch.setattr(known_api_sessions, "_sessions", OrderedDict())
+    yield client
+
+
+class SlackBot:
+    """Drives the app_mention handler with a mocked Slack client."""
+
+    def __init__(self, pool, api_client):
+        self.pool = pool
+        self.api_client = api_client
+        self.client = AsyncMock()
+        self.client.conversations_replies.side_effect = self._replies
+        self.client.users_info.return_value = {"ok": False}
+        self.texts = {}
+
+    async def _replies(self, channel, ts, limit):
+        return {
+            "ok": True,
+            "messages": [{"ts": ts, "user": "U1", "text": self.texts[ts]}],
+        }
+
+    async def __aenter__(self):
+        self.pool.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.pool.shutdown(timeout=1)
+        await self.api_client.close()
+
+    async def mention(self, ts, text, thread_ts=None):
+        """Deliver an app_mention event and wait until it was answered"""
+        self.texts[ts] = text
+        event = {"type": "app_mention", "user": "U1", "channel": "C1", "ts": ts}
+        event["text"] = text
+        if thread_ts:
+            event["thread_ts"] = thread_ts
+        body = {"event_id": f"Ev{ts}", "event": event}
+        await main.handle_app_mention_events(body, self.client, logging.getLogger())
+        await asyncio.wait_for(self.pool._queue.join(), timeout=5)
+
+    def replies(self):
+        """Texts posted to Slack so far"""
+        return [
+            call.kwargs["text"] for call in self.client.chat_postMessage.await_args_list
+        ]
+
+
+@pytest.fixture
+def bot(api_client, monkeypatch):
+    """Handler path with fresh queues, sessions and caches"""
+    pool = WorkerPool()
+    monkeypatch.setattr(main, "worker_pool", pool)
+    monkeypatch.setattr(main, "session_manager", SessionManager(timeout_minutes=10))
+    monkeypatch.setattr(main, "answer_cache", AnswerCache(enabled=True))
+    monkeypatch.setattr(main, "rate_limiter", RateLimiter(enabled=False))
+    monkeypatch.setattr(main, "thread_context_cache", ThreadContextCache())
+    monkeypatch.setattr(main, "ADAPTIVE_ACK_ENABLED", True)
+    monkeypatch.setattr(slack_dispatcher, "min_interval", 0)
+    monkeypatch.setattr(slack_dispatcher, "_channels", {})
+    return SlackBot(pool, api_client)
+
+
+class TestMissingApiSession:
+    """Test recovering when sre-bot-api lost a session."""
+
+    @pytest.mark.asyncio
+    async def test_recreates_session_with_thread_context(self, api_client, monkeypatch):
+        """Test that the retry recreates the session with its thread context."""
+        session = ConversationSession("C1", "U1", "1.0", timeout_minutes=10)
+        thread_data = {"parent_message": {"text": "prod is down"}}
+        open_responses = []
+        post = api_client.post
+
+        @contextlib.asynccontextmanager
+        async def tracked_post(url, **kwargs):
+            open_responses.append(url)
+            try:
+                async with post(url, **kwargs) as response:
+                    yield response
+            finally:
+                open_responses.remove(url)
+
+        async def create_api_session(session, parent_thread_data=None):
+            # The first /run response must be closed before the retry starts
+            assert open_responses == []
+            return await original_create(session, parent_thread_data)
+
+        original_create = main.create_api_session
+        monkeypatch.setattr(api_client, "post", tracked_post)
+        monkeypatch.setattr(main, "create_api_session", create_api_session)
+        try:
+            async with FakeAgentApi(run_statuses=[404]) as api:
+                monkeypatch.setattr(main, "API_BASE_URL", api.url)
+                answer = await main.send_message_to_api(
+                    session, "why?", parent_thread_data=thread_data
+                )
+        finally:
+            await api_client.close()
+
+        assert answer == "The answer"
+        assert len(api.runs) == 2
+        [created] = api.created
+        assert created["state"]["thread_context"] == thread_data
+        assert created["state"]["has_thread_context"] is True
+
+    @pytest.mark.asyncio
+    async def test_retries_only_once(self, api_client, monkeypatch):
+        """Test that a session missing again after recreation is an error."""
+        session = ConversationSession("C1", "U1", "1.0", timeout_minutes=10)
+        try:
+            async with FakeAgentApi(run_statuses=[404, 404]) as api:
+                monkeypatch.setattr(main, "API_BASE_URL", api.url)
+                answer = await main.send_message_to_api(session, "why?")
+        finally:
+            await api_client.close()
+
+        assert answer == "Error: API returned status 404"
+        assert len(api.runs) == 2
+
+
+class TestStreamingFallback:
+    """Test falling back from /run_sse to the blocking /run endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_falls_back_after_leaving_stream_response(
+        self, api_client, monkeypatch
+    ):
+        """Test that a failed stream is closed and recorded before /run starts."""
+        session = ConversationSession("C1", "U1", "1.0", timeout_minutes=10)
+        open_responses = []
+        post = api_client.post
+
+        @contextlib.asynccontextmanager
+        async def tracked_post(url, **kwargs):
+            if url.endswith("/run"):
+                assert open_responses == []
+                assert api_client.breaker.get_stats()["failures"] == 1
+            open_responses.append(url)
+            try:
+                async with post(url, **kwargs) as response:
+                    yield response
+            finally:
+                open_responses.remove(url)
+
+        monkeypatch.setattr(api_client, "post", tracked_post)
+        try:
+            async with FakeAgentApi(sse_status=503) as api:
+                monkeypatch.setattr(main, "API_BASE_URL", api.url)
+                answer = await main.stream_message_to_api(session, "why?", AsyncMock())
+        finally:
+            await api_client.close()
+
+        assert answer == "The answer"
+        assert (len(api.sse_runs), len(api.runs)) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast_without_fallback(
+        self, api_client, monkeypatch
+    ):
+        """Test that a rejected stream is not retried on the blocking endpoint."""
+        session = ConversationSession("C1", "U1", "1.0", timeout_minutes=10)
+        for _ in range(api_client.breaker.failure_threshold):
+            api_client.breaker.before_call()
+            api_client.breaker.record_failure()
+        try:
+            async with FakeAgentApi() as api:
+                monkeypatch.setattr(main, "API_BASE_URL", api.url)
+                answer = await main.stream_message_to_api(session, "why?", AsyncMock())
+        finally:
+            await api_client.close()
+
+        assert answer.startswith("Sorry, " + main.API_UNAVAILABLE_MESSAGE[:20])
+        assert (api.sse_runs, api.runs) == ([], [])
+        assert api_client.breaker.rejected == 1
+
+
+class TestHealthEndpoints:
+    """Test that only readiness depends on sre-bot-api."""
+
+    @pytest.mark.asyncio
+    async def test_health_stays_up_while_api_is_down(self, api_client, monkeypatch):
+        """Test that /health is liveness and /health/readiness reports the API."""
+        async with FakeAgentApi() as api:
+            url = f"{api.url}/health"
+        # The server is gone, so the readiness probe cannot connect
+        monkeypatch.setattr(main, "api_probe", ApiProbe(url, ttl=0))
+        monkeypatch.setattr(health_module, "api_client", api_client)
+        monkeypatch.setattr(main, "bot_user_id", "U0BOT")
+
+        transport = httpx.ASGITransport(app=main.fast_api)
+        try:
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bot"
+            ) as client:
+                health = await client.get("/health")
+                liveness = await client.get("/health/liveness")
+                readiness = await client.get("/health/readiness")
+        finally:
+            await api_client.close()
+
+        assert health.status_code == 200
+        assert health.json() == {"status": "ok"}
+        assert liveness.status_code == 200
+        assert readiness.status_code == 503
+        assert readiness.json()["checks"]["api"]["ok"] is False
+
+
+class TestAnswerCacheFlow:
+    """Test answer caching for mentions arriving through the Slack handler."""
+
+    QUESTION = "<@U0BOT> what did we spend last month?"
+
+    @pytest.mark.asyncio
+    async def test_repeated_top_level_question_is_answered_from_cache(
+        self, bot, monkeypatch
+    ):
+        """Test that a second identical top-level mention skips the agent."""
+        async with bot, FakeAgentApi(answer="$1,234") as api:
+            monkeypatch.setattr(main, "API_BASE_URL", api.url)
+            await bot.mention("100.0", self.QUESTION)
+            await bot.mention("200.0", self.QUESTION)
+
+        assert len(api.runs) == 1
+        assert bot.replies() == ["$1,234", "$1,234"]
+        assert main.answer_cache.get_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_thread_replies_are_not_cached(self, bot, monkeypatch):
+        """Test that follow-ups, which depend on earlier turns, reach the agent."""
+        async with bot, FakeAgentApi(answer="$1,234") as api:
+            monkeypatch.setattr(main, "API_BASE_URL", api.url)
+            monkeypatch.setattr(main.thread_debouncer, "window", 0)
+            await bot.mention("100.0", self.QUESTION)
+            await bot.mention("101.0", self.QUESTION, thread_ts="100.0")
+
+        assert len(api.runs) == 2
+        assert len(main.answer_cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_follow_up_to_cached_answer_tells_agent_what_was_answered(
+        self, bot, monkeypatch
+    ):
+        """Test that the agent learns about a cached answer on the next turn."""
+        async with bot, FakeAgentApi(answer="$1,234") as api:
+            monkeypatch.setattr(main, "API_BASE_URL", api.url)
+            monkeypatch.setattr(main.thread_debouncer, "window", 0)
+            await bot.mention("100.0", self.QUESTION)
+            await bot.mention("200.0", self.QUESTION)
+            await bot.mention("201.0", "<@U0BOT> and EC2?", thread_ts="200.0")
+            await bot.mention("202.0", "<@U0BOT> and S3?", thread_ts="200.0")
+
+        assert len(api.runs) == 3
+        [first, second] = [
+            run["new_message"]["parts"][0]["text"] for run in api.runs[1:]
+        ]
+        assert 'You answered: "$1,234"' in first
+        assert "and EC2?" in first
+        assert "You answered" not in second
+        assert api.created[-1]["state"]["cached_exchange"] == {
+            "question": self.QUESTION,
+            "answer": "$1,234",
+        }
+
+    @pytest.mark.asyncio
+    async def test_cached_answer_is_served_while_api_is_down(
+        self, bot, api_client, monkeypatch
+    ):
+        """Test that the cache is consulted before failing fast on the circuit."""
+        async with bot:
+            async with FakeAgentApi(answer="$1,234") as api:
+                monkeypatch.setattr(main, "API_BASE_URL", api.url)
+                await bot.mention("100.0", self.QUESTION)
+
+            for _ in range(api_client.breaker.failure_threshold):
+                api_client.breaker.before_call()
+                api_client.breaker.record_failure()
+            await bot.mention("200.0", self.QUESTION)
+            await bot.mention("300.0", "<@U0BOT> what did we spend this week?")
+
+        first, cached, uncached = bot.replies()
+        assert cached == "$1,234"
+        assert "unavailable" in uncached
+
+
+class TestThreadTurns:
+    """Test turns waiting behind an earlier turn of the same thread."""
+
+    @pytest.mark.asyncio
+    async def test_waiting_turn_is_acknowledged_in_time(self, bot, monkeypatch):
+        """Test that the ack deadline includes waiting for the thread's lock."""
+        deadline = 0.1
+        monkeypatch.setattr(
+            main, "AdaptiveAck", functools.partial(AdaptiveAck, deadline=deadline)
+        )
+        monkeypatch.setattr(main.thread_debouncer, "window", 0)
+        ack = main.ACK_MESSAGE.format(user="U1")
+        gate = asyncio.Event()
+        async with bot, FakeAgentApi(answer="done", gate=gate) as api:
+            monkeypatch.setattr(main, "API_BASE_URL", api.url)
+            first = asyncio.create_task(bot.mention("100.0", "<@U0BOT> check prod"))
+            await asyncio.sleep(deadline * 2)
+            second = asyncio.create_task(
+                bot.mention("101.0", "<@U0BOT> and staging?", thread_ts="100.0")
+            )
+            await asyncio.sleep(deadline * 2)
+            replies = bot.replies()
+            runs = len(api.runs)
+            gate.set()
+            await asyncio.gather(first, second)
+
+        assert replies == [ack, ack]
+        assert runs == 1
+
+        assert len(api.runs) == 2
+        assert bot.client.chat_update.await_count == 2
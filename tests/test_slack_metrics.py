@@ -0,0 +1,56 @@
+"""
+Tests for the Slack bot Prometheus metrics.
+"""
+
+import os
+import sys
+
+from prometheus_client import CollectorRegistry, generate_latest
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+from modules.metrics import StatsCollector  # noqa: E402
+from modules.thread_cache import ThreadContextCache  # noqa: E402
+
+
+class TestStatsCollector:
+    """Test exposing component stats at scrape time."""
+
+    def test_exposes_counters_and_gauges(self):
+        """Test that registered stats keys become Prometheus samples."""
+        stats = {"queued": 3, "completed": 7}
+        collector = StatsCollector()
+        collector.register(
+            "worker", lambda: stats, counters=("completed",), gauges=("queued",)
+        )
+        registry = CollectorRegistry()
+        registry.register(collector)
+
+        assert registry.get_sample_value("slackbot_worker_completed_total") == 7
+        assert registry.get_sample_value("slackbot_worker_queued") == 3
+
+        stats["queued"] = 0
+        assert registry.get_sample_value("slackbot_worker_queued") == 0
+
+    def test_cache_hit_counters(self):
+        """Test that cache hits and misses are exported for ratio queries."""
+        cache = ThreadContextCache(max_size=10, ttl=60)
+        cache.get("C1", "1.0")
+        cache.put("C1", "1.0", {"ts": "1.0"}, [])
+        cache.get("C1", "1.0")
+
+        collector = StatsCollector()
+        collector.register(
+            "thread_cache",
+            cache.get_stats,
+            counters=("hits", "misses"),
+            gauges=("size",),
+        )
+        registry = CollectorRegistry()
+        registry.register(collector)
+
+        output = generate_latest(registry).decode()
+        assert "slackbot_thread_cache_hits_total 1.0" in output
+        assert "slackbot_thread_cache_misses_total 1.0" in output
+        assert "slackbot_thread_cache_size 1.0" in output
@@ -0,0 +1,93 @@
+"""
+Tests for handing unfinished requests over between replicas.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+from modules.pending_work import PendingWork  # noqa: E402
+from modules.sessions import InMemorySessionStore  # noqa: E402
+
+
+class SharedStore(InMemorySessionStore):
+    """In-memory stand-in for a store shared between replicas"""
+
+    def __init__(self):
+        super().__init__()
+        self.pending = []
+
+    async def save_pending_work(self, items):
+        self.pending.extend(items)
+        return len(items)
+
+    async def claim_pending_work(self, limit):
+        claimed, self.pending = self.pending[:limit], self.pending[limit:]
+        return claimed
+
+
+def _work(message, user="U1"):
+    return {"channel": "C1", "thread_ts": None, "user": user, "message": message}
+
+
+class TestPendingWork:
+    """Test saving and resuming unfinished requests."""
+
+    @pytest.mark.asyncio
+    async def test_saved_work_is_resumed_elsewhere(self):
+        """Test that one replica's unfinished requests are resumed by another."""
+        store = SharedStore()
+        stopping = PendingWork(store)
+        assert await stopping.save([_work("first"), _work("second")]) == 2
+
+        resumed = []
+
+        async def resume(work):
+            resumed.append(work["message"])
+            return True
+
+        replacement = PendingWork(store)
+        replacement._resume = resume
+        assert await replacement.resume_saved() == 2
+        assert resumed == ["first", "second"]
+        assert store.pending == []
+
+    @pytest.mark.asyncio
+    async def test_work_not_taken_is_saved_again(self):
+        """Test that requests a busy replica cannot queue stay saved."""
+        store = SharedStore()
+        pending = PendingWork(store)
+        await pending.save([_work("first"), _work("second")])
+
+        async def resume(work):
+            return work["message"] == "first"
+
+        pending._resume = resume
+        assert await pending.resume_saved() == 1
+        assert [item["message"] for item in store.pending] == ["second"]
+
+    @pytest.mark.asyncio
+    async def test_old_work_is_discarded(self):
+        """Test that requests older than max_age are not answered."""
+        store = SharedStore()
+        store.pending.append({**_work("stale"), "saved_at": time.time() - 3600})
+        pending = PendingWork(store, max_age=900)
+
+        async def resume(work):
+            raise AssertionError("stale work resumed")
+
+        pending._resume = resume
+        assert await pending.resume_saved() == 0
+        assert pending.get_stats()["expired"] == 1
+
+    @pytest.mark.asyncio
+    async def test_memory_store_cannot_hand_over(self):
+        """Test that work is counted as lost without a shared store."""
+        pending = PendingWork(InMemorySessionStore())
+        assert await pending.save([_work("first")]) == 0
+        assert pending.get_stats()["lost"] == 1
@@ -0,0 +1,394 @@
+"""
+Tests for the Postgres-backed Slack session store.
+
+Most tests run against a fake asyncpg pool that records statements and
+returns queued results. Tests against a real database run only when
+SESSION_TEST_DB_URL points at a disposable PostgreSQL database.
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import sys
+
+import pytest
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+import modules.postgres_session_store as postgres_store  # noqa: E402
+from modules.postgres_session_store import PostgresSessionStore  # noqa: E402
+from modules.sessions import ConversationSession  # noqa: E402
+
+TEST_DB_URL = os.getenv("SESSION_TEST_DB_URL")
+
+
+class FakePool:
+    """asyncpg pool stand-in recording statements and returning queued results."""
+
+    def __init__(self):
+        self.calls = []
+        self.results = {"fetch": [], "fetchrow": [], "fetchval": []}
+
+    def queue(self, method, *results):
+        self.results[method].extend(results)
+
+    def statements(self, method):
+        return [(sql, args) for name, sql, args in self.calls if name == method]
+
+    async def _call(self, method, sql, args):
+        self.calls.append((method, sql, args))
+        queued = self.results.get(method)
+        return queued.pop(0) if queued else None
+
+    async def execute(self, sql, *args):
+        await self._call("execute", sql, args)
+
+    async def executemany(self, sql, args):
+        await self._call("executemany", sql, args)
+
+    async def fetch(self, sql, *args):
+        return await self._call("fetch", sql, args) or []
+
+    async def fetchrow(self, sql, *args):
+        return await self._call("fetchrow", sql, args)
+
+    async def fetchval(self, sql, *args):
+        return await self._call("fetchval", sql, args)
+
+
+def session_row(user="U1", current_user="U1", thread_ts="1.0", cached_exchange=None):
+    return {
+        "session_id": f"s_C1_{thread_ts}",
+        "channel": "C1",
+        "slack_user": user,
+        "current_slack_user": current_user,
+        "thread_ts": thread_ts,
+        "cached_exchange": cached_exchange,
+        "ttl_remaining": 600.0,
+    }
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock for the store's caches"""
+    now = [1000.0]
+    monkeypatch.setattr(postgres_store.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def store():
+    """Store wired to a fake pool, without the background flush task"""
+    store = PostgresSessionStore(
+        dsn="postgresql://unused", timeout_minutes=10, cache_ttl=30
+    )
+    store._pool = FakePool()
+    return store
+
+
+class TestActivityFlush:
+    """Test that activity updates are buffered and written in one batch."""
+
+    @pytest.mark.asyncio
+    async def test_touches_are_flushed_in_one_statement(self, store):
+        """Test that repeated touches collapse into one row per session."""
+        first = ConversationSession("C1", "U1", "1.0", timeout_minutes=10)
+        second = ConversationSession("C1", "U2", "2.0", timeout_minutes=10)
+        await store.touch_session("C1_U1_1.0", first)
+        first.current_user = "U3"
+        await store.touch_session("C1_U1_1.0", first)
+        await store.touch_session("C1_U2_2.0", second)
+        assert store._pool.calls == []
+
+        assert await store.flush() == 2
+        [(sql, args)] = store._pool.statements("execute")
+        assert "unnest" in sql
+        assert args == (["C1_U1_1.0", "C1_U2_2.0"], ["U3", "U2"], 600.0)
+        assert await store.flush() == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_updates(self, store):
+        """Test that updates survive a failed write without overwriting newer ones."""
+        session = ConversationSession("C1", "U1", "1.0", timeout_minutes=10)
+        await store.touch_session("C1_U1_1.0", session)
+
+        async def fail(sql, *args):
+            store._pool.execute = original
+            session.current_user = "U2"
+            await store.touch_session("C1_U1_1.0", session)
+            raise ConnectionError("database unavailable")
+
+        original = store._pool.execute
+        store._pool.execute = fail
+        with pytest.raises(ConnectionError):
+            await store.flush()
+
+        assert store._pending_touches == {"C1_U1_1.0": "U2"}
+        assert await store.flush() == 1
+
+    @pytest.mark.asyncio
+    async def test_save_supersedes_pending_touch(self, store):
+        """Test that a full save makes the buffered activity update redundant."""
+        session = ConversationSession("C1", "U1", "1.0", timeout_minutes=10)
+        await store.touch_session("C1_U1_1.0", session)
+        await store.save_session("C1_U1_1.0", session)
+        assert await store.flush() == 0
+
+
+class TestCleanupExpired:
+    """Test deleting expired sessions in bounded batches."""
+
+    @pytest.mark.asyncio
+    async def test_deletes_in_batches_until_a_short_one(self, store, monkeypatch):
+        """Test that the loop keeps deleting while batches come back full."""
+        monkeypatch.setattr(postgres_store, "SESSION_EXPIRE_BATCH", 2)
+        store._pool.queue(
+            "fetch",
+            [{"key": "a"}, {"key": "b"}],
+            [{"key": "c"}, {"key": "d"}],
+            [{"key": "e"}],
+        )
+        store._cache_put("a", ConversationSession("C1", "U1", timeout_minutes=10))
+
+        assert await store.cleanup_expired() == 5
+        statements = store._pool.statements("fetch")
+        assert [args for _, args in statements] == [(2,), (2,), (2,)]
+        assert "FOR UPDATE SKIP LOCKED" in statements[0][0]
+        assert "a" not in store._cache
+
+    @pytest.mark.asyncio
+    async def test_limit_bounds_total_deletions(self, store, monkeypatch):
+        """Test that the limit caps the last batch and stops the loop."""
+        monkeypatch.setattr(postgres_store, "SESSION_EXPIRE_BATCH", 2)
+        store._pool.queue("fetch", [{"key": "a"}, {"key": "b"}], [{"key": "c"}])
+
+        assert await store.cleanup_expired(limit=3) == 3
+        assert [args for _, args in store._pool.statements("fetch")] == [(2,), (1,)]
+
+    @pytest.mark.asyncio
+    async def test_pending_activity_is_written_first(self, store):
+        """Test that sessions touched since the last flush are not deleted."""
+        session = ConversationSession("C1", "U1", "1.0", timeout_minutes=10)
+        await store.touch_session("C1_U1_1.0", session)
+
+        await store.cleanup_expired()
+        assert [method for method, _, _ in store._pool.calls] == ["execute", "fetch"]
+
+
+class TestSessionCache:
+    """Test the read-through session cache."""
+
+    @pytest.mark.asyncio
+    async def test_cached_session_is_served_for_ttl(self, store, clock):
+        """Test that reads within the TTL skip the database."""
+        store._pool.queue("fetchrow", session_row(), session_row(current_user="U2"))
+
+        first = await store.get_session("C1_U1_1.0")
+        clock[0] += 29
+        assert await store.get_session("C1_U1_1.0") is first
+        assert len(store._pool.statements("fetchrow")) == 1
+
+        clock[0] += 2
+        reread = await store.get_session("C1_U1_1.0")
+        assert reread.current_user == "U2"
+        assert len(store._pool.statements("fetchrow")) == 2
+
+    @pytest.mark.asyncio
+    async def test_touch_does_not_extend_cache_ttl(self, store, clock):
+        """Test that a busy session is still re-read to see other replicas' changes."""
+        store._pool.queue("fetchrow", session_row(), session_row(current_user="U2"))
+        session = await store.get_session("C1_U1_1.0")
+
+        for _ in range(4):
+            clock[0] += 10
+            await store.touch_session("C1_U1_1.0", session)
+        reread = await store.get_session("C1_U1_1.0")
+        assert reread is not session
+        assert reread.current_user == "U2"
+
+    @pytest.mark.asyncio
+    async def test_cached_exchange_is_stored_as_json(self, store, clock):
+        """Test that a cached answer the agent has not seen survives a re-read."""
+        exchange = {"question": "what did we spend?", "answer": "$12"}
+        session = ConversationSession("C1", "U1", "1.0", timeout_minutes=10)
+        session.cached_exchange = exchange
+        await store.save_session("C1_U1_1.0", session)
+        [(_, args)] = store._pool.statements("execute")
+        assert json.loads(args[6]) == exchange
+
+        store._pool.queue("fetchrow", session_row(cached_exchange=args[6]))
+        clock[0] += 31
+        assert (await store.get_session("C1_U1_1.0")).cached_exchange == exchange
+
+    @pytest.mark.asyncio
+    async def test_missing_session_is_not_cached(self, store):
+        """Test that a miss is looked up again on the next read."""
+        assert await store.get_session("C1_U1_1.0") is None
+        assert await store.get_session("C1_U1_1.0") is None
+        assert len(store._pool.statements("fetchrow")) == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_size_is_bounded(self, store):
+        """Test that the least recently used sessions are evicted."""
+        store.cache_size = 2
+        for thread_ts in ("1.0", "2.0", "3.0"):
+            store._pool.queue("fetchrow", session_row(thread_ts=thread_ts))
+            await store.get_session(f"C1_U1_{thread_ts}")
+        assert list(store._cache) == ["C1_U1_2.0", "C1_U1_3.0"]
+
+
+class TestThreadKeyCache:
+    """Test caching of thread to session key mappings."""
+
+    @pytest.mark.asyncio
+    async def test_mapping_is_cached_for_ttl(self, store, clock):
+        """Test that a known thread mapping is read once per TTL."""
+        store._pool.queue("fetchval", "C1_U1_1.0", "C1_U2_1.0")
+
+        assert await store.get_thread_session_key("C1_1.0") == "C1_U1_1.0"
+        assert await store.get_thread_session_key("C1_1.0") == "C1_U1_1.0"
+        assert len(store._pool.statements("fetchval")) == 1
+
+        clock[0] += 31
+        assert await store.get_thread_session_key("C1_1.0") == "C1_U2_1.0"
+
+    @pytest.mark.asyncio
+    async def test_deleted_session_drops_its_mappings(self, store):
+        """Test that a thread no longer resolves to a deleted session."""
+        await store.set_thread_session_key("C1_1.0", "C1_U1_1.0")
+        await store.set_thread_session_key("C1_2.0", "C1_U1_2.0")
+
+        await store.delete_session("C1_U1_1.0")
+        assert await store.get_thread_session_key("C1_1.0") is None
+        assert await store.get_thread_session_key("C1_2.0") == "C1_U1_2.0"
+
+    @pytest.mark.asyncio
+    async def test_remapped_and_evicted_threads_leave_the_index(self, store):
+        """Test that deletes only drop mappings still pointing at the session."""
+        store.cache_size = 2
+        await store.set_thread_session_key("C1_1.0", "C1_U1_1.0")
+        await store.set_thread_session_key("C1_1.0", "C1_U2_1.0")
+        await store.set_thread_session_key("C1_2.0", "C1_U1_2.0")
+        await store.set_thread_session_key("C1_3.0", "C1_U1_3.0")
+        assert store._session_threads == {
+            "C1_U1_2.0": {"C1_2.0"},
+            "C1_U1_3.0": {"C1_3.0"},
+        }
+
+        await store.delete_session("C1_U1_1.0")
+        assert list(store._thread_cache) == ["C1_2.0", "C1_3.0"]
+        await store.delete_session("C1_U1_3.0")
+        assert list(store._thread_cache) == ["C1_2.0"]
+        assert store._session_threads == {"C1_U1_2.0": {"C1_2.0"}}
+
+    @pytest.mark.asyncio
+    async def test_expired_sessions_drop_their_mappings(self, store):
+        """Test that the sweeper forgets mappings removed by the cascade."""
+        await store.set_thread_session_key("C1_1.0", "C1_U1_1.0")
+        store._pool.queue("fetch", [{"key": "C1_U1_1.0"}])
+
+        await store.cleanup_expired()
+        assert "C1_1.0" not in store._thread_cache
+
+    @pytest.mark.asyncio
+    async def test_unknown_thread_is_not_cached(self, store):
+        """Test that a thread mapped later by another replica is found."""
+        store._pool.queue("fetchval", None, "C1_U1_1.0")
+
+        assert await store.get_thread_session_key("C1_1.0") is None
+        assert await store.get_thread_session_key("C1_1.0") == "C1_U1_1.0"
+
+    @pytest.mark.asyncio
+    async def test_written_mapping_is_cached(self, store):
+        """Test that mapping a thread serves later lookups locally."""
+        await store.set_thread_session_key("C1_1.0", "C1_U1_1.0")
+        assert await store.get_thread_session_key("C1_1.0") == "C1_U1_1.0"
+        assert store._pool.statements("fetchval") == []
+
+
+class TestPendingWork:
+    """Test saving and claiming requests handed over between replicas."""
+
+    @pytest.mark.asyncio
+    async def test_save_writes_one_row_per_request(self, store):
+        """Test that requests are stored as JSON payloads."""
+        items = [{"user": "U1"}, {"user": "U2"}]
+        assert await store.save_pending_work(items) == 2
+        [(_, rows)] = store._pool.statements("executemany")
+        assert [json.loads(payload) for (payload,) in rows] == items
+        assert await store.save_pending_work([]) == 0
+
+    @pytest.mark.asyncio
+    async def test_claim_skips_rows_locked_by_other_replicas(self, store):
+        """Test that claiming deletes unlocked rows and returns them oldest first."""
+        store._pool.queue(
+            "fetch",
+            [
+                {"id": 7, "payload": json.dumps({"user": "U2"})},
+                {"id": 3, "payload": json.dumps({"user": "U1"})},
+            ],
+        )
+
+        assert await store.claim_pending_work(5) == [{"user": "U1"}, {"user": "U2"}]
+        [(sql, args)] = store._pool.statements("fetch")
+        assert "DELETE FROM slack_bot_pending_work" in sql
+        assert "ORDER BY id" in sql
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert args == (5,)
+
+
+@contextlib.asynccontextmanager
+async def replicas(count=2):
+    """Stores sharing an emptied test database, like replicas of the bot"""
+    stores = [
+        PostgresSessionStore(dsn=TEST_DB_URL, timeout_minutes=10, cache_ttl=0)
+        for _ in range(count)
+    ]
+    try:
+        for store in stores:
+            await store.start()
+        await stores[0]._pool.execute(
+            "TRUNCATE slack_bot_sessions, slack_bot_thread_sessions, "
+            "slack_bot_pending_work"
+        )
+        yield stores
+    finally:
+        for store in stores:
+            await store.close()
+
+
+@pytest.mark.skipif(not TEST_DB_URL, reason="SESSION_TEST_DB_URL not set")
+class TestPostgresDatabase:
+    """Test the store against a real PostgreSQL database."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_claims_do_not_overlap(self):
+        """Test that replicas claiming at once never get the same request."""
+        async with replicas() as stores:
+            await stores[0].save_pending_work([{"n": n} for n in range(20)])
+            claimed = await asyncio.gather(
+                *(store.claim_pending_work(15) for store in stores)
+            )
+        numbers = [item["n"] for batch in claimed for item in batch]
+        assert sorted(numbers) == list(range(20))
+
+    @pytest.mark.asyncio
+    async def test_session_round_trip_and_cleanup(self):
+        """Test that sessions saved by one replica are seen and expired by another."""
+        async with replicas() as (writer, reader):
+            session = ConversationSession("C1", "U1", "1.0", timeout_minutes=10)
+            await writer.save_session("C1_U1_1.0", session)
+            await writer.set_thread_session_key("C1_1.0", "C1_U1_1.0")
+
+            assert await reader.get_thread_session_key("C1_1.0") == "C1_U1_1.0"
+            loaded = await reader.get_session("C1_U1_1.0")
+            assert loaded.session_id == session.session_id
+
+            await writer._pool.execute(
+                "UPDATE slack_bot_sessions SET expires_at = now() - interval '1 second'"
+            )
+            assert await reader.cleanup_expired() == 1
+            assert await reader.count() == 0
+            assert await reader.get_thread_session_key("C1_1.0") is None
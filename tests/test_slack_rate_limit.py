@@ -0,0 +1,100 @@
+"""
+Tests for token-bucket rate limiting of agent requests.
+"""
+
+import os
+import sys
+
+import pytest
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+import modules.rate_limit as rate_limit  # noqa: E402
+from modules.rate_limit import RateLimiter  # noqa: E402
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock"""
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def limiter(**overrides):
+    limits = {"user": (6, 2), "channel": (0, 0), "global_": (0, 0)}
+    limits.update(overrides)
+    return RateLimiter(enabled=True, **limits)
+
+
+class TestRateLimiter:
+    """Test user, channel and global buckets."""
+
+    def test_burst_then_refill(self, clock):
+        """Test that a burst is allowed and tokens come back over time."""
+        limiter_ = limiter()
+        assert limiter_.acquire("U1", "C1") is None
+        assert limiter_.acquire("U1", "C1") is None
+
+        scope, retry_after, notify = limiter_.acquire("U1", "C1")
+        assert scope == "user"
+        assert retry_after == pytest.approx(10)
+        assert notify
+
+        clock[0] += 10
+        assert limiter_.acquire("U1", "C1") is None
+
+    def test_users_are_limited_separately(self, clock):
+        """Test that one user's flood does not limit another user."""
+        limiter_ = limiter()
+        for _ in range(3):
+            limiter_.acquire("U1", "C1")
+        assert limiter_.acquire("U2", "C1") is None
+
+    def test_slow_down_is_sent_once_per_window(self, clock):
+        """Test that a flood is told to slow down once, not once per message."""
+        limiter_ = limiter(user=(6, 1))
+        limiter_.acquire("U1", "C1")
+        assert limiter_.acquire("U1", "C1")[2]
+        assert not limiter_.acquire("U1", "C1")[2]
+        clock[0] += 10
+        limiter_.acquire("U1", "C1")
+        assert limiter_.acquire("U1", "C1")[2]
+
+    def test_rejected_request_does_not_use_other_tokens(self, clock):
+        """Test that a channel-limited request keeps its user's tokens."""
+        limiter_ = limiter(user=(6, 1), channel=(6, 1))
+        assert limiter_.acquire("U1", "C1") is None
+        assert limiter_.acquire("U2", "C1")[0] == "channel"
+        assert limiter_.acquire("U2", "C2") is None
+
+    def test_global_limit(self, clock):
+        """Test that the global bucket is shared by everyone."""
+        limiter_ = limiter(user=(0, 0), global_=(60, 2))
+        assert limiter_.acquire("U1", "C1") is None
+        assert limiter_.acquire("U2", "C2") is None
+        assert limiter_.acquire("U3", "C3")[0] == "global"
+
+        stats = limiter_.get_stats()
+        assert stats["allowed"] == 2
+        assert stats["limited_global"] == 1
+
+    def test_idle_buckets_are_forgotten(self, clock):
+        """Test that refilled buckets and buckets beyond max_keys are dropped."""
+        limiter_ = RateLimiter(
+            enabled=True, user=(6, 2), channel=(0, 0), global_=(0, 0), max_keys=2
+        )
+        for user in ("U1", "U2", "U3"):
+            limiter_.acquire(user, "C1")
+        assert limiter_.get_stats()["tracked"] == 2
+
+        clock[0] += 60
+        limiter_.acquire("U4", "C1")
+        assert limiter_.get_stats()["tracked"] == 1
+
+    def test_disabled(self, clock):
+        """Test that nothing is limited when disabled."""
+        limiter_ = RateLimiter(enabled=False, user=(6, 1))
+        for _ in range(5):
+            assert limiter_.acquire("U1", "C1") is None
@@ -0,0 +1,125 @@
+"""
+Tests for per-session serialization of agent runs.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+from modules.session_locks import SessionBusyError, SessionLocks  # noqa: E402
+
+
+async def turn(locks, session_id, name, log, release=None):
+    async with locks.hold(session_id):
+        log.append(f"{name} start")
+        if release is not None:
+            await release.wait()
+        else:
+            await asyncio.sleep(0)
+        log.append(f"{name} end")
+
+
+class TestSessionLocks:
+    """Test ordering, parallelism, queue bounds and cleanup."""
+
+    @pytest.mark.asyncio
+    async def test_same_session_runs_in_order(self):
+        """Test that turns of one session never overlap and keep arrival order."""
+        locks = SessionLocks(max_queued=5)
+        log = []
+        release = asyncio.Event()
+        first = asyncio.create_task(turn(locks, "s1", "a", log, release))
+        await asyncio.sleep(0)
+        rest = [
+            asyncio.create_task(turn(locks, "s1", name, log)) for name in ("b", "c")
+        ]
+        await asyncio.sleep(0.01)
+        assert log == ["a start"]
+        assert locks.get_stats()["waiting"] == 2
+
+        release.set()
+        await asyncio.gather(first, *rest)
+        assert log == ["a start", "a end", "b start", "b end", "c start", "c end"]
+        assert locks.get_stats()["contended"] == 2
+
+    @pytest.mark.asyncio
+    async def test_different_sessions_run_in_parallel(self):
+        """Test that a busy thread does not hold up other threads."""
+        locks = SessionLocks()
+        log = []
+        release = asyncio.Event()
+        first = asyncio.create_task(turn(locks, "s1", "a", log, release))
+        await asyncio.sleep(0)
+        await turn(locks, "s2", "b", log)
+        assert log == ["a start", "b start", "b end"]
+
+        release.set()
+        await first
+        assert locks.get_stats()["contended"] == 0
+
+    @pytest.mark.asyncio
+    async def test_rejects_beyond_max_queued(self):
+        """Test that a thread with too many waiting turns reports busy."""
+        locks = SessionLocks(max_queued=1)
+        log = []
+        release = asyncio.Event()
+        tasks = [
+            asyncio.create_task(turn(locks, "s1", name, log, release))
+            for name in ("a", "b")
+        ]
+        await asyncio.sleep(0)
+
+        with pytest.raises(SessionBusyError):
+            await turn(locks, "s1", "c", log)
+        assert locks.get_stats()["rejected"] == 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert "c start" not in log
+
+    @pytest.mark.asyncio
+    async def test_idle_sessions_are_forgotten(self):
+        """Test that no lock outlives the turns using it."""
+        locks = SessionLocks()
+        for session_id in ("s1", "s2", "s3"):
+            await turn(locks, session_id, session_id, [])
+        assert locks.get_stats()["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_is_cleaned_up(self):
+        """Test that a superseded turn waiting for the lock leaves nothing behind."""
+        locks = SessionLocks()
+        log = []
+        release = asyncio.Event()
+        first = asyncio.create_task(turn(locks, "s1", "a", log, release))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(turn(locks, "s1", "b", log))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert locks.get_stats()["waiting"] == 0
+
+        release.set()
+        await first
+        assert log == ["a start", "a end"]
+        assert locks.get_stats()["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_turn_releases_the_lock(self):
+        """Test that an error in one turn does not block the next."""
+        locks = SessionLocks()
+
+        with pytest.raises(RuntimeError):
+            async with locks.hold("s1"):
+                raise RuntimeError("boom")
+
+        log = []
+        await turn(locks, "s1", "b", log)
+        assert log == ["b start", "b end"]
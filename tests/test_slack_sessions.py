@@ -0,0 +1,152 @@
+"""
+Tests for Slack bot conversation session management.
+
+Covers session reuse, thread migration and expiry-ordered eviction in the
+in-memory session store.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+from modules.sessions import (  # noqa: E402
+    ConversationSession,
+    InMemorySessionStore,
+    SessionManager,
+    create_session_store,
+)
+
+
+def expire(session):
+    """Force a session's deadline into the past."""
+    session.expires_at = time.monotonic() - 1
+
+
+class TestSessionManager:
+    """Test session lookup, reuse and eviction."""
+
+    @pytest.mark.asyncio
+    async def test_thread_session_reused_across_users(self):
+        """Test that a thread keeps one session regardless of who replies."""
+        manager = SessionManager(timeout_minutes=10)
+        first = await manager.get_session("C1", "U1", "100.1")
+        second = await manager.get_session("C1", "U2", "100.1")
+
+        assert first is second
+        assert second.current_user == "U2"
+        assert manager.store.thread_session_map == {"C1_100.1": "C1_U1_100.1"}
+
+    @pytest.mark.asyncio
+    async def test_update_session_thread_migrates_key(self):
+        """Test that a channel session moves under its new thread key."""
+        manager = SessionManager(timeout_minutes=10)
+        session = await manager.get_session("C1", "U1", None)
+        await manager.update_session_thread(session, "200.2")
+
+        assert list(manager.store.sessions) == ["C1_U1_200.2"]
+        assert session.session_id == "s_C1_200.2"
+        assert await manager.get_session("C1", "U3", "200.2") is session
+
+    @pytest.mark.asyncio
+    async def test_touch_moves_session_to_back_of_expiry_order(self):
+        """Test that activity reorders sessions so the oldest expire first."""
+        manager = SessionManager(timeout_minutes=10)
+        await manager.get_session("C1", "U1", "1.0")
+        await manager.get_session("C1", "U1", "2.0")
+        await manager.get_session("C1", "U1", "1.0")
+
+        assert list(manager.store.sessions) == ["C1_U1_2.0", "C1_U1_1.0"]
+
+    @pytest.mark.asyncio
+    async def test_expired_thread_session_is_replaced(self):
+        """Test that an expired thread session is recreated on next use."""
+        manager = SessionManager(timeout_minutes=10)
+        old = await manager.get_session("C1", "U1", "1.0")
+        expire(old)
+
+        new = await manager.get_session("C1", "U1", "1.0")
+
+        assert new is not old
+        assert manager.store.thread_session_map["C1_1.0"] == "C1_U1_1.0"
+
+    @pytest.mark.asyncio
+    async def test_start_and_close(self):
+        """Test that the background sweeper starts and stops cleanly."""
+        manager = SessionManager(timeout_minutes=10)
+        await manager.start()
+        assert manager._sweeper_task is not None
+
+        await manager.close()
+        assert manager._sweeper_task is None
+
+
+class TestInMemorySessionStore:
+    """Test the in-memory store's expiry-ordered eviction."""
+
+    @pytest.mark.asyncio
+    async def test_cleanup_evicts_only_expired_prefix(self):
+        """Test that eviction removes expired sessions and their thread mappings."""
+        store = InMemorySessionStore(timeout_minutes=10)
+        old = ConversationSession("C1", "U1", "1.0", timeout_minutes=10)
+        await store.save_session("C1_U1_1.0", old)
+        await store.set_thread_session_key("C1_1.0", "C1_U1_1.0")
+        await store.save_session(
+            "C1_U1_2.0", ConversationSession("C1", "U1", "2.0", timeout_minutes=10)
+        )
+        expire(old)
+
+        assert await store.cleanup_expired() == 1
+        assert list(store.sessions) == ["C1_U1_2.0"]
+        assert await store.get_thread_session_key("C1_1.0") is None
+
+    @pytest.mark.asyncio
+    async def test_cleanup_respects_limit(self):
+        """Test that eviction can be bounded per call."""
+        store = InMemorySessionStore(timeout_minutes=10)
+        for i in range(5):
+            session = ConversationSession("C1", "U1", f"{i}.0", timeout_minutes=10)
+            await store.save_session(f"C1_U1_{i}.0", session)
+            expire(session)
+
+        assert await store.cleanup_expired(limit=2) == 2
+        assert await store.count() == 3
+
+    @pytest.mark.asyncio
+    async def test_get_session_hides_expired(self):
+        """Test that expired sessions are never returned."""
+        store = InMemorySessionStore(timeout_minutes=10)
+        session = ConversationSession("C1", "U1", None, timeout_minutes=10)
+        await store.save_session("C1_U1_main", session)
+        expire(session)
+
+        assert await store.get_session("C1_U1_main") is None
+
+
+class TestSessionRestore:
+    """Test rebuilding sessions loaded from an external store."""
+
+    def test_restore_keeps_identity_and_deadline(self):
+        """Test that restored sessions keep their stored ID and remaining TTL."""
+        session = ConversationSession.restore(
+            channel="C1",
+            user="U1",
+            thread_ts="1.0",
+            session_id="s_C1_1.0",
+            current_user="U2",
+            ttl_remaining=30,
+            timeout_minutes=10,
+        )
+
+        assert session.session_id == "s_C1_1.0"
+        assert session.current_user == "U2"
+        assert not session.is_expired()
+        assert session.is_expired(now=time.monotonic() + 31)
+
+    def test_unknown_backend_falls_back_to_memory(self):
+        """Test that an unknown SESSION_STORE value uses the in-memory store."""
+        assert isinstance(create_session_store("redis"), InMemorySessionStore)
@@ -0,0 +1,203 @@
+"""
+Tests for the Slack bot's Socket Mode runner.
+
+A local aiohttp server stands in for Slack: it serves apps.connections.open
+and auth.test, and a WebSocket endpoint that greets each connection with
+hello, pushes envelopes and records acknowledgements.
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+from aiohttp import WSMsgType, web
+from slack_bolt.async_app import AsyncApp
+from slack_sdk.web.async_client import AsyncWebClient
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+from modules.socket_mode import SocketModeRunner  # noqa: E402
+
+
+class FakeSlack:
+    """Minimal Slack Web API and Socket Mode server."""
+
+    def __init__(self):
+        self.sockets = []
+        self.acks = []
+        self.connections_opened = 0
+        self.runner = None
+        self.base_url = None
+
+    async def connections_open(self, request):
+        self.connections_opened += 1
+        return web.json_response({"ok": True, "url": f"{self.ws_url}/link"})
+
+    async def auth_test(self, request):
+        return web.json_response(
+            {"ok": True, "user_id": "UBOT", "bot_id": "BBOT", "team_id": "T1"}
+        )
+
+    async def link(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_str(json.dumps({"type": "hello"}))
+        self.sockets.append(ws)
+        async for message in ws:
+            if message.type == WSMsgType.TEXT:
+                self.acks.append(json.loads(message.data)["envelope_id"])
+        return ws
+
+    def open_sockets(self):
+        return [ws for ws in self.sockets if not ws.closed]
+
+    async def send_event(self, ws, envelope_id, text, retry_attempt=0):
+        """Push an events_api envelope carrying an app_mention"""
+        await ws.send_str(
+            json.dumps(
+                {
+                    "type": "events_api",
+                    "envelope_id": envelope_id,
+                    "retry_attempt": retry_attempt,
+                    "payload": {
+                        "type": "event_callback",
+                        "team_id": "T1",
+                        "event_id": f"Ev{envelope_id}",
+                        "event": {
+                            "type": "app_mention",
+                            "user": "U1",
+                            "text": text,
+                            "channel": "C1",
+                            "ts": "1.0",
+                        },
+                    },
+                }
+            )
+        )
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post("/api/apps.connections.open", self.connections_open)
+        app.router.add_post("/api/auth.test", self.auth_test)
+        app.router.add_get("/link", self.link)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}/api/"
+        self.ws_url = f"ws://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        for ws in self.sockets:
+            await ws.close()
+        await self.runner.cleanup()
+
+
+async def wait_until(condition, timeout=5.0):
+    """Poll until condition() is true"""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+def build_app(slack):
+    """Bolt app that records the mentions and retry headers it handles"""
+    client = AsyncWebClient(token="xoxb-test", base_url=slack.base_url)
+    app = AsyncApp(client=client, signing_secret="secret")
+    app.received = []
+    app.retry_headers = []
+
+    @app.middleware
+    async def record_retry(body, request, next):
+        app.retry_headers.append(request.headers.get("x-slack-retry-num"))
+        await next()
+
+    @app.event("app_mention")
+    async def on_mention(event):
+        app.received.append(event["text"])
+
+    return app
+
+
+class TestSocketModeRunner:
+    """Test event delivery and reconnects against the fake server."""
+
+    @pytest.mark.asyncio
+    async def test_events_on_every_connection_are_handled_and_acked(self):
+        """Test that each connection dispatches to the app and acks envelopes."""
+        async with FakeSlack() as slack:
+            app = build_app(slack)
+            runner = SocketModeRunner(
+                app, app_token="xapp-test", connections=2, ping_interval=1
+            )
+            runner.start()
+            try:
+                await wait_until(lambda: len(slack.open_sockets()) == 2)
+                first, second = slack.open_sockets()
+                await wait_until(lambda: runner.connected() == 2)
+                await slack.send_event(first, "e1", "one")
+                await slack.send_event(second, "e2", "two")
+
+                await wait_until(lambda: len(slack.acks) == 2)
+                assert sorted(slack.acks) == ["e1", "e2"]
+                assert sorted(app.received) == ["one", "two"]
+                assert runner.get_stats() == {
+                    "connections": 2,
+                    "connected": 2,
+                    "envelopes": 2,
+                    "reconnects": 0,
+                }
+            finally:
+                await runner.close()
+        assert runner.connected() == 0
+
+    @pytest.mark.asyncio
+    async def test_reconnects_after_disconnect_request(self):
+        """Test that Slack's disconnect message opens a fresh connection."""
+        async with FakeSlack() as slack:
+            app = build_app(slack)
+            runner = SocketModeRunner(
+                app, app_token="xapp-test", connections=1, ping_interval=1
+            )
+            runner.start()
+            try:
+                await wait_until(lambda: len(slack.open_sockets()) == 1)
+                await slack.sockets[0].send_str(
+                    json.dumps({"type": "disconnect", "reason": "refresh_requested"})
+                )
+
+                await wait_until(lambda: runner.reconnects == 1)
+                assert slack.connections_opened == 2
+                await wait_until(lambda: len(slack.open_sockets()) == 1)
+                await slack.send_event(slack.open_sockets()[0], "e3", "after")
+                await wait_until(lambda: slack.acks == ["e3"])
+                assert app.received == ["after"]
+            finally:
+                await runner.close()
+
+    @pytest.mark.asyncio
+    async def test_retry_attempt_becomes_retry_header(self):
+        """Test that Slack retries look the same to middleware as over HTTP."""
+        async with FakeSlack() as slack:
+            app = build_app(slack)
+            runner = SocketModeRunner(
+                app, app_token="xapp-test", connections=1, ping_interval=1
+            )
+            runner.start()
+            try:
+                await wait_until(lambda: len(slack.open_sockets()) == 1)
+                await slack.send_event(slack.sockets[0], "e4", "first", 0)
+                await slack.send_event(slack.sockets[0], "e5", "retry", 2)
+
+                await wait_until(lambda: len(slack.acks) == 2)
+                assert None in app.retry_headers
+                assert ["2"] in app.retry_headers
+            finally:
+                await runner.close()
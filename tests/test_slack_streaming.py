@@ -0,0 +1,155 @@
+"""
+Tests for Slack bot streaming of ADK agent runs.
+
+Covers SSE parsing, folding ADK events into the answer text and coalescing
+of Slack message edits.
+"""
+
+import asyncio
+import json
+import os
+import sys
+from unittest.mock import AsyncMock
+
+import pytest
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+from modules.slack_dispatcher import slack_dispatcher  # noqa: E402
+from modules.streaming import (  # noqa: E402
+    SlackStreamUpdater,
+    StreamingAnswer,
+    iter_sse_events,
+)
+
+
+class FakeStream:
+    """Minimal stand-in for aiohttp's StreamReader."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def iter_any(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def sse(event):
+    return f"data: {json.dumps(event)}\n\n".encode()
+
+
+class TestIterSSEEvents:
+    """Test server-sent-events parsing."""
+
+    @pytest.mark.asyncio
+    async def test_events_split_across_chunks(self):
+        """Test that events split at arbitrary byte boundaries are reassembled."""
+        raw = sse({"id": "1"}) + sse({"id": "2"})
+        stream = FakeStream([raw[:7], raw[7:30], raw[30:]])
+
+        events = [event async for event in iter_sse_events(stream)]
+
+        assert events == [{"id": "1"}, {"id": "2"}]
+
+    @pytest.mark.asyncio
+    async def test_skips_comments_and_invalid_payloads(self):
+        """Test that comments and non-JSON data lines are ignored."""
+        stream = FakeStream([b": keep-alive\n\n", b"data: not-json\n\n", sse({"a": 1})])
+
+        events = [event async for event in iter_sse_events(stream)]
+
+        assert events == [{"a": 1}]
+
+    @pytest.mark.asyncio
+    async def test_trailing_event_without_blank_line(self):
+        """Test that a final event without the terminating blank line is kept."""
+        stream = FakeStream([b'data: {"last": true}'])
+
+        events = [event async for event in iter_sse_events(stream)]
+
+        assert events == [{"last": True}]
+
+
+class TestStreamingAnswer:
+    """Test folding ADK events into the visible answer."""
+
+    def test_partial_text_then_final_event(self):
+        """Test that partial deltas accumulate and the final event replaces them."""
+        answer = StreamingAnswer()
+        answer.apply({"partial": True, "content": {"parts": [{"text": "Hel"}]}})
+        answer.apply({"partial": True, "content": {"parts": [{"text": "lo"}]}})
+        assert answer.text == "Hello"
+
+        answer.apply({"content": {"parts": [{"text": "Hello there"}]}})
+        assert answer.text == "Hello there"
+
+    def test_tool_call_sets_status_and_resets_text(self):
+        """Test that tool events update the status line."""
+        answer = StreamingAnswer()
+        answer.apply({"content": {"parts": [{"text": "Let me check."}]}})
+        answer.apply(
+            {"content": {"parts": [{"functionCall": {"name": "get_cost_by_service"}}]}}
+        )
+
+        assert answer.text == ""
+        assert "get_cost_by_service" in answer.render()
+
+        answer.apply({"content": {"parts": [{"text": "You spent $42."}]}})
+        assert answer.render() == "You spent $42."
+
+    def test_error_event(self):
+        """Test that an error payload from the server is captured."""
+        answer = StreamingAnswer()
+        assert answer.apply({"error": "boom"})
+        assert answer.error == "boom"
+
+    def test_render_truncates_long_text(self):
+        """Test that long in-progress text only shows its tail."""
+        answer = StreamingAnswer()
+        answer.apply({"content": {"parts": [{"text": "x" * 50}]}})
+        assert answer.render(max_chars=10) == "..." + "x" * 10
+
+
+class TestSlackStreamUpdater:
+    """Test coalescing of Slack message edits."""
+
+    @pytest.fixture(autouse=True)
+    def no_channel_pacing(self, monkeypatch):
+        """Disable the dispatcher's per-channel pacing between tests."""
+        monkeypatch.setattr(slack_dispatcher, "min_interval", 0)
+        monkeypatch.setattr(slack_dispatcher, "_channels", {})
+
+    @pytest.mark.asyncio
+    async def test_posts_once_then_updates_in_place(self):
+        """Test that the first update posts and later ones edit the message."""
+        client = AsyncMock()
+        client.chat_postMessage.return_value = {"ok": True, "ts": "111.222"}
+        updater = SlackStreamUpdater(client, "C1", "100.000", min_interval=0)
+
+        await updater.update("first")
+        await updater.finish("final")
+
+        client.chat_postMessage.assert_awaited_once_with(
+            channel="C1", thread_ts="100.000", text="first"
+        )
+        client.chat_update.assert_awaited_once_with(
+            channel="C1", ts="111.222", text="final"
+        )
+
+    @pytest.mark.asyncio
+    async def test_rapid_updates_are_coalesced(self):
+        """Test that updates within the interval collapse into one edit."""
+        client = AsyncMock()
+        client.chat_postMessage.return_value = {"ok": True, "ts": "111.222"}
+        updater = SlackStreamUpdater(client, "C1", None, min_interval=0.05)
+
+        await updater.update("one")
+        for text in ["two", "three", "four"]:
+            await updater.update(text)
+        await asyncio.sleep(0.1)
+
+        assert client.chat_postMessage.await_count == 1
+        client.chat_update.assert_awaited_once_with(
+            channel="C1", ts="111.222", text="four"
+        )
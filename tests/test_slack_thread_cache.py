@@ -0,0 +1,117 @@
+"""
+Tests for the Slack bot thread context cache.
+"""
+
+import os
+import sys
+import time
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+from modules.thread_cache import (  # noqa: E402
+    THREAD_CONTEXT_MAX_REPLIES,
+    ThreadContextCache,
+)
+
+
+def _message(ts, user="U1", text="hi", **extra):
+    return {"ts": ts, "user": user, "text": text, **extra}
+
+
+def _event(ts, thread_ts="100.000001", channel="C1", **extra):
+    return {
+        "type": "message",
+        "channel": channel,
+        "thread_ts": thread_ts,
+        "ts": ts,
+        "user": "U2",
+        "text": f"reply {ts}",
+        **extra,
+    }
+
+
+class TestThreadContextCache:
+    """Test caching and incremental updates of thread context."""
+
+    def test_get_returns_cached_thread(self):
+        """Test that a stored thread is served until it expires."""
+        cache = ThreadContextCache(max_size=10, ttl=60)
+        assert cache.get("C1", "100.000001") is None
+
+        cache.put("C1", "100.000001", _message("100.000001"), [_message("101.0")])
+        thread = cache.get("C1", "100.000001")
+        assert thread.parent["ts"] == "100.000001"
+        assert [r["ts"] for r in thread.replies] == ["101.0"]
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        thread.fetched_at = time.monotonic() - 61
+        assert cache.get("C1", "100.000001") is None
+        assert len(cache) == 0
+
+    def test_record_message_appends_replies(self):
+        """Test that message events extend cached threads only."""
+        cache = ThreadContextCache(max_size=10, ttl=60)
+        cache.put("C1", "100.000001", _message("100.000001"), [])
+
+        assert cache.record_message(_event("102.0"))
+        assert not cache.record_message(_event("102.0"))  # duplicate delivery
+        assert cache.record_message(_event("101.5"))  # out of order
+        assert not cache.record_message(_event("103.0", thread_ts="999.0"))
+        assert not cache.record_message(_event("104.0", subtype="message_changed"))
+
+        replies = cache.get("C1", "100.000001").replies
+        assert [r["ts"] for r in replies] == ["101.5", "102.0"]
+
+    def test_replies_are_bounded(self):
+        """Test that only the most recent replies are kept."""
+        cache = ThreadContextCache(max_size=10, ttl=60)
+        cache.put("C1", "100.0", _message("100.0"), [])
+        for i in range(THREAD_CONTEXT_MAX_REPLIES + 5):
+            cache.record_message(_event(f"{101 + i}.0", thread_ts="100.0"))
+
+        replies = cache.get("C1", "100.0").replies
+        assert len(replies) == THREAD_CONTEXT_MAX_REPLIES
+        assert replies[-1]["ts"] == f"{100 + THREAD_CONTEXT_MAX_REPLIES + 5}.0"
+
+    def test_least_recently_used_threads_are_evicted(self):
+        """Test that the cache stays within its size bound."""
+        cache = ThreadContextCache(max_size=2, ttl=60)
+        cache.put("C1", "1.0", _message("1.0"), [])
+        cache.put("C1", "2.0", _message("2.0"), [])
+        cache.get("C1", "1.0")
+        cache.put("C1", "3.0", _message("3.0"), [])
+
+        assert cache.get("C1", "1.0") is not None
+        assert cache.get("C1", "2.0") is None
+        assert cache.get("C1", "3.0") is not None
+
+    def test_mention_drops_thread_without_message_events(self):
+        """Test that a thread is refetched when replies may have been missed."""
+        cache = ThreadContextCache(max_size=10, ttl=60)
+        cache.put("C1", "100.0", _message("100.0"), [])
+
+        assert not cache.receives_replies()
+        assert not cache.record_mention(_event("101.0", thread_ts="100.0"))
+        assert cache.get("C1", "100.0") is None
+
+    def test_mention_extends_thread_with_message_events(self):
+        """Test that a cached thread is kept while replies arrive as events."""
+        cache = ThreadContextCache(max_size=10, ttl=60)
+        cache.put("C1", "100.0", _message("100.0"), [])
+        cache.record_message(_event("101.0", thread_ts="100.0"))
+
+        assert cache.receives_replies()
+        assert cache.record_mention(
+            _event("102.0", thread_ts="100.0", type="app_mention")
+        )
+        replies = cache.get("C1", "100.0").replies
+        assert [r["ts"] for r in replies] == ["101.0", "102.0"]
+
+    def test_message_events_stop_counting_after_ttl(self):
+        """Test that a lapsed subscription falls back to refetching."""
+        cache = ThreadContextCache(max_size=10, ttl=60)
+        cache.record_message(_event("101.0"))
+        cache._last_message_event = time.monotonic() - 61
+
+        assert not cache.receives_replies()
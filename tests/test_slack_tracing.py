@@ -0,0 +1,98 @@
+"""
+Tests for the Slack bot's tracing helpers.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from opentelemetry.trace import StatusCode
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+import modules.tracing as tracing  # noqa: E402
+from modules.tracing import build_exporter, inject_trace_headers, traced  # noqa: E402
+
+
+@pytest.fixture
+def provider():
+    """Local provider recording spans in memory"""
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    provider.exporter = exporter
+    return provider
+
+
+class TestTraced:
+    """Test the span decorator."""
+
+    @pytest.mark.asyncio
+    async def test_records_span_and_errors(self, provider, monkeypatch):
+        """Test that calls get a span and exceptions mark it failed."""
+        monkeypatch.setattr(tracing, "tracer", provider.get_tracer("test"))
+
+        @traced("api.run")
+        async def run(fail):
+            if fail:
+                raise RuntimeError("agent unavailable")
+            return "answer"
+
+        assert await run(False) == "answer"
+        with pytest.raises(RuntimeError):
+            await run(True)
+
+        ok, failed = provider.exporter.get_finished_spans()
+        assert ok.name == failed.name == "api.run"
+        assert ok.status.status_code == StatusCode.UNSET
+        assert failed.status.status_code == StatusCode.ERROR
+
+
+class TestPropagation:
+    """Test trace context headers for sre-bot-api requests."""
+
+    def test_injects_traceparent_inside_a_span(self, provider):
+        """Test that the current span is sent as traceparent."""
+        with provider.get_tracer("test").start_as_current_span("slack.event") as span:
+            headers = inject_trace_headers({"X-Request-ID": "Ev1"})
+
+        trace_id = format(span.get_span_context().trace_id, "032x")
+        assert headers["X-Request-ID"] == "Ev1"
+        assert headers["traceparent"].split("-")[1] == trace_id
+
+    def test_no_headers_without_a_span(self):
+        """Test that nothing is added when no trace is active."""
+        assert inject_trace_headers({}) == {}
+
+
+class TestFileExporter:
+    """Test the JSON lines file exporter."""
+
+    def test_writes_one_span_per_line(self, tmp_path):
+        """Test that spans are appended as single-line JSON."""
+        path = tmp_path / "traces.jsonl"
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(build_exporter("file", path)))
+        tracer = provider.get_tracer("test")
+        with tracer.start_as_current_span("slack.event"):
+            with tracer.start_as_current_span("api.run"):
+                pass
+        provider.shutdown()
+
+        lines = path.read_text().splitlines()
+        assert [json.loads(line)["name"] for line in lines] == [
+            "api.run",
+            "slack.event",
+        ]
+
+    def test_unknown_exporter_disables_tracing(self):
+        """Test that unknown exporter names are ignored."""
+        assert build_exporter("zipkin") is None
+        assert build_exporter("none") is None
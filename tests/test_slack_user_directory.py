@@ -0,0 +1,108 @@
+"""
+Tests for the Slack bot user directory.
+"""
+
+import os
+import sys
+
+import pytest
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+from slack_sdk.errors import SlackApiError  # noqa: E402
+from slack_sdk.web.async_slack_response import AsyncSlackResponse  # noqa: E402
+
+from modules.user_directory import UserDirectory  # noqa: E402
+
+
+def _user(user_id, display_name):
+    return {
+        "id": user_id,
+        "profile": {"display_name": display_name, "real_name": display_name.title()},
+    }
+
+
+def _response(data, status_code=200, headers=None):
+    return AsyncSlackResponse(
+        client=None,
+        http_verb="POST",
+        api_url="https://slack.com/api/users.list",
+        req_args={},
+        data=data,
+        headers=headers or {},
+        status_code=status_code,
+    )
+
+
+class FakeSlackClient:
+    """Serves users.list pages and users.info lookups."""
+
+    def __init__(self, pages, rate_limited_calls=0):
+        self.pages = pages
+        self.rate_limited_calls = rate_limited_calls
+        self.list_calls = 0
+        self.info_calls = 0
+
+    async def users_list(self, limit, cursor=None):
+        self.list_calls += 1
+        if self.rate_limited_calls:
+            self.rate_limited_calls -= 1
+            raise SlackApiError(
+                "ratelimited",
+                _response({"ok": False}, status_code=429, headers={"Retry-After": "0"}),
+            )
+        index = int(cursor or 0)
+        next_cursor = str(index + 1) if index + 1 < len(self.pages) else ""
+        return {
+            "ok": True,
+            "members": self.pages[index],
+            "response_metadata": {"next_cursor": next_cursor},
+        }
+
+    async def users_info(self, user):
+        self.info_calls += 1
+        return {"ok": True, "user": _user(user, "newcomer")}
+
+
+class TestUserDirectory:
+    """Test warming, updating and looking up user names."""
+
+    @pytest.mark.asyncio
+    async def test_warm_loads_all_pages(self):
+        """Test that every users.list page is loaded, retrying rate limits."""
+        client = FakeSlackClient(
+            [[_user("U1", "ann")], [_user("U2", "bob"), _user("U3", "cy")]],
+            rate_limited_calls=1,
+        )
+        directory = UserDirectory(page_size=2)
+
+        assert await directory.warm(client) == 3
+        assert directory.warmed
+        assert client.list_calls == 3
+        assert await directory.lookup(client, "U2") == {
+            "display_name": "bob",
+            "real_name": "Bob",
+        }
+        assert client.info_calls == 0
+
+    @pytest.mark.asyncio
+    async def test_unknown_users_fall_back_to_users_info(self):
+        """Test that a miss is resolved once and then served from memory."""
+        client = FakeSlackClient([[]])
+        directory = UserDirectory()
+
+        profile = await directory.lookup(client, "U9")
+        assert profile["display_name"] == "newcomer"
+        await directory.lookup(client, "U9")
+        assert client.info_calls == 1
+        assert (directory.hits, directory.misses) == (1, 1)
+
+    def test_user_change_updates_entry(self):
+        """Test that user_change payloads replace stored names."""
+        directory = UserDirectory()
+        directory.update_user(_user("U1", "ann"))
+        directory.update_user(_user("U1", "annie"))
+
+        assert directory.get("U1")["display_name"] == "annie"
+        assert len(directory) == 1
@@ -0,0 +1,161 @@
+"""
+Tests for the Slack bot background worker pool.
+
+Covers concurrency limits, backpressure, fair ordering and draining.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# The Slack bot runs with its own directory on PYTHONPATH
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "slack_bot"))
+
+from modules.worker_pool import PRIORITY_HIGH, WorkerPool  # noqa: E402
+
+
+class TestWorkerPool:
+    """Test the bounded, fair worker pool."""
+
+    @pytest.mark.asyncio
+    async def test_limits_concurrency(self):
+        """Test that no more than max_in_flight jobs run at once."""
+        pool = WorkerPool(max_in_flight=2, max_queue=10)
+        running = 0
+        peak = 0
+
+        async def job():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        for i in range(6):
+            assert pool.submit(job, user=f"U{i}", channel="C1")
+
+        assert await pool.shutdown(timeout=1)
+        assert peak == 2
+        assert pool.get_stats()["completed"] == 6
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_full(self):
+        """Test that submissions beyond the queue bound are rejected."""
+        pool = WorkerPool(max_in_flight=1, max_queue=1)
+        release = asyncio.Event()
+
+        async def job():
+            await release.wait()
+
+        assert pool.submit(job, user="U1", channel="C1")
+        await asyncio.sleep(0)  # let the worker pick up the first job
+        assert pool.submit(job, user="U2", channel="C1")
+        assert not pool.submit(job, user="U3", channel="C1")
+        assert pool.get_stats()["rejected"] == 1
+
+        release.set()
+        assert await pool.shutdown(timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_fair_ordering_between_users(self):
+        """Test that a user flooding the queue does not starve other users."""
+        pool = WorkerPool(max_in_flight=1, max_queue=10)
+        order = []
+        gate = asyncio.Event()
+
+        def make_job(name):
+            async def job():
+                await gate.wait()
+                order.append(name)
+
+            return job
+
+        pool.submit(make_job("blocker"), user="U0", channel="C0")
+        await asyncio.sleep(0)
+        for i in range(3):
+            pool.submit(make_job(f"spam{i}"), user="U1", channel="C1")
+        pool.submit(make_job("other"), user="U2", channel="C2")
+        pool.submit(make_job("urgent"), user="U1", channel="C1", priority=PRIORITY_HIGH)
+
+        gate.set()
+        assert await pool.shutdown(timeout=1)
+        assert order == ["blocker", "urgent", "spam0", "other", "spam1", "spam2"]
+
+    @pytest.mark.asyncio
+    async def test_failed_job_does_not_kill_worker(self):
+        """Test that exceptions are counted and the worker keeps going."""
+        pool = WorkerPool(max_in_flight=1, max_queue=10)
+        done = []
+
+        async def bad():
+            raise RuntimeError("boom")
+
+        async def good():
+            done.append(True)
+
+        pool.submit(bad, user="U1", channel="C1")
+        pool.submit(good, user="U1", channel="C1")
+
+        assert await pool.shutdown(timeout=1)
+        assert done == [True]
+        assert pool.get_stats()["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_shutdown_stops_accepting_and_times_out(self):
+        """Test that draining rejects new work and gives up after the timeout."""
+        pool = WorkerPool(max_in_flight=1, max_queue=10)
+
+        async def slow():
+            await asyncio.sleep(10)
+
+        pool.submit(slow, user="U1", channel="C1")
+        await asyncio.sleep(0)
+
+        assert not await pool.shutdown(timeout=0.01)
+        assert not pool.submit(slow, user="U1", channel="C1")
+        assert pool.get_stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_shutdown_collects_unfinished_work(self):
+        """Test that jobs cut off by the drain timeout are kept for hand-over."""
+        pool = WorkerPool(max_in_flight=1, max_queue=10)
+
+        async def slow():
+            await asyncio.sleep(10)
+
+        pool.submit(slow, user="U1", channel="C1", work={"message": "running"})
+        await asyncio.sleep(0)
+        pool.submit(slow, user="U2", channel="C1", work={"message": "queued"})
+        pool.submit(slow, user="U3", channel="C1")
+
+        assert not await pool.shutdown(timeout=0.01)
+        assert pool.unfinished == [{"message": "running"}, {"message": "queued"}]
+        assert pool.get_stats()["queued"] == 0
+        assert not pool.accepting
+
+    @pytest.mark.asyncio
+    async def test_cancelled_job_keeps_worker(self):
+        """Test that cancelling a job does not take its worker down."""
+        pool = WorkerPool(max_in_flight=1, max_queue=10)
+        started = asyncio.Event()
+        job_tasks = []
+
+        async def slow():
+            job_tasks.append(asyncio.current_task())
+            started.set()
+            await asyncio.sleep(10)
+
+        async def quick():
+            pass
+
+        pool.submit(slow, user="U1", channel="C1")
+        await started.wait()
+        job_tasks[0].cancel()
+        pool.submit(quick, user="U1", channel="C1")
+
+        assert await pool.shutdown(timeout=1)
+        stats = pool.get_stats()
+        assert stats["cancelled"] == 1
+        assert stats["completed"] == 1